@@ -138,7 +138,14 @@ hiddenimports = [
  'sasmodels.core',
  'pyopencl',
  'tinycc',
- 'xhtml2pdf'
+ 'xhtml2pdf',
+ # perspectives are imported by name in sas.sasview.sasview
+ 'sas.sasgui.perspectives.fitting',
+ 'sas.sasgui.perspectives.pr',
+ 'sas.sasgui.perspectives.invariant',
+ 'sas.sasgui.perspectives.corfunc',
+ 'sas.sasgui.perspectives.calculator',
+ 'sas.sasgui.perspectives.file_converter',
 ]
 
 a = Analysis([SCRIPT_TO_SOURCE],
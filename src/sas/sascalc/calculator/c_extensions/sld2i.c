@@ -208,3 +208,46 @@ void genicom(GenI* this, int npoints, double *q, double *I_out){
 	}
 	//printf("count = %d %g %g %g %g\n", count, sldn_val[0],mx_val[0], my_val[0], mz_val[0]);
 }
+/**
+ * Compute the histogram of pair distances for 1D isotropic
+ * Each pair (j, k) is weighted by sld_j*sld_k*vol_j*vol_k and added to the
+ * bin floor(r_jk/bin_width); the absolute weights are accumulated in
+ * abs_hist for the error bound.  Pairs at zero distance, including j == k,
+ * are summed separately and returned since sin(qr)/qr is exactly one for
+ * them.  The histogram is independent of q, so I(q) can be evaluated from
+ * it in O(nbins) per q point instead of O(npix^2).
+ */
+double genhist(GenI* this, int nbins, double bin_width, double *hist, double *abs_hist){
+	double zero = 0.0;
+	double b_j, b_jk, dx, dy, dz, r;
+	int j, k, bin;
+
+	for(j=0; j<nbins; j++){
+		hist[j] = 0.0;
+		abs_hist[j] = 0.0;
+	}
+	for(j=0; j<this->n_pix; j++){
+		b_j = this->sldn_val[j] * this->vol_pix[j];
+		if (b_j == 0.0) continue;
+		zero += b_j * b_j;
+		// Pairs are symmetric, so only visit k > j and count them twice
+		for(k=j+1; k<this->n_pix; k++){
+			b_jk = 2.0 * b_j * this->sldn_val[k] * this->vol_pix[k];
+			if (b_jk == 0.0) continue;
+			dx = this->x_val[j] - this->x_val[k];
+			dy = this->y_val[j] - this->y_val[k];
+			dz = this->z_val[j] - this->z_val[k];
+			r = sqrt(dx*dx + dy*dy + dz*dz);
+			if (r > 0.0){
+				bin = (int)(r / bin_width);
+				if (bin >= nbins) bin = nbins - 1;
+				hist[bin] += b_jk;
+				abs_hist[bin] += fabs(b_jk);
+			}
+			else{
+				zero += b_jk;
+			}
+		}
+	}
+	return zero;
+}
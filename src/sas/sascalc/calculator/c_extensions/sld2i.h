@@ -33,5 +33,6 @@ void initGenI(GenI*, int is_avg, int npix, double* x, double* y, double* z,
 // compute function
 void genicomXY(GenI*, int npoints, double* qx, double* qy, double *I_out);
 void genicom(GenI*, int npoints, double* q, double *I_out);
+double genhist(GenI*, int nbins, double bin_width, double *hist, double *abs_hist);
 
 #endif
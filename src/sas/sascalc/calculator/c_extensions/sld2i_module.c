@@ -123,7 +123,11 @@ PyObject * genicom_inputXY(PyObject *self, PyObject *args) {
 	// Sanity check
 	//if(n_q!=n_out) return Py_BuildValue("i",-1);
 
+	// Release the GIL so that several q ranges can be computed in parallel
+	// from python threads.  The caller keeps the vectors alive.
+	Py_BEGIN_ALLOW_THREADS
 	genicomXY(sld2i, (int)n_qx, qx, qy, I_out);
+	Py_END_ALLOW_THREADS
 	//printf("done calc\n");
 	//return PyCObject_FromVoidPtr(s, del_genicom);
 	return Py_BuildValue("i",1);
@@ -149,10 +153,43 @@ PyObject * genicom_input(PyObject *self, PyObject *args) {
 	// Sanity check
 	//if (n_q!=n_out) return Py_BuildValue("i",-1);
 
+	Py_BEGIN_ALLOW_THREADS
 	genicom(sld2i, (int)n_q, q, I_out);
+	Py_END_ALLOW_THREADS
 	return Py_BuildValue("i",1);
 }
 
+/**
+ * Histogram the pair distances of the given object
+ */
+PyObject * genhist_input(PyObject *self, PyObject *args) {
+	PyObject *gen_obj;
+	PyObject *hist_obj;
+	PyObject *abs_hist_obj;
+	Py_ssize_t n_hist, n_abs_hist;
+	double bin_width;
+	double *hist;
+	double *abs_hist;
+	double zero;
+	GenI *sld2i;
+
+	if (!PyArg_ParseTuple(args, "OdOO",  &gen_obj, &bin_width, &hist_obj, &abs_hist_obj)) return NULL;
+	sld2i = (GenI *)PyCapsule_GetPointer(gen_obj, "GenI");
+	VECTOR(hist_obj, hist, n_hist);
+	VECTOR(abs_hist_obj, abs_hist, n_abs_hist);
+
+	// Sanity check
+	if (n_hist != n_abs_hist || n_hist == 0 || bin_width <= 0.0) {
+		PyErr_SetString(PyExc_ValueError, "genhist needs matching non-empty histograms and a positive bin width");
+		return NULL;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	zero = genhist(sld2i, (int)n_hist, bin_width, hist, abs_hist);
+	Py_END_ALLOW_THREADS
+	return Py_BuildValue("d", zero);
+}
+
 /**
  * Define module methods
  */
@@ -163,6 +200,8 @@ static PyMethodDef module_methods[] = {
 		  "genicom the given 1d input arrays"},
 	{"genicomXY",(PyCFunction)genicom_inputXY, METH_VARARGS,
 		  "genicomXY the given 2d input arrays"},
+	{"genhist",(PyCFunction)genhist_input, METH_VARARGS,
+		  "histogram the pair distances for 1d input"},
     {NULL}
 };
 
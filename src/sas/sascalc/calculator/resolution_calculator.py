@@ -217,7 +217,92 @@ class ResolutionCalculator(object):
         : qx_value: x component of q
         : qy_value: y component of q
         """
-        coord = 'cartesian'
+        qr_value, phi, sigma_1, sigma_2, sigma_r, sigma1d = \
+            self._compute_sigmas(wavelength, wavelength_spread,
+                                 qx_value, qy_value, tof)
+        if np.ndim(qr_value) == 0:
+            qr_value, phi, sigma_1, sigma_2, sigma_r, sigma1d = \
+                [float(value) for value in (qr_value, phi, sigma_1, sigma_2,
+                                            sigma_r, sigma1d)]
+        # set sigmas
+        self.sigma_1 = sigma_1
+        self.sigma_lamd = sigma_r
+        self.sigma_2 = sigma_2
+        self.sigma_1d = sigma1d
+        return qr_value, phi, sigma_1, sigma_2, sigma_r, sigma1d
+
+    def compute_map(self, qx_value, qy_value, tof=None):
+        """
+        Compute the Q resolution at every point of the qx_value, qy_value
+        arrays at once, averaged over the wavelength list with the
+        intensity of each wavelength as weight as in compute_and_plot.
+
+        : qx_value: array of the x component of q
+        : qy_value: array of the y component of q
+        : tof: rectangular (True) or triangular (False) wavelength
+               distribution; by default True if there is more than one
+               wavelength
+
+        : return: sigma_1, sigma_2, sigma_r, sigma_1d arrays with the
+                  shape of qx_value
+        """
+        self.get_all_instrument_params()
+        qx_value = np.asarray(qx_value, dtype=float)
+        qy_value = np.asarray(qy_value, dtype=float)
+        lamda_list, dlamb_list = self.get_wave_list()
+        if tof is None:
+            tof = len(lamda_list) > 1
+        shape = np.broadcast(qx_value, qy_value).shape
+        variances = [np.zeros(shape) for _ in range(4)]
+        total_intensity = 0
+        for lam, dlam in zip(lamda_list, dlamb_list):
+            intens = self.setup_tof(lam, dlam)
+            if intens == 0:
+                continue
+            sigmas = self._compute_sigmas(lam, dlam, qx_value, qy_value,
+                                          tof)[2:]
+            for variance, sigma in zip(variances, sigmas):
+                variance += sigma * sigma * intens
+            total_intensity += intens
+        if total_intensity == 0:
+            # Don't calculate sigmas
+            return tuple(variances)
+        return tuple(np.sqrt(variance / total_intensity)
+                     for variance in variances)
+
+    def set_data_resolution(self, data, tof=None):
+        """
+        Fill dqx_data and dqy_data of a Data2D with the resolution at each
+        of its points, ready for smearing with PySmear2D in the default
+        polar coordinates: dqx_data holds the radial resolution, including
+        the wavelength contribution, and dqy_data the azimuthal one.
+
+        The geometric sigmas of compute_map are along x and y, so they are
+        rotated by the angle phi of each point.
+
+        : data: Data2D with qx_data and qy_data set
+        : tof: see compute_map
+
+        : return: data
+        """
+        sigma_1, sigma_2, sigma_r, _ = self.compute_map(data.qx_data,
+                                                        data.qy_data, tof)
+        phi = np.arctan2(data.qy_data, data.qx_data)
+        cos2, sin2 = np.cos(phi)**2, np.sin(phi)**2
+        var_1, var_2 = sigma_1 * sigma_1, sigma_2 * sigma_2
+        data.dqx_data = np.sqrt(var_1 * cos2 + var_2 * sin2
+                                + sigma_r * sigma_r)
+        data.dqy_data = np.sqrt(var_1 * sin2 + var_2 * cos2)
+        return data
+
+    def _compute_sigmas(self, wavelength, wavelength_spread, qx_value,
+                        qy_value, tof=False):
+        """
+        Compute the Q resolution for a wavelength at a q point or at
+        arrays of q points
+
+        : return: qr_value, phi, sigma_1, sigma_2, sigma_r, sigma1d
+        """
         lamb = wavelength
         lamb_spread = wavelength_spread
         # the shape of wavelength distribution
@@ -229,15 +314,13 @@ class ResolutionCalculator(object):
             # triangular
             tof_factor = 1
         # Find polar values
-        qr_value, phi = self._get_polar_value(qx_value, qy_value)
+        qr_value = np.hypot(qx_value, qy_value)
+        phi = np.arctan2(qy_value, qx_value)
         # vacuum wave transfer
         knot = 2*pi/lamb
         # scattering angle theta; always true for plane detector
-        # aligned vertically to the ko direction
-        if qr_value > knot:
-            theta = pi/2
-        else:
-            theta = math.asin(qr_value/knot)
+        # aligned vertically to the ko direction; pi/2 when qr_value > knot
+        theta = np.arcsin(np.minimum(qr_value/knot, 1.0))
         # source aperture size
         rone = self.source_aperture_size
         # sample aperture size
@@ -259,15 +342,11 @@ class ResolutionCalculator(object):
         l1_cor = (l_ssa * l_two) / (l_sas + l_two)
         lp_cor = (l_ssa * l_two) / (l_one + l_two)
         # the radial distance to the pixel from the center of the detector
-        radius = math.tan(theta) * l_two
+        radius = np.tan(theta) * l_two
         #Lp = l_one*l_two/(l_one+l_two)
-        # default polar coordinate
-        comp1 = 'radial'
-        comp2 = 'phi'
-        # in the case of the cartesian coordinate
-        if coord == 'cartesian':
-            comp1 = 'x'
-            comp2 = 'y'
+        # the sigmas are in the cartesian coordinate
+        comp1 = 'x'
+        comp2 = 'y'
 
         # sigma in the radial/x direction
         # for source aperture
@@ -296,7 +375,7 @@ class ResolutionCalculator(object):
         #sigma_1 += sigma_wave_1
         # normalize
         sigma_1 = knot * sqrt(sigma_1 / 12)
-        sigma_r = knot * sqrt(sigma_wave_1 / (tof_factor *12))
+        sigma_r = knot * np.sqrt(sigma_wave_1 / (tof_factor *12))
         # sigma in the phi/y direction
         # for source apperture
         sigma_2 = self.get_variance(rone, l1_cor, phi, comp2)
@@ -328,12 +407,10 @@ class ResolutionCalculator(object):
         #sigma_2 += sigma_wave_2
         # normalize
         sigma_2 = knot * sqrt(sigma_2 / 12)
-        sigma1d = sqrt(variance_1d_1 + variance_1d_2)
-        # set sigmas
-        self.sigma_1 = sigma_1
-        self.sigma_lamd = sigma_r
-        self.sigma_2 = sigma_2
-        self.sigma_1d = sigma1d
+        sigma1d = np.sqrt(variance_1d_1 + variance_1d_2)
+        # the x and y components do not depend on q
+        sigma_1 = np.full_like(sigma1d, sigma_1)
+        sigma_2 = np.full_like(sigma1d, sigma_2)
         return qr_value, phi, sigma_1, sigma_2, sigma_r, sigma1d
 
     def _within_detector_range(self, qx_value, qy_value):
@@ -477,11 +554,11 @@ class ResolutionCalculator(object):
 
         # define sigma component direction
         if comp == 'radial':
-            phi_x = math.cos(phi)
-            phi_y = math.sin(phi)
+            phi_x = np.cos(phi)
+            phi_y = np.sin(phi)
         elif comp == 'phi':
-            phi_x = math.sin(phi)
-            phi_y = math.cos(phi)
+            phi_x = np.sin(phi)
+            phi_y = np.cos(phi)
         elif comp == 'x':
             phi_x = 1
             phi_y = 0
@@ -530,27 +607,27 @@ class ResolutionCalculator(object):
             return 0, 0
         else:
             # calculate sigma^2 for 1d
-            sigma1d = 2 * math.pow(radius/distance*spread, 2)
+            sigma1d = 2 * (radius/distance*spread)**2
             if comp == 'x':
-                sigma1d *= (math.cos(phi)*math.cos(phi))
+                sigma1d *= (np.cos(phi)*np.cos(phi))
             elif comp == 'y':
-                sigma1d *= (math.sin(phi)*math.sin(phi))
+                sigma1d *= (np.sin(phi)*np.sin(phi))
             else:
                 sigma1d *= 1
             # sigma^2 for 2d
             # shift the coordinate due to the gravitational shift
-            rad_x = radius * math.cos(phi)
-            rad_y = A_value - radius * math.sin(phi)
-            radius = math.sqrt(rad_x * rad_x + rad_y * rad_y)
+            rad_x = radius * np.cos(phi)
+            rad_y = A_value - radius * np.sin(phi)
+            radius = np.sqrt(rad_x * rad_x + rad_y * rad_y)
             # new phi
-            phi = math.atan2(-rad_y, rad_x)
+            phi = np.arctan2(-rad_y, rad_x)
             self.gravity_phi = phi
             # calculate sigma^2
-            sigma = 2 * math.pow(radius/distance*spread, 2)
+            sigma = 2 * (radius/distance*spread)**2
             if comp == 'x':
-                sigma *= (math.cos(phi)*math.cos(phi))
+                sigma *= (np.cos(phi)*np.cos(phi))
             elif comp == 'y':
-                sigma *= (math.sin(phi)*math.sin(phi))
+                sigma *= (np.sin(phi)*np.sin(phi))
             else:
                 sigma *= 1
 
@@ -8,6 +8,8 @@ import os
 import sys
 import copy
 import logging
+import threading
+import multiprocessing
 
 from periodictable import formula
 from periodictable import nsf
@@ -30,6 +32,9 @@ MFACTOR_MT = 2.3164E-9
 METER2ANG = 1.0E+10
 #Avogadro constant [1/mol]
 NA = 6.02214129e+23
+# Largest slope of sin(x)/x, so moving a pair distance by dr changes
+# sin(qr)/qr by at most SINC_SLOPE*q*|dr|
+SINC_SLOPE = 0.43619
 
 def mag2sld(mag, v_unit=None):
     """
@@ -78,6 +83,10 @@ class GenSAS(BaseComponent):
         self.data_mz = None
         self.data_vol = None #[A^3]
         self.is_avg = False
+        self.hist_bin_width = None #[A]
+        self.hist_coarse = None #[A]
+        self._hist = None
+        self.nthreads = 1
         ## Name of the model
         self.name = "GenSAS"
         ## Define parameters
@@ -110,6 +119,7 @@ class GenSAS(BaseComponent):
         if self.data_vol is None:
             raise TypeError("data_vol is missing")
         self.data_vol = volume
+        self._hist = None
 
     def set_is_avg(self, is_avg=False):
         """
@@ -117,6 +127,69 @@ class GenSAS(BaseComponent):
         """
         self.is_avg = is_avg
 
+    def set_threads(self, nthreads=1):
+        """
+        Sets the number of threads used for the calculation.  The q points
+        are split between the threads; 0 or None uses one per cpu.
+        :Param nthreads: number of threads [int]
+        """
+        if not nthreads:
+            nthreads = multiprocessing.cpu_count()
+        if nthreads < 0:
+            raise ValueError("nthreads must not be negative")
+        self.nthreads = int(nthreads)
+
+    def set_histogram(self, bin_width=None, coarse=None):
+        """
+        Use a histogram of pair distances for the full 1D calculation.
+
+        The exact calculation sums over all pixel pairs for every q.  With
+        a bin width the pairs are binned by distance once and I(q) is
+        computed from the histogram, which is much faster for large
+        structures or many q points.  Pixels can also be merged into cubic
+        cells of side *coarse* before binning.  Use :meth:`get_error_bound`
+        to see how far the result can be from the exact sum.
+
+        :Param bin_width: histogram bin width [A], None for the exact sum
+        :Param coarse: cell size for coarse graining [A], None to keep pixels
+        """
+        if bin_width is not None and bin_width <= 0:
+            raise ValueError("bin_width must be positive")
+        if coarse is not None and coarse <= 0:
+            raise ValueError("coarse must be positive")
+        self.hist_bin_width = bin_width
+        self.hist_coarse = coarse
+        self._hist = None
+
+    def get_error_bound(self, q):
+        """
+        Upper bound on the difference between the histogram result and
+        the exact sum at *q*, in the units of the model.  Zero when the
+        exact calculation is used.
+        :Param q: array of q values
+        """
+        q = _vec(q)
+        if not self.hist_bin_width or self.is_avg:
+            return np.zeros_like(q)
+        vol_correction = self.data_total_volume / self.params['total_volume']
+        return (self.params['scale'] * vol_correction
+                * self._get_histogram().error_bound(q))
+
+    def _get_histogram(self):
+        """
+        Return the pair distance histogram for the current data and solvent,
+        building it if needed.
+        """
+        key = (self.params['solvent_SLD'], self.hist_bin_width,
+               self.hist_coarse)
+        if self._hist is None or self._hist[0] != key:
+            sldn = self.data_sldn - self.params['solvent_SLD']
+            hist = DistanceHistogram(self.data_x, self.data_y, self.data_z,
+                                     sldn, self.data_vol,
+                                     self.hist_bin_width, self.hist_coarse)
+            self._hist = key, hist
+        return self._hist[1]
+
     def _gen(self, qx, qy):
         """
         Evaluate the function
@@ -125,6 +198,11 @@ class GenSAS(BaseComponent):
         :Param i: array of initial i-value
         :return: function value
         """
+        if self.hist_bin_width and not self.is_avg and not len(qy):
+            I_out = self._get_histogram().evaluate(_vec(qx))
+            vol_correction = self.data_total_volume / self.params['total_volume']
+            return (self.params['scale'] * vol_correction * I_out
+                    + self.params['background'])
         pos_x = self.data_x
         pos_y = self.data_y
         pos_z = self.data_z
@@ -149,12 +227,12 @@ class GenSAS(BaseComponent):
             qx, qy = _vec(qx), _vec(qy)
             I_out = np.empty_like(qx)
             #print("npoints", qx.shape, "npixels", pos_x.shape)
-            _sld2i.genicomXY(model, qx, qy, I_out)
+            _run_threaded(self.nthreads, _sld2i.genicomXY, model, qx, qy, I_out)
             #print("I_out after", I_out)
         else:
             qx = _vec(qx)
             I_out = np.empty_like(qx)
-            _sld2i.genicom(model, qx, I_out)
+            _run_threaded(self.nthreads, _sld2i.genicom, model, qx, I_out)
         vol_correction = self.data_total_volume / self.params['total_volume']
         result = (self.params['scale'] * vol_correction * I_out
                   + self.params['background'])
@@ -176,6 +254,7 @@ class GenSAS(BaseComponent):
         self.data_vol = _vec(sld_data.vol_pix)
         self.data_total_volume = sum(sld_data.vol_pix)
         self.params['total_volume'] = sum(sld_data.vol_pix)
+        self._hist = None
 
     def getProfile(self):
         """
@@ -231,6 +310,130 @@ class GenSAS(BaseComponent):
 def _vec(v):
     return np.ascontiguousarray(v, 'd')
 
+def _run_threaded(nthreads, fn, model, *vectors):
+    """
+    Call the sld2i function *fn* on contiguous slices of the q and output
+    *vectors*, one slice per thread.  The C code releases the GIL so the
+    slices are computed in parallel.  Each q point is independent, so the
+    result does not depend on the number of threads.
+    """
+    npoints = len(vectors[0])
+    nthreads = max(1, min(nthreads, npoints))
+    if nthreads == 1:
+        fn(model, *vectors)
+        return
+    errors = []
+    def _call(*args):
+        try:
+            fn(*args)
+        except Exception as exc:
+            errors.append(exc)
+    edges = np.linspace(0, npoints, nthreads + 1).astype(int)
+    threads = [threading.Thread(target=_call,
+                                args=(model,) + tuple(v[lo:hi] for v in vectors))
+               for lo, hi in zip(edges[:-1], edges[1:])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+class DistanceHistogram(object):
+    """
+    Histogram of pixel pair distances for the isotropic 1D calculation.
+
+    Each pair of pixels j, k contributes b_j b_k sin(q r_jk)/(q r_jk) to
+    I(q), with b = sld*volume.  Binning the pair weights by distance is
+    O(npix^2) but done only once; I(q) then costs O(nbins) per q point
+    with each bin evaluated at its centre.  Before binning, pixels can be
+    merged into cubic cells of side *coarse*, each cell carrying the summed
+    weight of its pixels at their weighted centre.
+    """
+    def __init__(self, pos_x, pos_y, pos_z, sldn, vol, bin_width,
+                 coarse=None):
+        sldn, vol = _vec(sldn), _vec(vol)
+        # Normalization uses the volume of all pixels, as in genicom
+        self.volume = np.sum(vol)
+        self.bin_width = bin_width
+        # Bound the pair weights by the total absolute weight before merging
+        self.abs_total = np.sum(np.abs(sldn*vol))**2
+        self.shift = 0.0
+        if coarse:
+            pos_x, pos_y, pos_z, sldn, vol, self.shift = coarse_grain(
+                pos_x, pos_y, pos_z, sldn, vol, coarse)
+        pos_x, pos_y, pos_z = _vec(pos_x), _vec(pos_y), _vec(pos_z)
+        self.npix = len(pos_x)
+        extent = [np.ptp(v) if len(v) else 0. for v in (pos_x, pos_y, pos_z)]
+        nbins = int(np.sqrt(np.sum(np.square(extent))) / bin_width) + 1
+        self.r = (np.arange(nbins) + 0.5) * bin_width
+        self.hist = np.zeros(nbins)
+        self.abs_hist = np.zeros(nbins)
+        zeros = np.zeros_like(pos_x)
+        # **** WARNING **** new_GenI holds pointers to the numpy vectors;
+        # they must stay alive until genhist returns.
+        model = _sld2i.new_GenI(0, pos_x, pos_y, pos_z, sldn,
+                                zeros, zeros, zeros, vol, 1.0, 1.0, 0.0)
+        self.zero = _sld2i.genhist(model, bin_width, self.hist, self.abs_hist)
+
+    def evaluate(self, q):
+        """
+        Return I(q) in the units of genicom.
+        """
+        # np.sinc(x) is sin(pi x)/(pi x)
+        sinc = np.sinc(np.outer(q, self.r) / np.pi)
+        return (self.zero + np.dot(sinc, self.hist)) * (1.0E+8 / self.volume)
+
+    def error_bound(self, q):
+        """
+        Return the largest possible difference from the exact sum at *q*.
+
+        Binning moves each pair distance by at most half a bin and merging
+        moves it by at most twice the largest shift of a pixel to its cell
+        centre; sin(qr)/qr changes by at most SINC_SLOPE*q per unit of r.
+        """
+        moved = (0.5 * self.bin_width * np.sum(self.abs_hist)
+                 + 2.0 * self.shift * self.abs_total)
+        bound = SINC_SLOPE * np.abs(q) * moved
+        # No pair can contribute more than twice its absolute weight
+        bound = np.minimum(bound, 2.0 * self.abs_total)
+        return bound * (1.0E+8 / self.volume)
+
+def coarse_grain(pos_x, pos_y, pos_z, sldn, vol, cell):
+    """
+    Merge the pixels in each cubic cell of side *cell*.
+
+    The merged pixel has the total volume and total sld*volume of the cell,
+    placed at the centre of the cell weighted by abs(sld*volume) (or by
+    volume if the cell does not scatter).
+
+    :return: pos_x, pos_y, pos_z, sld, vol of the merged pixels and the
+        largest distance of a scattering pixel from its merged position
+    """
+    pos = np.column_stack((pos_x, pos_y, pos_z))
+    if not len(pos):
+        return pos_x, pos_y, pos_z, sldn, vol, 0.0
+    grid = np.floor((pos - pos.min(axis=0)) / cell).astype(int)
+    _, index = np.unique(grid, axis=0, return_inverse=True)
+    index = index.ravel()
+    ncell = index.max() + 1
+    weight = np.abs(sldn * vol)
+    cell_vol = np.bincount(index, vol, ncell)
+    cell_b = np.bincount(index, sldn * vol, ncell)
+    cell_weight = np.bincount(index, weight, ncell)
+    # Cells which do not scatter are centred by volume instead
+    empty = (cell_weight == 0)[index]
+    weight = np.where(empty, vol, weight)
+    cell_weight = np.bincount(index, weight, ncell)
+    centre = np.column_stack([np.bincount(index, weight * p, ncell)
+                              for p in pos.T]) / cell_weight[:, None]
+    shift = np.sqrt(np.sum((pos - centre[index])**2, axis=1))
+    shift = np.max(shift[~empty]) if np.any(~empty) else 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cell_sld = np.where(cell_vol > 0, cell_b / cell_vol, 0.0)
+    return (centre[:, 0], centre[:, 1], centre[:, 2], cell_sld, cell_vol,
+            shift)
+
 class OMF2SLD(object):
     """
     Convert OMFData to MAgData
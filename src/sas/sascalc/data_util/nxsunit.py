@@ -21,6 +21,12 @@ Usage example::
     u = nxsunit.Converter('mili*metre')  # Units stored in mm
     v = u(3000,'m')  # Convert the value 3000 mm into meters
 
+Readers converting many values should use the cached forms, which build
+each converter and conversion factor once per process::
+
+    u = nxsunit.get_converter('mili*metre')
+    v = nxsunit.convert(values, 'mili*metre', 'm')  # one multiply per array
+
 NeXus example::
 
     # Load sample orientation in radians regardless of how it is stored.
@@ -51,7 +57,9 @@ inferring the dimension from an example unit.
 from __future__ import division
 import math
 
-__all__ = ['Converter']
+import numpy as np
+
+__all__ = ['Converter', 'get_converter', 'conversion_factor', 'convert']
 
 # Limited form of units for returning objects of a specific type.
 # Maybe want to do full units handling with e.g., pyre's
@@ -187,6 +195,67 @@ class Converter(object):
             possible_units = ", ".join(str(k) for k in self.scalemap.keys())
             raise KeyError("%s not in %s"%(units,possible_units))
 
+# Converters by unit name, and conversion factors by (from, to) unit names,
+# built on first use
+_converters = {}
+_factors = {}
+
+def get_converter(name):
+    """
+    Return the Converter for values stored in units *name*, building it only
+    the first time it is asked for.
+
+    Raises KeyError if the unit is unknown.
+    """
+    try:
+        return _converters[name]
+    except KeyError:
+        converter = _converters[name] = Converter(name)
+        return converter
+    except TypeError:
+        # Unhashable unit name
+        return Converter(name)
+
+def conversion_factor(from_unit, to_unit):
+    """
+    Return the factor converting values in *from_unit* to *to_unit*, or None
+    if the values are returned unchanged because either unit is empty or
+    arbitrary.
+
+    Raises KeyError if either unit is unknown or the units are of different
+    dimensions.
+    """
+    key = (from_unit, to_unit)
+    try:
+        return _factors[key]
+    except KeyError:
+        pass
+    converter = get_converter(from_unit)
+    if to_unit == "" or converter.scalemap is None:
+        factor = None
+    else:
+        factor = converter.scale(to_unit)
+    _factors[key] = factor
+    return factor
+
+def convert(value, from_unit, to_unit):
+    """
+    Convert *value* from *from_unit* to *to_unit*, as
+    Converter(from_unit)(value, units=to_unit) does, using the cached
+    conversion factor. Sequences are converted to arrays, so that all the
+    values are converted with a single multiply.
+    """
+    try:
+        factor = conversion_factor(from_unit, to_unit)
+    except KeyError:
+        # Raise the same error as the converter
+        return Converter(from_unit)(value, units=to_unit)
+    if factor is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        value = np.asarray(value, dtype=float)
+    return value * factor
+
 def _check(expect,get):
     if expect != get:
         raise ValueError("Expected %s but got %s"%(expect, get))
@@ -209,6 +278,24 @@ def test():
     else:
         raise Exception("unknown unit did not raise an error")
 
+    # Cached converters and conversion factors
+    _check(True, get_converter('mm') is get_converter('mm'))
+    _check(1,convert(10,'n_m^-1','invA'))
+    _check(0.5,convert(1800,'seconds','hours'))
+    _check(0.5,convert(1800,'seconds','hours')) # from the cache
+    _check(None,conversion_factor('a.u.','mm'))
+    _check(None,conversion_factor('mm',''))
+    _check([2.0, 4.0],list(convert([2000, 4000],'mm','m')))
+    _check(True,np.array_equal(convert(np.array([0.1, 0.2]),'1/nm','1/A'),
+                               Converter('1/nm')(np.array([0.1, 0.2]),'1/A')))
+    for bad in [('help','m'), ('mm','s')]:
+        try:
+            convert(1,*bad)
+        except KeyError:
+            pass
+        else:
+            raise Exception("bad conversion did not raise an error")
+
     # TODO: more tests
 
 if __name__ == "__main__":
@@ -24,8 +24,6 @@ from __future__ import print_function
 #from sas.guitools.plottables import Data1D as plottable_1D
 from sas.sascalc.data_util.uncertainty import Uncertainty
 import numpy as np
-import math
-from math import fabs
 
 class plottable_1D(object):
     """
@@ -805,10 +803,10 @@ class Data1D(plottable_1D, DataInfo):
                 raise ValueError(msg)
             # Here we could also extrapolate between data points
             TOLERANCE = 0.01
-            for i in range(len(self.x)):
-                if fabs(self.x[i] - other.x[i]) > self.x[i]*TOLERANCE:
-                    msg = "Incompatible data sets: x-values do not match"
-                    raise ValueError(msg)
+            x = np.asarray(self.x)
+            if np.any(np.fabs(x - np.asarray(other.x)) > x*TOLERANCE):
+                msg = "Incompatible data sets: x-values do not match"
+                raise ValueError(msg)
 
             # Check that the other data set has errors, otherwise
             # create zero vector
@@ -837,37 +835,46 @@ class Data1D(plottable_1D, DataInfo):
             result.dxl = None
         else:
             result.dxl = np.zeros(len(self.x))
-
-        for i in range(len(self.x)):
-            result.x[i] = self.x[i]
-            if self.dx is not None and len(self.x) == len(self.dx):
-                result.dx[i] = self.dx[i]
-            if self.dxw is not None and len(self.x) == len(self.dxw):
-                result.dxw[i] = self.dxw[i]
-            if self.dxl is not None and len(self.x) == len(self.dxl):
-                result.dxl[i] = self.dxl[i]
-
-            a = Uncertainty(self.y[i], dy[i]**2)
-            if isinstance(other, Data1D):
-                b = Uncertainty(other.y[i], dy_other[i]**2)
-                if other.dx is not None:
-                    result.dx[i] *= self.dx[i]
-                    result.dx[i] += (other.dx[i]**2)
-                    result.dx[i] /= 2
-                    result.dx[i] = math.sqrt(result.dx[i])
-                if result.dxl is not None and other.dxl is not None:
-                    result.dxl[i] *= self.dxl[i]
-                    result.dxl[i] += (other.dxl[i]**2)
-                    result.dxl[i] /= 2
-                    result.dxl[i] = math.sqrt(result.dxl[i])
-            else:
-                b = other
-
-            output = operation(a, b)
-            result.y[i] = output.x
-            result.dy[i] = math.sqrt(math.fabs(output.variance))
+        self._operate_on_arrays(result, other, operation, dy, dy_other)
         return result
 
+    def _operate_on_arrays(self, result, other, operation, dy, dy_other):
+        """
+        Fill the arrays of result, which have the length of this data set,
+        with the outcome of the operation. The operation is applied to
+        whole arrays at once rather than point by point.
+
+        :param result: data set receiving the output
+        :param other: other data set or scalar
+        :param operation: function defining the operation
+        :param dy, dy_other: errors returned by _validity_check
+        """
+        result.x[:] = self.x
+        if self.dx is not None and len(self.x) == len(self.dx):
+            result.dx[:] = self.dx
+        if self.dxw is not None and len(self.x) == len(self.dxw):
+            result.dxw[:] = self.dxw
+        if self.dxl is not None and len(self.x) == len(self.dxl):
+            result.dxl[:] = self.dxl
+
+        a = Uncertainty(np.asarray(self.y, 'd'), np.asarray(dy, 'd')**2)
+        if isinstance(other, Data1D):
+            b = Uncertainty(np.asarray(other.y, 'd'),
+                            np.asarray(dy_other, 'd')**2)
+            if other.dx is not None:
+                result.dx = _combine_resolution(result.dx, self.dx, other.dx)
+            if result.dxl is not None and other.dxl is not None:
+                result.dxl = _combine_resolution(result.dxl, self.dxl,
+                                                 other.dxl)
+        else:
+            b = other
+
+        output = operation(a, b)
+        result.y[:] = output.x
+        if result.dy is None:
+            result.dy = np.zeros(len(self.x))
+        result.dy[:] = np.sqrt(np.fabs(output.variance))
+
     def _validity_check_union(self, other):
         """
         Checks that the data lengths are compatible.
@@ -891,41 +898,22 @@ class Data1D(plottable_1D, DataInfo):
         # First, check the data compatibility
         self._validity_check_union(other)
         result = self.clone_without_data(len(self.x) + len(other.x))
-        if self.dy is None or other.dy is None:
-            result.dy = None
-        else:
-            result.dy = np.zeros(len(self.x) + len(other.x))
-        if self.dx is None or other.dx is None:
-            result.dx = None
-        else:
-            result.dx = np.zeros(len(self.x) + len(other.x))
-        if self.dxw is None or other.dxw is None:
-            result.dxw = None
-        else:
-            result.dxw = np.zeros(len(self.x) + len(other.x))
-        if self.dxl is None or other.dxl is None:
-            result.dxl = None
-        else:
-            result.dxl = np.zeros(len(self.x) + len(other.x))
 
-        result.x = np.append(self.x, other.x)
+        x = np.append(self.x, other.x)
         #argsorting
-        ind = np.argsort(result.x)
-        result.x = result.x[ind]
-        result.y = np.append(self.y, other.y)
-        result.y = result.y[ind]
-        if result.dy is not None:
-            result.dy = np.append(self.dy, other.dy)
-            result.dy = result.dy[ind]
-        if result.dx is not None:
-            result.dx = np.append(self.dx, other.dx)
-            result.dx = result.dx[ind]
-        if result.dxw is not None:
-            result.dxw = np.append(self.dxw, other.dxw)
-            result.dxw = result.dxw[ind]
-        if result.dxl is not None:
-            result.dxl = np.append(self.dxl, other.dxl)
-            result.dxl = result.dxl[ind]
+        ind = np.argsort(x)
+
+        def merge(this, that):
+            if this is None or that is None:
+                return None
+            return np.append(this, that)[ind]
+
+        result.x = x[ind]
+        result.y = merge(self.y, other.y)
+        result.dy = merge(self.dy, other.dy)
+        result.dx = merge(self.dx, other.dx)
+        result.dxw = merge(self.dxw, other.dxw)
+        result.dxl = merge(self.dxl, other.dxl)
         return result
 
 
@@ -1037,13 +1025,19 @@ class Data2D(plottable_2D, DataInfo):
                 len(self.qy_data) != len(other.qy_data):
                 msg = "Unable to perform operation: data length are not equal"
                 raise ValueError(msg)
-            for ind in range(len(self.data)):
-                if fabs(self.qx_data[ind] - other.qx_data[ind]) > fabs(self.qx_data[ind])*TOLERANCE:
-                    msg = "Incompatible data sets: qx-values do not match: %s %s" % (self.qx_data[ind], other.qx_data[ind])
-                    raise ValueError(msg)
-                if fabs(self.qy_data[ind] - other.qy_data[ind]) > fabs(self.qy_data[ind])*TOLERANCE:
-                    msg = "Incompatible data sets: qy-values do not match: %s %s" % (self.qy_data[ind], other.qy_data[ind])
-                    raise ValueError(msg)
+            qx, qx_other = np.asarray(self.qx_data), np.asarray(other.qx_data)
+            qy, qy_other = np.asarray(self.qy_data), np.asarray(other.qy_data)
+            bad_qx = np.fabs(qx - qx_other) > np.fabs(qx)*TOLERANCE
+            bad_qy = np.fabs(qy - qy_other) > np.fabs(qy)*TOLERANCE
+            # Report the first point that does not match
+            bad = np.flatnonzero(bad_qx | bad_qy)
+            if len(bad) > 0:
+                ind = bad[0]
+                if bad_qx[ind]:
+                    msg = "Incompatible data sets: qx-values do not match: %s %s" % (qx[ind], qx_other[ind])
+                else:
+                    msg = "Incompatible data sets: qy-values do not match: %s %s" % (qy[ind], qy_other[ind])
+                raise ValueError(msg)
 
             # Check that the scales match
             err_other = other.err_data
@@ -1055,7 +1049,7 @@ class Data2D(plottable_2D, DataInfo):
         err = self.err_data
         if self.err_data is None or \
             (len(self.err_data) != len(self.data)):
-            err = np.zeros(len(other.data))
+            err = np.zeros(len(self.data))
         return err, err_other
 
     def _perform_operation(self, other, operation):
@@ -1074,42 +1068,52 @@ class Data2D(plottable_2D, DataInfo):
         else:
             result.dqx_data = np.zeros(len(self.data))
             result.dqy_data = np.zeros(len(self.data))
-        for i in range(np.size(self.data)):
-            result.data[i] = self.data[i]
-            if self.err_data is not None and \
-                            np.size(self.data) == np.size(self.err_data):
-                result.err_data[i] = self.err_data[i]
-            if self.dqx_data is not None:
-                result.dqx_data[i] = self.dqx_data[i]
-            if self.dqy_data is not None:
-                result.dqy_data[i] = self.dqy_data[i]
-            result.qx_data[i] = self.qx_data[i]
-            result.qy_data[i] = self.qy_data[i]
-            result.q_data[i] = self.q_data[i]
-            result.mask[i] = self.mask[i]
-
-            a = Uncertainty(self.data[i], dy[i]**2)
-            if isinstance(other, Data2D):
-                b = Uncertainty(other.data[i], dy_other[i]**2)
-                if other.dqx_data is not None and \
-                        result.dqx_data is not None:
-                    result.dqx_data[i] *= self.dqx_data[i]
-                    result.dqx_data[i] += (other.dqx_data[i]**2)
-                    result.dqx_data[i] /= 2
-                    result.dqx_data[i] = math.sqrt(result.dqx_data[i])
-                if other.dqy_data is not None and \
-                        result.dqy_data is not None:
-                    result.dqy_data[i] *= self.dqy_data[i]
-                    result.dqy_data[i] += (other.dqy_data[i]**2)
-                    result.dqy_data[i] /= 2
-                    result.dqy_data[i] = math.sqrt(result.dqy_data[i])
-            else:
-                b = other
-            output = operation(a, b)
-            result.data[i] = output.x
-            result.err_data[i] = math.sqrt(math.fabs(output.variance))
+        self._operate_on_arrays(result, other, operation, dy, dy_other)
         return result
 
+    def _operate_on_arrays(self, result, other, operation, dy, dy_other):
+        """
+        Fill the arrays of result, which have the length of this data set,
+        with the outcome of the operation. The operation is applied to
+        whole arrays at once rather than point by point.
+
+        :param result: data set receiving the output
+        :param other: other data set or scalar
+        :param operation: function defining the operation
+        :param dy, dy_other: errors returned by _validity_check
+        """
+        if self.err_data is not None and \
+                        np.size(self.data) == np.size(self.err_data):
+            result.err_data[:] = self.err_data
+        if result.dqx_data is not None and self.dqx_data is not None:
+            result.dqx_data[:] = self.dqx_data
+        if result.dqy_data is not None and self.dqy_data is not None:
+            result.dqy_data[:] = self.dqy_data
+        result.qx_data[:] = self.qx_data
+        result.qy_data[:] = self.qy_data
+        result.q_data[:] = self.q_data
+        result.mask[:] = self.mask
+
+        a = Uncertainty(np.asarray(self.data, 'd'), np.asarray(dy, 'd')**2)
+        if isinstance(other, Data2D):
+            b = Uncertainty(np.asarray(other.data, 'd'),
+                            np.asarray(dy_other, 'd')**2)
+            if other.dqx_data is not None and \
+                    result.dqx_data is not None:
+                result.dqx_data = _combine_resolution(
+                    result.dqx_data, self.dqx_data, other.dqx_data)
+            if other.dqy_data is not None and \
+                    result.dqy_data is not None:
+                result.dqy_data = _combine_resolution(
+                    result.dqy_data, self.dqy_data, other.dqy_data)
+        else:
+            b = other
+        output = operation(a, b)
+        result.data[:] = output.x
+        if result.err_data is None:
+            result.err_data = np.zeros(len(self.data))
+        result.err_data[:] = np.sqrt(np.fabs(output.variance))
+
     def _validity_check_union(self, other):
         """
         Checks that the data lengths are compatible.
@@ -1167,6 +1171,18 @@ class Data2D(plottable_2D, DataInfo):
         return result
 
 
+def _combine_resolution(result, this, other):
+    """
+    Combine the resolutions of two data sets for an operation between them.
+
+    :param result: resolution copied to the result, or zeros if missing
+    :param this: resolution of the first data set
+    :param other: resolution of the second data set
+    :return: sqrt((result*this + other**2)/2) for each point
+    """
+    return np.sqrt((result*np.asarray(this) + np.asarray(other)**2)/2)
+
+
 def combine_data_info_with_plottable(data, datainfo):
     """
     A function that combines the DataInfo data in self.current_datainto with a
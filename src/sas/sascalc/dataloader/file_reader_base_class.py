@@ -15,7 +15,7 @@ from .loader_exceptions import NoKnownLoaderException, FileContentsException,\
     DataReaderException, DefaultReaderException
 from .data_info import Data1D, Data2D, DataInfo, plottable_1D, plottable_2D,\
     combine_data_info_with_plottable
-from sas.sascalc.data_util.nxsunit import Converter
+from sas.sascalc.data_util.nxsunit import get_converter
 
 logger = logging.getLogger(__name__)
 
@@ -317,12 +317,12 @@ class FileReader(object):
         convert_q = True
         new_output = []
         for data in self.output:
-            if data.isSesans:
+            if not isinstance(data, (Data1D, Data2D)) or data.isSesans:
                 new_output.append(data)
                 continue
             try:
                 file_x_unit = data._xunit
-                data_conv_x = Converter(file_x_unit)
+                data_conv_x = get_converter(file_x_unit)
             except KeyError:
                 logger.info("Unrecognized Q units in data file. No data "
                             "conversion attempted")
@@ -352,7 +352,7 @@ class FileReader(object):
                                                         units=default_q_unit)
                         try:
                             file_y_unit = data._yunit
-                            data_conv_y = Converter(file_y_unit)
+                            data_conv_y = get_converter(file_y_unit)
                             data.qy_data = data_conv_y(data.qy_data,
                                                        units=default_q_unit)
                             if data.dqy_data is not None:
@@ -0,0 +1,138 @@
+"""
+    Detection of the format of a data file from its first bytes, so it can
+    be sent to the right reader without trying the others in turn.
+"""
+import re
+
+from .readers import ascii_reader
+
+# Number of bytes read from the start of a file to find its format
+SNIFF_SIZE = 4096
+# Format signature at the start of the HDF5 superblock, which may follow a
+# user block of 512, 1024, 2048... bytes
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+# XML comments, which may hold tags, before the root element
+XML_COMMENT = re.compile(br'<!--.*?-->', re.DOTALL)
+# The first tag that is not a declaration or a processing instruction
+XML_ROOT = re.compile(br'<(?![?!])(?:[\w.-]+:)?([\w.-]+)')
+# Little and big endian TIFF and BigTIFF headers
+TIFF_SIGNATURES = (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+')
+
+# Formats returned by sniff_format
+HDF5 = 'hdf5'
+CANSAS_XML = 'cansas_xml'
+TIFF = 'tiff'
+SESANS = 'sesans'
+ASCII = 'ascii'
+
+
+def read_head(path, size=SNIFF_SIZE):
+    """
+    Read the first bytes of a file.
+
+    :param path: The path to the file
+    :param size: The number of bytes to read
+    :return: The bytes read, or None if the file cannot be read
+    """
+    try:
+        with open(path, 'rb') as f_open:
+            return f_open.read(size)
+    except (IOError, OSError):
+        return None
+
+
+def is_hdf5(head):
+    """
+    Check for the HDF5 signature in the first bytes of a file.
+    """
+    offset = 0
+    while offset + len(HDF5_SIGNATURE) <= len(head):
+        if head.startswith(HDF5_SIGNATURE, offset):
+            return True
+        offset = 512 if offset == 0 else 2 * offset
+    return False
+
+
+def xml_root(head):
+    """
+    Find the name of the root element of an XML document, without its
+    namespace prefix.
+
+    :param head: The first bytes of the file
+    :return: The root element name, or None if the file is not XML
+    """
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n')
+    if not text.startswith(b'<'):
+        return None
+    match = XML_ROOT.search(XML_COMMENT.sub(b'', text))
+    if match is None:
+        # The prolog is longer than the bytes read
+        return ''
+    return match.group(1).decode('ascii', 'replace')
+
+
+def text_lines(head):
+    """
+    Split the first bytes of a file into lines of text.
+
+    :param head: The first bytes of the file
+    :return: The complete lines, or None if the file is binary
+    """
+    if b'\x00' in head:
+        return None
+    lines = head.decode('latin-1').splitlines()
+    if len(head) == SNIFF_SIZE:
+        # The last line may be cut short
+        lines = lines[:-1]
+    return lines
+
+
+def has_data_block(lines):
+    """
+    Check the lines hold a block of numerical data the ASCII reader accepts.
+    """
+    reader = ascii_reader.Reader()
+    rows, _ = reader._find_data_block(lines)
+    return len(rows) >= reader.min_data_pts
+
+
+def is_sesans(lines):
+    """
+    Check for the FileFormatVersion entry in the header of a SESANS file.
+    """
+    for line in lines:
+        terms = line.split()
+        if terms and terms[0] == 'BEGIN_DATA':
+            break
+        if len(terms) >= 2 and terms[0] == 'FileFormatVersion':
+            return True
+    return False
+
+
+def sniff_format(path):
+    """
+    Find the format of a data file from its first bytes.
+
+    :param path: The path to the file
+    :return: HDF5, CANSAS_XML, TIFF, SESANS, ASCII for text with a block of
+        numerical data, or None if the format is not recognised
+    """
+    head = read_head(path)
+    if not head:
+        return None
+    if is_hdf5(head):
+        return HDF5
+    if head[:4] in TIFF_SIGNATURES:
+        return TIFF
+    root = xml_root(head)
+    if root is not None:
+        # An unknown root may still be SASroot, past the bytes read
+        return CANSAS_XML if root in ('SASroot', '') else None
+    lines = text_lines(head)
+    if lines is None:
+        return None
+    if is_sesans(lines):
+        return SESANS
+    if has_data_block(lines):
+        return ASCII
+    return None
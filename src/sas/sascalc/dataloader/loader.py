@@ -24,6 +24,12 @@ import os
 import sys
 import logging
 import time
+import copy
+import threading
+import functools
+import multiprocessing
+from collections import Counter
+from multiprocessing.pool import ThreadPool
 from zipfile import ZipFile
 
 from sas.sascalc.data_util.registry import ExtensionRegistry
@@ -35,9 +41,65 @@ from .loader_exceptions import NoKnownLoaderException, FileContentsException,\
 from .readers import ascii_reader
 from .readers import cansas_reader
 from .readers import cansas_reader_HDF5
+from .readers import sesans_reader
+from .readers import tiff_reader
+from . import file_sniffer
 
 logger = logging.getLogger(__name__)
 
+# Default reader for each format recognised by file_sniffer
+SNIFFED_READERS = {
+    file_sniffer.HDF5: cansas_reader_HDF5,
+    file_sniffer.CANSAS_XML: cansas_reader,
+    file_sniffer.SESANS: sesans_reader,
+    file_sniffer.TIFF: tiff_reader,
+}
+# Readers for binary formats, which cannot read a file sniffed as another
+# format
+BINARY_READERS = {
+    file_sniffer.HDF5: cansas_reader_HDF5,
+    file_sniffer.TIFF: tiff_reader,
+}
+
+# Registry used by the load_many worker in each thread or process
+_worker = threading.local()
+
+
+def _new_reader(fn):
+    """
+    Return the reader method fn bound to a new instance of its reader, so
+    that files loaded at the same time do not share reader state.
+    """
+    reader = getattr(fn, '__self__', None)
+    if reader is None:
+        return fn
+    try:
+        return getattr(type(reader)(), fn.__name__)
+    except Exception:
+        return fn
+
+
+def _init_worker(registry):
+    """
+    Give the load_many worker its own copy of the registry.
+    """
+    _worker.registry = registry.copy()
+
+
+def _load_file(args):
+    """
+    Load one file with the registry of the worker.
+
+    :param args: (path, format)
+    :return: path, output, error - the list of data sets, or None and the
+        exception raised while loading the file
+    """
+    path, format = args
+    try:
+        return path, _worker.registry.load(path, format), None
+    except Exception as exc:
+        return path, None, exc
+
 
 class Registry(ExtensionRegistry):
     """
@@ -56,6 +118,12 @@ class Registry(ExtensionRegistry):
         # Creation time, for testing
         self._created = time.time()
 
+        # Counts of the formats found by file_sniffer ('unknown' if none was
+        # found), of the files it checked ('files'), of the reader calls
+        # made ('reads') and failed ('failed_reads'), and of the reader calls
+        # the format found made unnecessary ('skipped_reads')
+        self.detection_stats = Counter()
+
         # Register default readers
         readers.read_associations(self)
 
@@ -68,15 +136,39 @@ class Registry(ExtensionRegistry):
             of a particular reader
         :param debug: when True, print the traceback for each loader that fails
 
+        Files recognised from their contents as HDF5, cansas XML, SESANS or
+        TIFF are read by the reader for that format only, unless a plugin
+        reader was registered for the file's extension.
+
         Defaults to the ascii (multi-column), cansas XML, and cansas NeXuS
-        readers if no reader was registered for the file's extension.
+        readers if no reader was registered for the file's extension. When
+        format is None, the cansas XML and cansas NeXuS readers are only
+        tried if the contents of the file match their format.
         """
         import traceback
 
+        file_format = None
+        if format is None:
+            file_format = file_sniffer.sniff_format(path)
+            self.detection_stats['files'] += 1
+            self.detection_stats[file_format or 'unknown'] += 1
+            if (file_format in SNIFFED_READERS
+                    and self._default_reader_for(path)):
+                return self._load_sniffed(path, file_format, debug)
+
         # Gets set to a string if the file has an associated reader that fails
         msg_from_reader = None
         try:
-            return super(Registry, self).load(path, format=format)
+            if format is None and self._binary_reader_for(path, file_format):
+                # The associated reader cannot read the contents
+                self.detection_stats['skipped_reads'] += 1
+                raise NoKnownLoaderException("No loaders match contents of %r"
+                                             % path)
+            load = functools.partial(super(Registry, self).load, format=format)
+            if format is None and not self.lookup(path):
+                # No associated reader to call
+                return load(path)
+            return self._read(load, path)
         #except Exception: raise  # for debugging, don't use fallback loader
         except NoKnownLoaderException as nkl_e:
             if debug: traceback.print_exc()
@@ -92,59 +184,194 @@ class Registry(ExtensionRegistry):
 
         # File has no associated reader, or the associated reader failed.
         # Try the ASCII reader
-        try:
-            ascii_loader = ascii_reader.Reader()
-            return ascii_loader.read(path)
-        except NoKnownLoaderException:
-            if debug: traceback.print_exc()
-            pass  # Try the Cansas XML reader
-        except DefaultReaderException:
-            if debug: traceback.print_exc()
-            pass  # Loader specific error to try the cansas XML reader
-        except FileContentsException as e:
-            if debug: traceback.print_exc()
-            if msg_from_reader is None:
-                raise RuntimeError(e.message)
+        if (msg_from_reader is not None
+                and ascii_reader.__name__ in self._reader_modules(path)):
+            # The ASCII reader already failed as the associated reader
+            self.detection_stats['skipped_reads'] += 1
+        else:
+            try:
+                ascii_loader = ascii_reader.Reader()
+                return self._read(ascii_loader.read, path)
+            except NoKnownLoaderException:
+                if debug: traceback.print_exc()
+                pass  # Try the Cansas XML reader
+            except DefaultReaderException:
+                if debug: traceback.print_exc()
+                pass  # Loader specific error to try the cansas XML reader
+            except FileContentsException as e:
+                if debug: traceback.print_exc()
+                if msg_from_reader is None:
+                    raise RuntimeError(e.message)
 
         # ASCII reader failed - try CanSAS xML reader
-        try:
-            cansas_loader = cansas_reader.Reader()
-            return cansas_loader.read(path)
-        except NoKnownLoaderException:
-            if debug: traceback.print_exc()
-            pass  # Try the NXcanSAS reader
-        except DefaultReaderException:
-            if debug: traceback.print_exc()
-            pass  # Loader specific error to try the NXcanSAS reader
-        except FileContentsException as e:
-            if debug: traceback.print_exc()
-            if msg_from_reader is None:
-                raise RuntimeError(e.message)
-        except Exception:
-            if debug: traceback.print_exc()
-            pass
+        if format is None and file_format != file_sniffer.CANSAS_XML:
+            # The contents are not cansas XML
+            self.detection_stats['skipped_reads'] += 1
+        else:
+            try:
+                cansas_loader = cansas_reader.Reader()
+                return self._read(cansas_loader.read, path)
+            except NoKnownLoaderException:
+                if debug: traceback.print_exc()
+                pass  # Try the NXcanSAS reader
+            except DefaultReaderException:
+                if debug: traceback.print_exc()
+                pass  # Loader specific error to try the NXcanSAS reader
+            except FileContentsException as e:
+                if debug: traceback.print_exc()
+                if msg_from_reader is None:
+                    raise RuntimeError(e.message)
+            except Exception:
+                if debug: traceback.print_exc()
+                pass
 
         # CanSAS XML reader failed - try NXcanSAS reader
+        if format is None and file_format != file_sniffer.HDF5:
+            # The contents are not HDF5
+            self.detection_stats['skipped_reads'] += 1
+            self._unknown_format(path, msg_from_reader)
         try:
             cansas_nexus_loader = cansas_reader_HDF5.Reader()
-            return cansas_nexus_loader.read(path)
+            return self._read(cansas_nexus_loader.read, path)
         except DefaultReaderException as e:
             if debug: traceback.print_exc()
-            logging.error("No default loader can load the data")
-            # No known reader available. Give up and throw an error
-            if msg_from_reader is None:
-                msg = "\nUnknown data format: {}.\nThe file is not a ".format(path)
-                msg += "known format that can be loaded by SasView.\n"
-                raise NoKnownLoaderException(msg)
-            else:
-                # Associated reader and default readers all failed.
-                # Show error message from associated reader
-                raise RuntimeError(msg_from_reader)
+            self._unknown_format(path, msg_from_reader)
         except FileContentsException as e:
             if debug: traceback.print_exc()
             err_msg = msg_from_reader if msg_from_reader is not None else e.message
             raise RuntimeError(err_msg)
 
+    def _read(self, read, path):
+        """
+        Call a reader, counting the call in detection_stats.
+        """
+        self.detection_stats['reads'] += 1
+        try:
+            return read(path)
+        except Exception:
+            self.detection_stats['failed_reads'] += 1
+            raise
+
+    def _unknown_format(self, path, msg_from_reader=None):
+        """
+        Raise the error for a file none of the default readers can load.
+        """
+        logging.error("No default loader can load the data")
+        # No known reader available. Give up and throw an error
+        if msg_from_reader is None:
+            msg = "\nUnknown data format: {}.\nThe file is not a ".format(path)
+            msg += "known format that can be loaded by SasView.\n"
+            raise NoKnownLoaderException(msg)
+        # Associated reader and default readers all failed.
+        # Show error message from associated reader
+        raise RuntimeError(msg_from_reader)
+
+    def _reader_modules(self, path):
+        """
+        Return the names of the reader modules registered for the file type
+        of path, in the order they are tried.
+        """
+        return [type(getattr(fn, '__self__', fn)).__module__
+                for fn in self.lookup(path)]
+
+    def _binary_reader_for(self, path, file_format):
+        """
+        Check the readers for the file type of path are all default readers
+        of binary formats other than file_format, so cannot read the file.
+        """
+        modules = self._reader_modules(path)
+        binary = set(reader.__name__ for fmt, reader in BINARY_READERS.items()
+                     if fmt != file_format)
+        return bool(modules) and all(name in binary for name in modules)
+
+    def _default_reader_for(self, path):
+        """
+        Check the file type of path has no reader, or a default reader first,
+        rather than a plugin reader.
+        """
+        loaders = self.lookup(path)
+        if not loaders:
+            return True
+        reader = getattr(loaders[0], '__self__', None)
+        return type(reader).__module__.startswith(readers.__name__ + '.')
+
+    def _load_sniffed(self, path, file_format, debug=False):
+        """
+        Load a file with the default reader for the format found from its
+        contents.
+        """
+        import traceback
+
+        reader = SNIFFED_READERS[file_format]
+        # Reader calls made before reaching the right reader without the
+        # format of the file: its own readers, then the defaults
+        tried = self._reader_modules(path)
+        tried += [ascii_reader.__name__, cansas_reader.__name__,
+                  cansas_reader_HDF5.__name__]
+        if reader.__name__ in tried:
+            tried = tried[:tried.index(reader.__name__)]
+        self.detection_stats['skipped_reads'] += len(tried)
+        try:
+            return self._read(reader.Reader().read, path)
+        except (NoKnownLoaderException, DefaultReaderException):
+            if debug: traceback.print_exc()
+            msg = "\nUnknown data format: {}.\nThe file is not a ".format(path)
+            msg += "known format that can be loaded by SasView.\n"
+            raise NoKnownLoaderException(msg)
+        except FileContentsException as e:
+            if debug: traceback.print_exc()
+            raise RuntimeError(e.message)
+
+    def load_many(self, paths, format=None, workers=1, processes=False):
+        """
+        Load several files at the same time, yielding each as it is loaded.
+
+        The files are loaded by a pool of *workers* threads, or processes if
+        *processes* is True, each with its own reader instances. Processes
+        avoid the global interpreter lock for the python parts of the
+        readers, but the output has to be copied back from the workers.
+
+        :param paths: file paths
+        :param format: explicit extension, to force the use
+            of a particular reader
+        :param workers: number of files to load at the same time
+        :param processes: if True, use processes rather than threads
+        :return: iterator of (path, output, error), in the order the files
+            finish loading. output is the list of data sets for the file and
+            error is None, or output is None and error is the exception
+            raised when loading it.
+        """
+        tasks = [(path, format) for path in paths]
+        if workers <= 1:
+            for path, format in tasks:
+                try:
+                    yield path, self.load(path, format), None
+                except Exception as exc:
+                    yield path, None, exc
+            return
+
+        if processes:
+            pool = multiprocessing.Pool(workers, _init_worker, (self,))
+        else:
+            pool = ThreadPool(workers, _init_worker, (self,))
+        try:
+            for result in pool.imap_unordered(_load_file, tasks):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def copy(self):
+        """
+        Return a copy of the registry with new instances of the readers.
+        """
+        registry = copy.copy(self)
+        registry.loaders = dict((ext, [_new_reader(fn) for fn in fns])
+                                for ext, fns in self.loaders.items())
+        registry.writers = dict((ext, list(fns))
+                                for ext, fns in self.writers.items())
+        return registry
+
     def find_plugins(self, dir):
         """
         Find readers in a given directory. This method
@@ -425,6 +652,18 @@ class Loader(object):
         """
         return self.__registry.load(file, format)
 
+    def load_many(self, files, format=None, workers=1, processes=False):
+        """
+        Load several files at the same time
+
+        :param files: file names (paths)
+        :param format: specified format to use (optional)
+        :param workers: number of files to load at the same time
+        :param processes: if True, load in processes rather than threads
+        :return: iterator of (file, output, error) as each file is loaded
+        """
+        return self.__registry.load_many(files, format, workers, processes)
+
     def save(self, file, data, format):
         """
         Save a DataInfo object to file
@@ -454,3 +693,10 @@ class Loader(object):
         Return the list of wildcards
         """
         return self.__registry.wildcards
+
+    def get_detection_stats(self):
+        """
+        Return the counts of the formats found from the contents of the
+        files loaded, and of the reader calls made and skipped
+        """
+        return dict(self.__registry.detection_stats)
@@ -20,9 +20,13 @@ PYTHONPATH=../src/ python2  -m sasdataloader.test.utest_averaging DataInfoTests.
 
 
 # TODO: copy the meta data from the 2D object to the resulting 1D object
+import hashlib
 import math
-import numpy as np
 import sys
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
 
 #from data_info import plottable_2D
 from .data_info import Data1D
@@ -92,7 +96,11 @@ def get_pixel_fraction_square(x, xmin, xmax):
     :param xmax: minimum x for the length considered
     :return: (x-xmin)/(xmax-xmin) when xmin < x < xmax
 
+    Any of the arguments may be an array; an array of fractions is
+    returned for array input.
     """
+    if np.ndim(x) > 0 or np.ndim(xmin) > 0 or np.ndim(xmax) > 0:
+        return np.clip((x - xmin) / (xmax - xmin), 0.0, 1.0)
     if x <= xmin:
         return 0.0
     if x > xmin and x < xmax:
@@ -187,7 +195,7 @@ def get_pixel_fraction(qmax, q_00, q_01, q_10, q_11):
 
     return frac_max
 
-def get_dq_data(data2D):
+def get_dq_data(data2D, finite_only=True):
     '''
     Get the dq for resolution averaging
     The pinholes and det. pix contribution present
@@ -195,6 +203,9 @@ def get_dq_data(data2D):
     converting to 1D: dq_overlap should calculated ideally at
     q = 0. Note This method works on only pinhole geometry.
     Extrapolate dqx(r) and dqy(phi) at q = 0, and take an average.
+
+    :param finite_only: if False, return dq for every pixel rather than
+        only for the pixels with finite intensity
     '''
     z_max = max(data2D.q_data)
     z_min = min(data2D.q_data)
@@ -220,9 +231,9 @@ def get_dq_data(data2D):
     # Final protection of dq
     if dq_overlap < 0:
         dq_overlap = dqy_at_z_min
-    dqx_data = data2D.dqx_data[np.isfinite(data2D.data)]
-    dqy_data = data2D.dqy_data[np.isfinite(
-        data2D.data)] - dq_overlap
+    pixels = np.isfinite(data2D.data) if finite_only else slice(None)
+    dqx_data = data2D.dqx_data[pixels]
+    dqy_data = data2D.dqy_data[pixels] - dq_overlap
     # def; dqx_data = dq_r dqy_data = dq_phi
     # Convert dq 2D to 1D here
     dq_data = np.sqrt(dqx_data**2 + dqx_data**2)
@@ -269,6 +280,113 @@ def reader2D_converter(data2d=None):
 
     return output
 
+
+def get_image_bins(qx_data, qy_data):
+    """
+    Bin edges for rebinning 1d qx, qy, I vectors into a ~square image,
+    with about sqrt(n) bins on each axis and half a bin beyond the data.
+
+    :return: x_bins, y_bins
+    """
+    # find max and min values of qx and qy
+    xmax = qx_data.max()
+    xmin = qx_data.min()
+    ymax = qy_data.max()
+    ymin = qy_data.min()
+
+    # calculate the range of qx and qy
+    x_size = xmax - xmin
+    y_size = ymax - ymin
+
+    # estimate the # of pixels on each axes
+    npix_y = int(math.floor(math.sqrt(len(qy_data))))
+    npix_x = int(math.floor(len(qy_data) / npix_y))
+
+    # bin size: x- & y-directions
+    xstep = x_size / (npix_x - 1)
+    ystep = y_size / (npix_y - 1)
+
+    # max and min taking account of the bin sizes
+    xmax = xmax + xstep / 2.0
+    xmin = xmin - xstep / 2.0
+    ymax = ymax + ystep / 2.0
+    ymin = ymin - ystep / 2.0
+
+    return np.linspace(xmin, xmax, npix_x), np.linspace(ymin, ymax, npix_y)
+
+
+def _edge_index(value, edges):
+    """
+    Bin index of each value for the given bin edges, as np.histogram2d
+    finds it: the last bin includes its upper edge, and values outside
+    the edges get -1 or len(edges) - 1.
+    """
+    index = np.searchsorted(edges, value, side='right') - 1
+    index[value == edges[-1]] -= 1
+    return index
+
+
+def rebin_to_image(qx_data, qy_data, data, x_bins, y_bins):
+    """
+    Average 1d qx, qy, I vectors into a 2d image, rows along y and
+    columns along x.
+
+    This gives the same result as np.histogram2d of the intensities
+    divided by np.histogram2d of ones, but finds the bin of each point
+    only once.  Bins without a point are set to NaN.
+
+    :param x_bins: bin edges in qx
+    :param y_bins: bin edges in qy
+    :return: image, number of points in each bin
+    """
+    n_x, n_y = len(x_bins) - 1, len(y_bins) - 1
+    i_x = _edge_index(qx_data, x_bins)
+    i_y = _edge_index(qy_data, y_bins)
+    inside = (i_x >= 0) & (i_x < n_x) & (i_y >= 0) & (i_y < n_y)
+    i_bin = i_y[inside] * n_x + i_x[inside]
+    weights = _bin_sum(i_bin, n_x * n_y).reshape(n_y, n_x)
+    image = _bin_sum(i_bin, n_x * n_y, data[inside]).reshape(n_y, n_x)
+    # only bins with more than one point need normalizing
+    many = weights > 1
+    image[many] = image[many] / weights[many]
+    image[weights == 0] = np.nan
+    return image, weights
+
+
+#: neighbour offsets (dy, dx) used to fill empty image bins: the 4 nearest
+#: and then the 4 next nearest neighbours
+_IMAGE_NEIGHBOURS = [(-1, 0), (0, -1), (1, 0), (0, 1),
+                     (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+
+def fill_image_holes(image, weights):
+    """
+    Set the empty bins (weight 0 and not finite) of an image to the
+    average of their finite nearest and next nearest neighbours.
+
+    The neighbour sums and counts are a 3x3 convolution with a zero
+    center, done with shifted slices of the zero padded image.  Only the
+    values before filling are used, so a bin with no finite neighbour
+    stays empty.  The image is changed in place.
+
+    :return: image
+    """
+    holes = ~(weights > 0) & ~np.isfinite(image)
+    if not holes.any():
+        return image
+    finite = np.isfinite(image)
+    padded = np.pad(np.where(finite, image, 0.0), 1, mode='constant')
+    padded_count = np.pad(finite.astype(float), 1, mode='constant')
+    n_y, n_x = image.shape
+    total = np.zeros(image.shape)
+    count = np.zeros(image.shape)
+    for d_y, d_x in _IMAGE_NEIGHBOURS:
+        total += padded[1 + d_y:1 + d_y + n_y, 1 + d_x:1 + d_x + n_x]
+        count += padded_count[1 + d_y:1 + d_y + n_y, 1 + d_x:1 + d_x + n_x]
+    fill = holes & (count > 0)
+    image[fill] = total[fill] / count[fill]
+    return image
+
 ################################################################################
 
 class Binning(object):
@@ -290,7 +408,21 @@ class Binning(object):
         '''
         The general formula logarithm binning is:
         bin = floor(N * (log(x) - log(min)) / (log(max) - log(min)))
+
+        *value* may be a scalar or an array; an array of bin indices is
+        returned for array input.
         '''
+        if np.ndim(value) > 0:
+            value = np.asarray(value, dtype=float)
+            if self.base:
+                log_base = math.log(self.base)
+                temp_x = self.n_bins * (np.log(value) / log_base
+                                        - math.log(self.min, self.base))
+                temp_y = math.log(self.max, self.base) - math.log(self.min, self.base)
+            else:
+                temp_x = self.n_bins * (value - self.min)
+                temp_y = self.max - self.min
+            return np.floor(temp_x / temp_y).astype(int)
         if self.base:
             temp_x = self.n_bins * (math.log(value, self.base) - math.log(self.min, self.base))
             temp_y = math.log(self.max, self.base) - math.log(self.min, self.base)
@@ -301,6 +433,114 @@ class Binning(object):
         return int(math.floor(temp_x / temp_y))
 
 
+def _finite_data(data2D, *fields):
+    """
+    Return the requested Data2D arrays restricted to the pixels
+    with finite intensity.
+
+    :param data2D: Data2D object
+    :param fields: names of the Data2D arrays to return
+    :return: list of arrays, in the order of *fields*
+    """
+    finite = np.isfinite(data2D.data)
+    return [getattr(data2D, name)[finite] for name in fields]
+
+
+def _phi_data(qx_data, qy_data):
+    """
+    Angle of each pixel in the range [0, 2pi], measured anti-clockwise
+    from the x-axis on the left-hand side.
+    """
+    return np.arctan2(qy_data, qx_data) + math.pi
+
+
+def _err_squared(data, err_data):
+    """
+    Squared uncertainty for each pixel.  Pixels without an uncertainty
+    (err_data is None or zero) use the Poisson estimate |I|.
+    """
+    if err_data is None:
+        return np.abs(data)
+    return np.where(err_data == 0.0, np.abs(data), err_data * err_data)
+
+
+def _wrap_bin_index(i_bin, nbins):
+    """
+    Map bin indices onto [0, nbins) the way sequence indexing does:
+    a negative index counts from the last bin, and anything outside
+    [-nbins, nbins) raises IndexError.
+    """
+    return np.arange(nbins)[i_bin]
+
+
+def _bin_sum(i_bin, nbins, weights=None):
+    """
+    Accumulate *weights* (or counts when *weights* is None) into *nbins*
+    bins given the bin index of each contributing pixel.
+    """
+    return np.bincount(i_bin, weights=weights, minlength=nbins).astype(float)
+
+
+class _BinMap(object):
+    """
+    Pixel to bin mapping produced by an averager for a given detector
+    geometry and region of interest.
+    """
+
+    def __init__(self, index, i_bin, nbins, average, x_value=None,
+                 dq_value=None, weight=None):
+        # Index of each contributing pixel in the Data2D arrays (a pixel
+        # may contribute to several bins)
+        self.index = index
+        # Bin index of each contributing pixel
+        self.i_bin = i_bin
+        # Number of bins
+        self.nbins = nbins
+        # Function turning the bin sums (x, y, err_y, y_counts, err_x)
+        # into the averager output
+        self.average = average
+        # Value averaged into x for each contributing pixel, if any
+        self.x_value = x_value
+        # dQ averaged into dx for each contributing pixel, if any
+        self.dq_value = dq_value
+        # Fraction of each contributing pixel inside its bin, if not 1
+        self.weight = weight
+
+
+def _bin_average(bin_map, data2D):
+    """
+    Accumulate the contributing pixels of *data2D* into the bins
+    described by *bin_map* and return the averaged result.
+    """
+    index, i_bin, nbins = bin_map.index, bin_map.i_bin, bin_map.nbins
+    data = data2D.data[index]
+    err_data = None if data2D.err_data is None else data2D.err_data[index]
+    err_squared = _err_squared(data, err_data)
+    weight = bin_map.weight
+    if weight is not None:
+        data = data * weight
+        err_squared = err_squared * weight * weight
+    y = _bin_sum(i_bin, nbins, data)
+    err_y = _bin_sum(i_bin, nbins, err_squared)
+    y_counts = _bin_sum(i_bin, nbins, weight)
+    x = None
+    if bin_map.x_value is not None:
+        x = _bin_sum(i_bin, nbins, bin_map.x_value)
+    err_x = None
+    if bin_map.dq_value is not None:
+        err_x = _bin_sum(i_bin, nbins, bin_map.dq_value)
+    return bin_map.average(x, y, err_y, y_counts, err_x)
+
+
+def _dq_value(data2D, index):
+    """
+    dQ of the contributing pixels, or None if the data has no resolution
+    """
+    if data2D.dqx_data is None or data2D.dqy_data is None:
+        return None
+    return get_dq_data(data2D, finite_only=False)[index]
+
+
 ################################################################################
 
 class _Slab(object):
@@ -337,16 +577,28 @@ class _Slab(object):
         :param maj_min: min value on the major axis
         :return: Data1D object
         """
+        return _bin_average(
+            self._bin_map(data2D, np.isfinite(data2D.data), maj), data2D)
+
+    def _bin_map(self, data2D, select, maj=None):
+        """
+        Find the bin of each selected pixel inside the slab.
+
+        :param data2D: Data2D object
+        :param select: boolean array of the pixels to consider
+        :param maj: major axis, 'x' or 'y'; defaults to that of the subclass
+        :return: _BinMap object
+        """
         if len(data2D.detector) > 1:
             msg = "_Slab._avg: invalid number of "
             msg += " detectors: %g" % len(data2D.detector)
             raise RuntimeError(msg)
+        if maj is None:
+            maj = self._major
 
         # Get data
-        data = data2D.data[np.isfinite(data2D.data)]
-        err_data = data2D.err_data[np.isfinite(data2D.data)]
-        qx_data = data2D.qx_data[np.isfinite(data2D.data)]
-        qy_data = data2D.qy_data[np.isfinite(data2D.data)]
+        qx_data = data2D.qx_data
+        qy_data = data2D.qy_data
 
         # Build array of Q intervals
         if maj == 'x':
@@ -355,70 +607,44 @@ class _Slab(object):
             else:
                 x_min = self.x_min
             nbins = int(math.ceil((self.x_max - x_min) / self.bin_width))
+            q_value = qx_data
+            min_value = x_min
         elif maj == 'y':
             if self.fold:
                 y_min = 0
             else:
                 y_min = self.y_min
             nbins = int(math.ceil((self.y_max - y_min) / self.bin_width))
+            q_value = qy_data
+            min_value = y_min
         else:
             raise RuntimeError("_Slab._avg: unrecognized axis %s" % str(maj))
 
-        x = np.zeros(nbins)
-        y = np.zeros(nbins)
-        err_y = np.zeros(nbins)
-        y_counts = np.zeros(nbins)
-
-        # Average pixelsize in q space
-        for npts in range(len(data)):
-            # default frac
-            frac_x = 0
-            frac_y = 0
-            # get ROI
-            if self.x_min <= qx_data[npts] and self.x_max > qx_data[npts]:
-                frac_x = 1
-            if self.y_min <= qy_data[npts] and self.y_max > qy_data[npts]:
-                frac_y = 1
-            frac = frac_x * frac_y
-
-            if frac == 0:
-                continue
-            # binning: find axis of q
-            if maj == 'x':
-                q_value = qx_data[npts]
-                min_value = x_min
-            if maj == 'y':
-                q_value = qy_data[npts]
-                min_value = y_min
-            if self.fold and q_value < 0:
-                q_value = -q_value
-            # bin
-            i_q = int(math.ceil((q_value - min_value) / self.bin_width)) - 1
-
-            # skip outside of max bins
-            if i_q < 0 or i_q >= nbins:
-                continue
-
-            # TODO: find better definition of x[i_q] based on q_data
-            # min_value + (i_q + 1) * self.bin_width / 2.0
-            x[i_q] += frac * q_value
-            y[i_q] += frac * data[npts]
-
-            if err_data is None or err_data[npts] == 0.0:
-                if data[npts] < 0:
-                    data[npts] = -data[npts]
-                err_y[i_q] += frac * frac * data[npts]
-            else:
-                err_y[i_q] += frac * frac * err_data[npts] * err_data[npts]
-            y_counts[i_q] += frac
-
+        # get ROI
+        in_roi = (select & (self.x_min <= qx_data) & (self.x_max > qx_data)
+                  & (self.y_min <= qy_data) & (self.y_max > qy_data))
+        if self.fold:
+            q_value = np.abs(q_value)
+        # bin
+        i_q = np.ceil((q_value - min_value) / self.bin_width).astype(int) - 1
+        # skip outside of max bins
+        in_roi &= (i_q >= 0) & (i_q < nbins)
+        index = np.flatnonzero(in_roi)
+
+        # TODO: find better definition of x[i_q] based on q_data
+        # min_value + (i_q + 1) * self.bin_width / 2.0
+        return _BinMap(index, i_q[index], nbins, self._average,
+                       x_value=q_value[index])
+
+    def _average(self, x, y, err_y, y_counts, err_x):
+        """
+        Turn the bin sums into the averaged I(Q_maj).
+        """
         # Average the sums
-        for n in range(nbins):
-            err_y[n] = math.sqrt(err_y[n])
-
-        err_y = err_y / y_counts
-        y = y / y_counts
-        x = x / y_counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            err_y = np.sqrt(err_y) / y_counts
+            y = y / y_counts
+            x = x / y_counts
         idx = (np.isfinite(y) & np.isfinite(x))
 
         if not idx.any():
@@ -431,6 +657,7 @@ class SlabY(_Slab):
     """
     Compute average I(Qy) for a region of interest
     """
+    _major = 'y'
 
     def __call__(self, data2D):
         """
@@ -446,6 +673,7 @@ class SlabX(_Slab):
     """
     Compute average I(Qx) for a region of interest
     """
+    _major = 'x'
 
     def __call__(self, data2D):
         """
@@ -457,12 +685,154 @@ class SlabX(_Slab):
 
 ################################################################################
 
+def _pixel_size(data2D):
+    """
+    Width of the detector pixels in qx and qy.
+
+    The spacing of x_bins and y_bins is used when they describe the
+    pixel grid; otherwise the pixels are assumed to fill a ~square grid
+    over the qx and qy range, as for plotting.
+    """
+    qx_data, qy_data = data2D.qx_data, data2D.qy_data
+    x_bins, y_bins = data2D.x_bins, data2D.y_bins
+    if (x_bins is not None and y_bins is not None and len(x_bins) > 1
+            and len(y_bins) > 1 and len(x_bins) * len(y_bins) == len(qx_data)):
+        return (np.median(np.abs(np.diff(x_bins))),
+                np.median(np.abs(np.diff(y_bins))))
+    npix_y = int(math.floor(math.sqrt(len(qy_data))))
+    npix_x = int(math.floor(len(qy_data) / npix_y))
+    if npix_x < 2 or npix_y < 2:
+        raise ValueError("Box sum: can't find the pixel size of %d pixels"
+                         % len(qx_data))
+    return ((qx_data.max() - qx_data.min()) / (npix_x - 1),
+            (qy_data.max() - qy_data.min()) / (npix_y - 1))
+
+
+class _PixelGrid(object):
+    """
+    Lookup of the pixels near a box, for summing many boxes of a frame.
+
+    The pixels are split into about sqrt(npix) columns of equal qx width,
+    and sorted by column then qy, so the pixels of a column within a qy
+    range are contiguous.  Building the grid costs about as much as
+    scanning all the pixels for 20 boxes.
+    """
+
+    def __init__(self, qx_data, qy_data, select):
+        pixels = np.flatnonzero(select & np.isfinite(qx_data)
+                                & np.isfinite(qy_data))
+        qx, qy = qx_data[pixels], qy_data[pixels]
+        self.ncolumns = max(1, int(math.sqrt(len(pixels))))
+        self.x_min = qx.min() if len(pixels) else 0.0
+        x_range = qx.max() - self.x_min if len(pixels) else 0.0
+        self.x_step = x_range / self.ncolumns if x_range > 0 else 1.0
+        self.y_min = qy.min() if len(pixels) else 0.0
+        y_range = qy.max() - self.y_min if len(pixels) else 0.0
+        self.y_scale = 0.5 / y_range if y_range > 0 else 0.0
+        # Column number plus a key in [0, 0.5] increasing with qy
+        keys = self._keys(self._columns(qx), qy)
+        order = np.argsort(keys, kind='mergesort')
+        self.pixels = pixels[order]
+        self.keys = keys[order]
+
+    def _columns(self, qx):
+        return np.clip(np.floor((qx - self.x_min) / self.x_step),
+                       0, self.ncolumns - 1)
+
+    def _keys(self, columns, qy):
+        return columns + np.clip((qy - self.y_min) * self.y_scale, 0.0, 0.5)
+
+    def find(self, x_min, x_max, y_min, y_max):
+        """
+        Return the pixels of the columns overlapping [x_min, x_max] with
+        y_min <= qy <= y_max, and possibly a few more.
+        """
+        # The keys are monotonic in qx and qy, so no pixel is missed
+        first, last = self._columns(np.array([x_min, x_max]))
+        columns = np.arange(first, last + 1)
+        starts = np.searchsorted(self.keys, self._keys(columns, y_min),
+                                 side='left')
+        stops = np.searchsorted(self.keys, self._keys(columns, y_max),
+                                side='right')
+        lengths = stops - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = (np.arange(lengths.sum())
+                     + np.repeat(starts - offsets, lengths))
+        return self.pixels[positions]
+
+
+def _box_bin_map(data2D, select, boxes, average, fractional=False,
+                 pixel_size=None):
+    """
+    Find the selected pixels inside each box, one bin per box.
+
+    With *fractional*, pixels are rectangles of *pixel_size* (estimated
+    from the data if None) centered on their qx, qy and are weighted by
+    the fraction of their area inside the box; otherwise a pixel is inside
+    when x_min <= qx < x_max and y_min <= qy < y_max.
+
+    :param boxes: sequence of (x_min, x_max, y_min, y_max)
+    :return: _BinMap object
+    """
+    if len(data2D.detector) > 1:
+        msg = "Circular averaging: invalid number "
+        msg += "of detectors: %g" % len(data2D.detector)
+        raise RuntimeError(msg)
+    qx_data = data2D.qx_data
+    qy_data = data2D.qy_data
+    half_x = half_y = 0.0
+    if fractional:
+        if pixel_size is None:
+            pixel_size = _pixel_size(data2D)
+        half_x, half_y = 0.5 * pixel_size[0], 0.5 * pixel_size[1]
+    grid = _PixelGrid(qx_data, qy_data, select) if len(boxes) > 20 else None
+
+    index, i_bin, weight = [], [], []
+    for i_box, (x_min, x_max, y_min, y_max) in enumerate(boxes):
+        if grid is None:
+            # Pixels overlapping the box, and possibly touching its edge
+            pixels = np.flatnonzero(
+                select & (x_min - half_x <= qx_data)
+                & (x_max + half_x >= qx_data) & (y_min - half_y <= qy_data)
+                & (y_max + half_y >= qy_data))
+        else:
+            pixels = grid.find(x_min - half_x, x_max + half_x,
+                               y_min - half_y, y_max + half_y)
+        qx, qy = qx_data[pixels], qy_data[pixels]
+        if fractional:
+            frac_x = (get_pixel_fraction_square(x_max, qx - half_x, qx + half_x)
+                      - get_pixel_fraction_square(x_min, qx - half_x,
+                                                  qx + half_x))
+            frac_y = (get_pixel_fraction_square(y_max, qy - half_y, qy + half_y)
+                      - get_pixel_fraction_square(y_min, qy - half_y,
+                                                  qy + half_y))
+            frac = frac_x * frac_y
+            inside = frac > 0
+            weight.append(frac[inside])
+        else:
+            inside = ((x_min <= qx) & (x_max > qx)
+                      & (y_min <= qy) & (y_max > qy))
+        pixels = pixels[inside]
+        index.append(pixels)
+        i_bin.append(np.full(len(pixels), i_box, dtype=int))
+    index = np.concatenate(index) if index else np.zeros(0, dtype=int)
+    i_bin = np.concatenate(i_bin) if i_bin else np.zeros(0, dtype=int)
+    weight = np.concatenate(weight) if fractional and weight else None
+    return _BinMap(index, i_bin, len(boxes), average, weight=weight)
+
+
 class Boxsum(object):
     """
     Perform the sum of counts in a 2D region of interest.
+
+    With *fractional*, pixels on the edges of the box count for the
+    fraction of their area inside it, so the sum does not jump as the
+    box edges cross pixel centers.  The pixels are taken as rectangles of
+    *pixel_size* (dqx, dqy), estimated from the data when None.
     """
 
-    def __init__(self, x_min=0.0, x_max=0.0, y_min=0.0, y_max=0.0):
+    def __init__(self, x_min=0.0, x_max=0.0, y_min=0.0, y_max=0.0,
+                 fractional=False, pixel_size=None):
         # Minimum Qx value [A-1]
         self.x_min = x_min
         # Maximum Qx value [A-1]
@@ -471,6 +841,10 @@ class Boxsum(object):
         self.y_min = y_min
         # Maximum Qy value [A-1]
         self.y_max = y_max
+        # Weight the pixels by their fraction inside the box
+        self.fractional = fractional
+        # Pixel size (dqx, dqy) [A-1] for the fractional overlap
+        self.pixel_size = None if pixel_size is None else tuple(pixel_size)
 
     def __call__(self, data2D):
         """
@@ -480,8 +854,19 @@ class Boxsum(object):
         :return: number of counts, error on number of counts,
             number of points summed
         """
-        y, err_y, y_counts = self._sum(data2D)
+        return _bin_average(
+            self._bin_map(data2D, np.isfinite(data2D.data)), data2D)
 
+    def _average(self, x, y, err_y, y_counts, err_x):
+        """
+        Turn the sums over the single box bin into the returned values.
+        """
+        return self._result(y[0], err_y[0], y_counts[0])
+
+    def _result(self, y, err_y, y_counts):
+        """
+        Turn the sums into the returned counts and errors.
+        """
         # Average the sums
         counts = 0 if y_counts == 0 else y
         error = 0 if y_counts == 0 else math.sqrt(err_y)
@@ -497,48 +882,31 @@ class Boxsum(object):
         :return: number of counts,
             error on number of counts, number of entries summed
         """
-        if len(data2D.detector) > 1:
-            msg = "Circular averaging: invalid number "
-            msg += "of detectors: %g" % len(data2D.detector)
-            raise RuntimeError(msg)
-        # Get data
-        data = data2D.data[np.isfinite(data2D.data)]
-        err_data = data2D.err_data[np.isfinite(data2D.data)]
-        qx_data = data2D.qx_data[np.isfinite(data2D.data)]
-        qy_data = data2D.qy_data[np.isfinite(data2D.data)]
-
-        y = 0.0
-        err_y = 0.0
-        y_counts = 0.0
-
-        # Average pixelsize in q space
-        for npts in range(len(data)):
-            # default frac
-            frac_x = 0
-            frac_y = 0
-
-            # get min and max at each points
-            qx = qx_data[npts]
-            qy = qy_data[npts]
-
-            # get the ROI
-            if self.x_min <= qx and self.x_max > qx:
-                frac_x = 1
-            if self.y_min <= qy and self.y_max > qy:
-                frac_y = 1
-            # Find the fraction along each directions
-            frac = frac_x * frac_y
-            if frac == 0:
-                continue
-            y += frac * data[npts]
-            if err_data is None or err_data[npts] == 0.0:
-                if data[npts] < 0:
-                    data[npts] = -data[npts]
-                err_y += frac * frac * data[npts]
-            else:
-                err_y += frac * frac * err_data[npts] * err_data[npts]
-            y_counts += frac
-        return y, err_y, y_counts
+        return _bin_average(
+            self._bin_map(data2D, np.isfinite(data2D.data),
+                          average=self._raw_sums), data2D)
+
+    def _raw_sums(self, x, y, err_y, y_counts, err_x):
+        """
+        Return the sums over the single box bin as they are.
+        """
+        return y[0], err_y[0], y_counts[0]
+
+    def _bin_map(self, data2D, select, average=None):
+        """
+        Find the selected pixels inside the box, all sharing a single bin.
+
+        :param data2D: Data2D object
+        :param select: boolean array of the pixels to consider
+        :param average: turns the bin sums into the result; defaults to
+            the averaging of the box
+        :return: _BinMap object
+        """
+        if average is None:
+            average = self._average
+        box = (self.x_min, self.x_max, self.y_min, self.y_max)
+        return _box_bin_map(data2D, select, [box], average,
+                            self.fractional, self.pixel_size)
 
 
 class Boxavg(Boxsum):
@@ -546,24 +914,89 @@ class Boxavg(Boxsum):
     Perform the average of counts in a 2D region of interest.
     """
 
-    def __init__(self, x_min=0.0, x_max=0.0, y_min=0.0, y_max=0.0):
+    def __init__(self, x_min=0.0, x_max=0.0, y_min=0.0, y_max=0.0,
+                 fractional=False, pixel_size=None):
         super(Boxavg, self).__init__(x_min=x_min, x_max=x_max,
-                                     y_min=y_min, y_max=y_max)
+                                     y_min=y_min, y_max=y_max,
+                                     fractional=fractional,
+                                     pixel_size=pixel_size)
+
+    def _result(self, y, err_y, y_counts):
+        """
+        Turn the sums into the average counts and its error.
+        """
+        # Average the sums
+        counts = 0 if y_counts == 0 else y / y_counts
+        error = 0 if y_counts == 0 else math.sqrt(err_y) / y_counts
+
+        return counts, error
+
+
+class MultiBoxsum(object):
+    """
+    Perform the sum of counts in many 2D regions of interest of the same
+    frame at once, as Boxsum does for each of them.  The boxes may
+    overlap.
+    """
+
+    def __init__(self, boxes=(), fractional=False, pixel_size=None):
+        # Boxes (x_min, x_max, y_min, y_max) [A-1]
+        self.boxes = tuple(tuple(box) for box in boxes)
+        # Weight the pixels by their fraction inside each box
+        self.fractional = fractional
+        # Pixel size (dqx, dqy) [A-1] for the fractional overlap
+        self.pixel_size = None if pixel_size is None else tuple(pixel_size)
 
     def __call__(self, data2D):
         """
-        Perform the sum in the region of interest
+        Perform the sum in each region of interest
 
         :param data2D: Data2D object
-        :return: average counts, error on average counts
+        :return: arrays of the number of counts, error on number of
+            counts and number of points summed for each box
+        """
+        return _bin_average(
+            self._bin_map(data2D, np.isfinite(data2D.data)), data2D)
 
+    def _average(self, x, y, err_y, y_counts, err_x):
         """
-        y, err_y, y_counts = self._sum(data2D)
+        Turn the sums over the box bins into the returned values.
+        """
+        empty = y_counts == 0
+        return self._result(np.where(empty, 0.0, y),
+                            np.where(empty, 0.0, err_y), y_counts)
 
-        # Average the sums
-        counts = 0 if y_counts == 0 else y / y_counts
-        error = 0 if y_counts == 0 else math.sqrt(err_y) / y_counts
+    def _result(self, y, err_y, y_counts):
+        """
+        Turn the sums into the returned counts and errors.
+        """
+        return y, np.sqrt(err_y), y_counts
 
+    def _bin_map(self, data2D, select):
+        """
+        Find the selected pixels inside each box, one bin per box.
+
+        :param data2D: Data2D object
+        :param select: boolean array of the pixels to consider
+        :return: _BinMap object
+        """
+        return _box_bin_map(data2D, select, self.boxes, self._average,
+                            self.fractional, self.pixel_size)
+
+
+class MultiBoxavg(MultiBoxsum):
+    """
+    Perform the average of counts in many 2D regions of interest of the
+    same frame at once, as Boxavg does for each of them.
+    """
+
+    def _result(self, y, err_y, y_counts):
+        """
+        Turn the sums into the average counts and their errors.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            counts = np.where(y_counts == 0, 0.0, y / y_counts)
+            error = np.where(y_counts == 0, 0.0, np.sqrt(err_y) / y_counts)
         return counts, error
 
 ################################################################################
@@ -592,83 +1025,56 @@ class CircularAverage(object):
         :return: Data1D object
         """
         # Get data W/ finite values
-        data = data2D.data[np.isfinite(data2D.data)]
-        q_data = data2D.q_data[np.isfinite(data2D.data)]
-        err_data = data2D.err_data[np.isfinite(data2D.data)]
-        mask_data = data2D.mask[np.isfinite(data2D.data)]
-
-        dq_data = None
-        if data2D.dqx_data is not None and data2D.dqy_data is not None:
-            dq_data = get_dq_data(data2D)
-
-        if len(q_data) == 0:
+        select = np.isfinite(data2D.data)
+        if not select.any():
             msg = "Circular averaging: invalid q_data: %g" % data2D.q_data
             raise RuntimeError(msg)
+        if ismask:
+            select &= data2D.mask.astype(bool)
+        return _bin_average(self._bin_map(data2D, select), data2D)
+
+    def _bin_map(self, data2D, select):
+        """
+        Find the q bin of each selected pixel inside the annulus.
+
+        :param data2D: Data2D object
+        :param select: boolean array of the pixels to consider
+        :return: _BinMap object
+        """
+        # No need to calculate the frac when all data are within range
+        if self.r_min >= self.r_max:
+            raise ValueError("Limit Error: min > max")
+
+        q_data = data2D.q_data
 
         # Build array of Q intervals
         nbins = int(math.ceil((self.r_max - self.r_min) / self.bin_width))
 
-        x = np.zeros(nbins)
-        y = np.zeros(nbins)
-        err_y = np.zeros(nbins)
-        err_x = np.zeros(nbins)
-        y_counts = np.zeros(nbins)
-
-        for npt in range(len(data)):
-
-            if ismask and not mask_data[npt]:
-                continue
-
-            frac = 0
-
-            # q-value at the pixel (j,i)
-            q_value = q_data[npt]
-            data_n = data[npt]
-
-            # No need to calculate the frac when all data are within range
-            if self.r_min >= self.r_max:
-                raise ValueError("Limit Error: min > max")
-
-            if self.r_min <= q_value and q_value <= self.r_max:
-                frac = 1
-            if frac == 0:
-                continue
-            i_q = int(math.floor((q_value - self.r_min) / self.bin_width))
-
-            # Take care of the edge case at phi = 2pi.
-            if i_q == nbins:
-                i_q = nbins - 1
-            y[i_q] += frac * data_n
-            # Take dqs from data to get the q_average
-            x[i_q] += frac * q_value
-            if err_data is None or err_data[npt] == 0.0:
-                if data_n < 0:
-                    data_n = -data_n
-                err_y[i_q] += frac * frac * data_n
-            else:
-                err_y[i_q] += frac * frac * err_data[npt] * err_data[npt]
-            if dq_data is not None:
-                # To be consistent with dq calculation in 1d reduction,
-                # we need just the averages (not quadratures) because
-                # it should not depend on the number of the q points
-                # in the qr bins.
-                err_x[i_q] += frac * dq_data[npt]
-            else:
-                err_x = None
-            y_counts[i_q] += frac
-
+        in_roi = select & (self.r_min <= q_data) & (q_data <= self.r_max)
+        index = np.flatnonzero(in_roi)
+        q_value = q_data[index]
+        i_q = np.floor((q_value - self.r_min) / self.bin_width).astype(int)
+        # Take care of the edge case at q = r_max.
+        i_q[i_q == nbins] = nbins - 1
+
+        # Take dqs from data to get the q_average.
+        # To be consistent with dq calculation in 1d reduction,
+        # we need just the averages (not quadratures) because
+        # it should not depend on the number of the q points
+        # in the qr bins.
+        return _BinMap(index, i_q, nbins, self._average, x_value=q_value,
+                       dq_value=_dq_value(data2D, index))
+
+    def _average(self, x, y, err_y, y_counts, err_x):
+        """
+        Turn the bin sums into the averaged I(Q).
+        """
         # Average the sums
-        for n in range(nbins):
-            if err_y[n] < 0:
-                err_y[n] = -err_y[n]
-            err_y[n] = math.sqrt(err_y[n])
-            # if err_x is not None:
-            #    err_x[n] = math.sqrt(err_x[n])
-
-        err_y = err_y / y_counts
-        err_y[err_y == 0] = np.average(err_y)
-        y = y / y_counts
-        x = x / y_counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            err_y = np.sqrt(np.abs(err_y)) / y_counts
+            err_y[err_y == 0] = np.average(err_y)
+            y = y / y_counts
+            x = x / y_counts
         idx = (np.isfinite(y)) & (np.isfinite(x))
 
         if err_x is not None:
@@ -719,62 +1125,48 @@ class Ring(object):
 
         :return: Data1D object
         """
+        return _bin_average(
+            self._bin_map(data2D, np.isfinite(data2D.data)), data2D)
+
+    def _bin_map(self, data2D, select):
+        """
+        Find the phi bin of each selected pixel inside the ring.
+
+        :param data2D: Data2D object
+        :param select: boolean array of the pixels to consider
+        :return: _BinMap object
+        """
         if data2D.__class__.__name__ not in ["Data2D", "plottable_2D"]:
             raise RuntimeError("Ring averaging only take plottable_2D objects")
 
         Pi = math.pi
 
         # Get data
-        data = data2D.data[np.isfinite(data2D.data)]
-        q_data = data2D.q_data[np.isfinite(data2D.data)]
-        err_data = data2D.err_data[np.isfinite(data2D.data)]
-        qx_data = data2D.qx_data[np.isfinite(data2D.data)]
-        qy_data = data2D.qy_data[np.isfinite(data2D.data)]
-
-        # Set space for 1d outputs
-        phi_bins = np.zeros(self.nbins_phi)
-        phi_counts = np.zeros(self.nbins_phi)
-        phi_values = np.zeros(self.nbins_phi)
-        phi_err = np.zeros(self.nbins_phi)
+        q_data = data2D.q_data
+        in_roi = select & (self.r_min <= q_data) & (q_data <= self.r_max)
+        index = np.flatnonzero(in_roi)
+        # phi-value at each point
+        phi_value = _phi_data(data2D.qx_data[index], data2D.qy_data[index])
 
         # Shift to apply to calculated phi values in order
         # to center first bin at zero
         phi_shift = Pi / self.nbins_phi
 
-        for npt in range(len(data)):
-            frac = 0
-            # q-value at the point (npt)
-            q_value = q_data[npt]
-            data_n = data[npt]
-
-            # phi-value at the point (npt)
-            phi_value = math.atan2(qy_data[npt], qx_data[npt]) + Pi
-
-            if self.r_min <= q_value and q_value <= self.r_max:
-                frac = 1
-            if frac == 0:
-                continue
-            # binning
-            i_phi = int(math.floor((self.nbins_phi) *
-                                   (phi_value + phi_shift) / (2 * Pi)))
-
-            # Take care of the edge case at phi = 2pi.
-            if i_phi >= self.nbins_phi:
-                i_phi = 0
-            phi_bins[i_phi] += frac * data[npt]
-
-            if err_data is None or err_data[npt] == 0.0:
-                if data_n < 0:
-                    data_n = -data_n
-                phi_err[i_phi] += frac * frac * math.fabs(data_n)
-            else:
-                phi_err[i_phi] += frac * frac * err_data[npt] * err_data[npt]
-            phi_counts[i_phi] += frac
+        # binning
+        i_phi = np.floor((self.nbins_phi) *
+                         (phi_value + phi_shift) / (2 * Pi)).astype(int)
+        # Take care of the edge case at phi = 2pi.
+        i_phi[i_phi >= self.nbins_phi] = 0
+        return _BinMap(index, i_phi, self.nbins_phi, self._average)
 
-        for i in range(self.nbins_phi):
-            phi_bins[i] = phi_bins[i] / phi_counts[i]
-            phi_err[i] = math.sqrt(phi_err[i]) / phi_counts[i]
-            phi_values[i] = 2.0 * math.pi / self.nbins_phi * (1.0 * i)
+    def _average(self, x, y, err_y, y_counts, err_x):
+        """
+        Turn the bin sums into the averaged I(phi).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            phi_bins = y / y_counts
+            phi_err = np.sqrt(err_y) / y_counts
+        phi_values = 2.0 * math.pi / self.nbins_phi * np.arange(self.nbins_phi)
 
         idx = (np.isfinite(phi_bins))
 
@@ -822,26 +1214,26 @@ class _Sector(object):
 
         :return: Data1D object
         """
+        return _bin_average(
+            self._bin_map(data2D, np.isfinite(data2D.data), run), data2D)
+
+    def _bin_map(self, data2D, select, run=None):
+        """
+        Find the bin of each selected pixel inside the sector.
+
+        :param data2D: Data2D object
+        :param select: boolean array of the pixels to consider
+        :param run: define the varying parameter ('phi' , 'q' , or 'q2');
+            defaults to that of the subclass
+        :return: _BinMap object
+        """
         if data2D.__class__.__name__ not in ["Data2D", "plottable_2D"]:
             raise RuntimeError("Ring averaging only take plottable_2D objects")
+        if run is None:
+            run = self._run
 
         # Get the all data & info
-        data = data2D.data[np.isfinite(data2D.data)]
-        q_data = data2D.q_data[np.isfinite(data2D.data)]
-        err_data = data2D.err_data[np.isfinite(data2D.data)]
-        qx_data = data2D.qx_data[np.isfinite(data2D.data)]
-        qy_data = data2D.qy_data[np.isfinite(data2D.data)]
-
-        dq_data = None
-        if data2D.dqx_data is not None and data2D.dqy_data is not None:
-            dq_data = get_dq_data(data2D)
-
-        # set space for 1d outputs
-        x = np.zeros(self.nbins)
-        y = np.zeros(self.nbins)
-        y_err = np.zeros(self.nbins)
-        x_err = np.zeros(self.nbins)
-        y_counts = np.zeros(self.nbins)  # Cycle counts (for the mean)
+        q_data = data2D.q_data
 
         # Get the min and max into the region: 0 <= phi < 2Pi
         phi_min = flip_phi(self.phi_min)
@@ -853,79 +1245,61 @@ class _Sector(object):
         else:
             binning = Binning(self.r_min, self.r_max, self.nbins, self.base)
 
-        for n in range(len(data)):
-
-            # q-value at the pixel (j,i)
-            q_value = q_data[n]
-            data_n = data[n]
-
-            # Is pixel within range?
-            is_in = False
-
-            # phi-value of the pixel (j,i)
-            phi_value = math.atan2(qy_data[n], qx_data[n]) + math.pi
-
-            # No need to calculate: data outside of the radius
-            if self.r_min > q_value or q_value > self.r_max:
-                continue
-
-            # In case of two ROIs (symmetric major and minor regions)(for 'q2')
-            if run.lower() == 'q2':
-                # For minor sector wing
-                # Calculate the minor wing phis
-                phi_min_minor = flip_phi(phi_min - math.pi)
-                phi_max_minor = flip_phi(phi_max - math.pi)
-                # Check if phis of the minor ring is within 0 to 2pi
-                if phi_min_minor > phi_max_minor:
-                    is_in = (phi_value > phi_min_minor or
-                             phi_value < phi_max_minor)
-                else:
-                    is_in = (phi_value > phi_min_minor and
-                             phi_value < phi_max_minor)
-
-            # For all cases(i.e.,for 'q', 'q2', and 'phi')
-            # Find pixels within ROI
-            if phi_min > phi_max:
-                is_in = is_in or (phi_value > phi_min or
-                                  phi_value < phi_max)
-            else:
-                is_in = is_in or (phi_value >= phi_min and
-                                  phi_value < phi_max)
+        # phi-value of each pixel
+        phi_value = _phi_data(data2D.qx_data, data2D.qy_data)
 
-            # data oustide of the phi range
-            if not is_in:
-                continue
+        # No need to calculate: data outside of the radius
+        in_roi = select & (self.r_min <= q_data) & (q_data <= self.r_max)
 
-            # Get the binning index
-            if run.lower() == 'phi':
-                i_bin = binning.get_bin_index(phi_value)
-            else:
-                i_bin = binning.get_bin_index(q_value)
-
-            # Take care of the edge case at phi = 2pi.
-            if i_bin == self.nbins:
-                i_bin = self.nbins - 1
-
-            # Get the total y
-            y[i_bin] += data_n
-            x[i_bin] += q_value
-            if err_data[n] is None or err_data[n] == 0.0:
-                if data_n < 0:
-                    data_n = -data_n
-                y_err[i_bin] += data_n
-            else:
-                y_err[i_bin] += err_data[n]**2
-
-            if dq_data is not None:
-                # To be consistent with dq calculation in 1d reduction,
-                # we need just the averages (not quadratures) because
-                # it should not depend on the number of the q points
-                # in the qr bins.
-                x_err[i_bin] += dq_data[n]
+        # Is pixel within range?
+        # For all cases(i.e.,for 'q', 'q2', and 'phi')
+        # Find pixels within ROI
+        if phi_min > phi_max:
+            is_in = (phi_value > phi_min) | (phi_value < phi_max)
+        else:
+            is_in = (phi_value >= phi_min) & (phi_value < phi_max)
+
+        # In case of two ROIs (symmetric major and minor regions)(for 'q2')
+        if run.lower() == 'q2':
+            # For minor sector wing
+            # Calculate the minor wing phis
+            phi_min_minor = flip_phi(phi_min - math.pi)
+            phi_max_minor = flip_phi(phi_max - math.pi)
+            # Check if phis of the minor ring is within 0 to 2pi
+            if phi_min_minor > phi_max_minor:
+                is_in |= ((phi_value > phi_min_minor) |
+                          (phi_value < phi_max_minor))
             else:
-                x_err = None
-            y_counts[i_bin] += 1
+                is_in |= ((phi_value > phi_min_minor) &
+                          (phi_value < phi_max_minor))
+
+        # data oustide of the phi range
+        index = np.flatnonzero(in_roi & is_in)
+        q_value = q_data[index]
 
+        # Get the binning index
+        if run.lower() == 'phi':
+            i_bin = binning.get_bin_index(phi_value[index])
+        else:
+            i_bin = binning.get_bin_index(q_value)
+
+        # Take care of the edge case at phi = 2pi.
+        i_bin[i_bin == self.nbins] = self.nbins - 1
+        i_bin = _wrap_bin_index(i_bin, self.nbins)
+
+        # To be consistent with dq calculation in 1d reduction,
+        # we need just the averages (not quadratures) because
+        # it should not depend on the number of the q points
+        # in the qr bins.
+        average = lambda x, y, err_y, y_counts, err_x: self._average(
+            x, y, err_y, y_counts, err_x, run)
+        return _BinMap(index, i_bin, self.nbins, average, x_value=q_value,
+                       dq_value=_dq_value(data2D, index))
+
+    def _average(self, x, y, y_err, y_counts, x_err, run):
+        """
+        Turn the bin sums into the averaged I(phi) or I(Q).
+        """
         # Organize the results
         with np.errstate(divide='ignore', invalid='ignore'):
             y = y/y_counts
@@ -968,6 +1342,7 @@ class SectorPhi(_Sector):
     A sector is defined by r_min, r_max, phi_min, phi_max.
     The number of bin in phi also has to be defined.
     """
+    _run = 'phi'
 
     def __call__(self, data2D):
         """
@@ -988,6 +1363,7 @@ class SectorQ(_Sector):
     r_min, r_max, phi_min, phi_max >0.
     The number of bin in Q also has to be defined.
     """
+    _run = 'q2'
 
     def __call__(self, data2D):
         """
@@ -1001,6 +1377,167 @@ class SectorQ(_Sector):
 
 ################################################################################
 
+class AveragingPlan(object):
+    """
+    Reusable averaging of many frames sharing one detector geometry.
+
+    The pixel to bin mapping of an averager (CircularAverage, Ring,
+    SectorQ, SectorPhi, SlabX, SlabY, Boxsum, Boxavg, MultiBoxsum or
+    MultiBoxavg) is computed once
+    from the q values, resolution and mask of a Data2D and stored as a
+    sparse (nbins x npixels) matrix.  Averaging a new frame is then a
+    single sparse matrix product with its intensities and errors, and
+    gives the same result as calling the averager on that frame.
+
+    Plans for a given averager and geometry are best obtained through
+    :func:`get_averaging_plan`, which caches them.
+    """
+
+    def __init__(self, averager, data2D, ismask=False):
+        """
+        :param averager: averager object defining the region of interest
+        :param data2D: Data2D object providing the detector geometry
+        :param ismask: restrict the average to the pixels of data2D.mask,
+            as for CircularAverage
+        """
+        self.averager = averager
+        self.npix = len(data2D.qx_data)
+        select = np.ones(self.npix, dtype=bool)
+        if ismask:
+            select &= data2D.mask.astype(bool)
+        bin_map = averager._bin_map(data2D, select)
+        self._average = bin_map.average
+        self.nbins = bin_map.nbins
+        weight = bin_map.weight
+        if weight is None:
+            weight = np.ones(len(bin_map.index))
+        self.matrix = sparse.csr_matrix(
+            (weight, (bin_map.i_bin, bin_map.index)),
+            shape=(self.nbins, self.npix))
+        # Errors add in quadrature, so partial pixels enter the error sums
+        # with the square of their weight.
+        self._err_matrix = self.matrix
+        if bin_map.weight is not None:
+            self._err_matrix = sparse.csr_matrix(
+                (weight * weight, (bin_map.i_bin, bin_map.index)),
+                shape=(self.nbins, self.npix))
+
+        # Per-pixel geometric quantities, and their sums over each bin
+        # for frames where every pixel is finite.
+        self._x_value = self._dq_value = None
+        columns = [np.ones(self.npix)]
+        if bin_map.x_value is not None:
+            self._x_value = np.zeros(self.npix)
+            self._x_value[bin_map.index] = bin_map.x_value
+            columns.append(self._x_value)
+        if bin_map.dq_value is not None:
+            self._dq_value = np.zeros(self.npix)
+            self._dq_value[bin_map.index] = bin_map.dq_value
+            columns.append(self._dq_value)
+        self._geometry_sums = self._bin_sums(columns)
+
+    def __call__(self, data2D):
+        """
+        Average a frame taken on the geometry of the plan.
+
+        :param data2D: Data2D object
+        :return: output of the averager for data2D
+        """
+        return self.apply(data2D.data, data2D.err_data)
+
+    def apply(self, data, err_data=None):
+        """
+        Average an intensity array taken on the geometry of the plan.
+
+        :param data: intensity of each pixel
+        :param err_data: uncertainty of each pixel; pixels without one use
+            the Poisson estimate as for the averagers
+        :return: output of the averager
+        """
+        data = np.asarray(data, dtype=float)
+        if len(data) != self.npix:
+            msg = "AveragingPlan: expected %d pixels, got %d"
+            raise ValueError(msg % (self.npix, len(data)))
+        err_y = _err_squared(data, err_data)
+        finite = np.isfinite(data)
+        if finite.all():
+            columns = [data, err_y]
+        else:
+            # Drop the pixels without a finite intensity from every sum
+            weight = finite.astype(float)
+            columns = [np.where(finite, data, 0.0),
+                       np.where(finite, err_y, 0.0), weight]
+            for value in (self._x_value, self._dq_value):
+                if value is not None:
+                    columns.append(value * weight)
+        if self._err_matrix is not self.matrix:
+            err_column = columns.pop(1)
+        sums = self._bin_sums(columns)
+        if self._err_matrix is not self.matrix:
+            sums.insert(1, self._err_matrix.dot(err_column))
+        geometry = self._geometry_sums if finite.all() else sums[2:]
+        y, err_y = sums[:2]
+        y_counts = geometry[0]
+        x = geometry[1] if self._x_value is not None else None
+        err_x = geometry[-1] if self._dq_value is not None else None
+        return self._average(x, y, err_y, y_counts, err_x)
+
+    def _bin_sums(self, columns):
+        """
+        Sum each column of per-pixel values into the bins of the plan.
+        """
+        sums = self.matrix.dot(np.column_stack(columns))
+        return [sums[:, k] for k in range(sums.shape[1])]
+
+
+_PLAN_CACHE = OrderedDict()
+_PLAN_CACHE_SIZE = 16
+
+
+def _geometry_key(data2D, ismask):
+    """
+    Hash of the Data2D arrays that an averaging plan depends on.
+    """
+    digest = hashlib.sha1()
+    arrays = [data2D.qx_data, data2D.qy_data, data2D.q_data,
+              data2D.dqx_data, data2D.dqy_data]
+    if ismask:
+        arrays.append(data2D.mask)
+    for array in arrays:
+        if array is None:
+            digest.update(b'None')
+        else:
+            array = np.ascontiguousarray(array)
+            digest.update(str((array.dtype, array.shape)).encode())
+            digest.update(array.view(np.uint8))
+    digest.update(str(len(data2D.detector)).encode())
+    return digest.hexdigest()
+
+
+def get_averaging_plan(averager, data2D, ismask=False):
+    """
+    Return an :class:`AveragingPlan` for *averager* on the geometry of
+    *data2D*, reusing a cached plan when the averager settings and the
+    geometry hash match one computed before.
+
+    :param averager: averager object defining the region of interest
+    :param data2D: Data2D object providing the detector geometry
+    :param ismask: restrict the average to the pixels of data2D.mask
+    :return: AveragingPlan object
+    """
+    key = (averager.__class__.__name__,
+           tuple(sorted(vars(averager).items())),
+           ismask, _geometry_key(data2D, ismask))
+    plan = _PLAN_CACHE.pop(key, None)
+    if plan is None:
+        plan = AveragingPlan(averager, data2D, ismask=ismask)
+    _PLAN_CACHE[key] = plan
+    while len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+        _PLAN_CACHE.popitem(last=False)
+    return plan
+
+################################################################################
+
 class Ringcut(object):
     """
     Defines a ring on a 2D data set.
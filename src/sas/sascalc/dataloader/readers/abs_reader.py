@@ -13,7 +13,7 @@ import logging
 
 import numpy as np
 
-from sas.sascalc.data_util.nxsunit import Converter
+from sas.sascalc.data_util.nxsunit import get_converter
 from ..file_reader_base_class import FileReader
 from ..data_info import DataInfo, plottable_1D, Data1D, Detector
 from ..loader_exceptions import FileContentsException, DefaultReaderException
@@ -58,8 +58,8 @@ class Reader(FileReader):
 
         base_q_unit = '1/A'
         base_i_unit = '1/cm'
-        data_conv_q = Converter(base_q_unit)
-        data_conv_i = Converter(base_i_unit)
+        data_conv_q = get_converter(base_q_unit)
+        data_conv_i = get_converter(base_i_unit)
 
         for line in lines:
             # Information line 1
@@ -73,7 +73,7 @@ class Reader(FileReader):
                 try:
                     value = float(line_toks[1])
                     if self.current_datainfo.source.wavelength_unit != 'A':
-                        conv = Converter('A')
+                        conv = get_converter('A')
                         self.current_datainfo.source.wavelength = conv(value,
                             units=self.current_datainfo.source.wavelength_unit)
                     else:
@@ -86,7 +86,7 @@ class Reader(FileReader):
                 try:
                     value = float(line_toks[3])
                     if detector.distance_unit != 'm':
-                        conv = Converter('m')
+                        conv = get_converter('m')
                         detector.distance = conv(value,
                                         units=detector.distance_unit)
                     else:
@@ -113,7 +113,7 @@ class Reader(FileReader):
                     else:
                         value = float(line_toks[5])
                     if self.current_datainfo.sample.thickness_unit != 'cm':
-                        conv = Converter('cm')
+                        conv = get_converter('cm')
                         self.current_datainfo.sample.thickness = conv(value,
                             units=self.current_datainfo.sample.thickness_unit)
                     else:
@@ -136,7 +136,7 @@ class Reader(FileReader):
 
                 # Bin size
                 if detector.pixel_size_unit != 'mm':
-                    conv = Converter('mm')
+                    conv = get_converter('mm')
                     detector.pixel_size.x = conv(5.08,
                                         units=detector.pixel_size_unit)
                     detector.pixel_size.y = conv(5.08,
@@ -148,7 +148,7 @@ class Reader(FileReader):
                 # Store beam center in distance units
                 # Det 640 x 640 mm
                 if detector.beam_center_unit != 'mm':
-                    conv = Converter('mm')
+                    conv = get_converter('mm')
                     detector.beam_center.x = conv(center_x * 5.08,
                                      units=detector.beam_center_unit)
                     detector.beam_center.y = conv(center_y * 5.08,
@@ -178,14 +178,6 @@ class Reader(FileReader):
                     _dy = float(toks[2])
                     _dx = float(toks[3])
 
-                    if data_conv_q is not None:
-                        _x = data_conv_q(_x, units=base_q_unit)
-                        _dx = data_conv_q(_dx, units=base_q_unit)
-
-                    if data_conv_i is not None:
-                        _y = data_conv_i(_y, units=base_i_unit)
-                        _dy = data_conv_i(_dy, units=base_i_unit)
-
                     self.current_dataset.x[data_line] = _x
                     self.current_dataset.y[data_line] = _y
                     self.current_dataset.dy[data_line] = _dy
@@ -214,6 +206,19 @@ class Reader(FileReader):
             if line.startswith("The 6 columns") or line.startswith("EMP LEVEL"):
                 is_data_started = True
 
+        # Convert the data to the base units a column at a time
+        dataset = self.current_dataset
+        if data_conv_q is not None:
+            dataset.x = data_conv_q(dataset.x, units=base_q_unit)
+            for attr in ('dx', 'dxl'):
+                if getattr(dataset, attr) is not None:
+                    setattr(dataset, attr,
+                            data_conv_q(getattr(dataset, attr),
+                                        units=base_q_unit))
+        if data_conv_i is not None:
+            dataset.y = data_conv_i(dataset.y, units=base_i_unit)
+            dataset.dy = data_conv_i(dataset.dy, units=base_i_unit)
+
         self.remove_empty_q_values()
 
         # Sanity check
@@ -13,6 +13,10 @@
 #############################################################################
 
 import logging
+from itertools import compress
+
+import numpy as np
+
 from sas.sascalc.dataloader.file_reader_base_class import FileReader
 from sas.sascalc.dataloader.data_info import DataInfo, plottable_1D
 from sas.sascalc.dataloader.loader_exceptions import FileContentsException,\
@@ -50,87 +54,10 @@ class Reader(FileReader):
         self.output = []
         self.current_datainfo = DataInfo()
         self.current_datainfo.filename = filepath
-        self.reset_data_list(len(lines))
 
-        # The first good line of data will define whether
-        # we have 2-column or 3-column ascii
-        has_error_dx = None
-        has_error_dy = None
-
-        # Initialize counters for data lines and header lines.
-        is_data = False
+        rows, lentoks = self._find_data_block(lines)
         # More than "5" lines of data is considered as actual
-        # To count # of current data candidate lines
-        candidate_lines = 0
-        # To count total # of previous data candidate lines
-        candidate_lines_previous = 0
-        # Current line number
-        line_no = 0
-        # minimum required number of columns of data
-        lentoks = 2
-        for line in lines:
-            toks = self.splitline(line.strip())
-            # To remember the number of columns in the current line of data
-            new_lentoks = len(toks)
-            try:
-                if new_lentoks == 0:
-                    # If the line is blank, skip and continue on
-                    # In case of breaks within data sets.
-                    continue
-                elif new_lentoks != lentoks and is_data:
-                    # If a footer is found, break the loop and save the data
-                    break
-                elif new_lentoks != lentoks and not is_data:
-                    # If header lines are numerical
-                    candidate_lines = 0
-                    self.reset_data_list(len(lines) - line_no)
-
-                self.current_dataset.x[candidate_lines] = float(toks[0])
-
-                if new_lentoks > 1:
-                    self.current_dataset.y[candidate_lines] = float(toks[1])
-
-                # If a 3rd row is present, consider it dy
-                if new_lentoks > 2:
-                    self.current_dataset.dy[candidate_lines] = \
-                        float(toks[2])
-                    has_error_dy = True
-
-                # If a 4th row is present, consider it dx
-                if new_lentoks > 3:
-                    self.current_dataset.dx[candidate_lines] = \
-                        float(toks[3])
-                    has_error_dx = True
-
-                candidate_lines += 1
-                # If 5 or more lines, this is considering the set data
-                if candidate_lines >= self.min_data_pts:
-                    is_data = True
-
-                if is_data and new_lentoks >= 8:
-                    msg = "This data looks like 2D ASCII data. Use the file "
-                    msg += "converter tool to convert it to NXcanSAS."
-                    raise FileContentsException(msg)
-
-                # To remember the # of columns on the current line
-                # for the next line of data
-                lentoks = new_lentoks
-                line_no += 1
-            except ValueError:
-                # ValueError is raised when non numeric strings conv. to float
-                # It is data and meet non - number, then stop reading
-                if is_data:
-                    break
-                # Delete the previously stored lines of data candidates if
-                # the list is not data
-                self.reset_data_list(len(lines) - line_no)
-                lentoks = 2
-                has_error_dx = None
-                has_error_dy = None
-                # Reset # of lines of data candidates
-                candidate_lines = 0
-
-        if not is_data:
+        if len(rows) < self.min_data_pts:
             self.set_all_to_none()
             if self.extension in self.ext:
                 msg = "ASCII Reader error: Fewer than five Q data points found "
@@ -139,25 +66,141 @@ class Reader(FileReader):
             else:
                 msg = "ASCII Reader could not load the file {}".format(filepath)
                 raise DefaultReaderException(msg)
-        # Sanity check
-        if has_error_dy and not len(self.current_dataset.y) == \
-                len(self.current_dataset.dy):
-            msg = "ASCII Reader error: Number of I and dI data points are"
-            msg += " different in {}.".format(filepath)
-            # TODO: Add error to self.current_datainfo.errors instead?
-            self.set_all_to_none()
-            raise FileContentsException(msg)
-        if has_error_dx and not len(self.current_dataset.x) == \
-                len(self.current_dataset.dx):
-            msg = "ASCII Reader error: Number of Q and dQ data points are"
-            msg += " different in {}.".format(filepath)
-            # TODO: Add error to self.current_datainfo.errors instead?
-            self.set_all_to_none()
+        if lentoks >= 8:
+            msg = "This data looks like 2D ASCII data. Use the file "
+            msg += "converter tool to convert it to NXcanSAS."
             raise FileContentsException(msg)
 
+        # Columns are Q, I, dI and dQ; missing ones are left as zeros
+        values = self._parse_data_block(rows, lentoks)
+        self.reset_data_list(len(values))
+        for column, name in enumerate(('x', 'y', 'dy', 'dx')[:lentoks]):
+            setattr(self.current_dataset, name, values[:, column])
+
         self.remove_empty_q_values()
         self.current_dataset = self.set_default_1d_units(self.current_dataset)
 
         # Store loading process information
         self.current_datainfo.meta_data['loader'] = self.type_name
         self.send_to_output()
+
+    def _find_data_block(self, lines):
+        """
+        Find the block of data lines in the file.
+
+        The data block is the first run of at least min_data_pts numerical
+        lines with the same number of columns, ignoring blank lines, and ends
+        at the first line with a different number of columns. Only the lines
+        before the data block is found are converted here; the lines of the
+        block are converted together by _parse_data_block.
+
+        :param lines: The lines of the file
+        :return: The lines of the data block (or of the last data candidate
+            lines if no data was found), and their number of columns
+        """
+        # Lines of the current data candidates
+        rows = []
+        # minimum required number of columns of data
+        lentoks = 2
+        for line_no, line in enumerate(lines):
+            toks = self.splitline(line.strip())
+            # To remember the number of columns in the current line of data
+            new_lentoks = len(toks)
+            if new_lentoks == 0:
+                # If the line is blank, skip and continue on
+                # In case of breaks within data sets.
+                continue
+            if new_lentoks != lentoks:
+                # If header lines are numerical
+                rows = []
+            try:
+                for tok in toks[:4]:
+                    float(tok)
+            except ValueError:
+                # Delete the previously stored lines of data candidates if
+                # the list is not data
+                rows = []
+                lentoks = 2
+                continue
+            rows.append(line)
+            # To remember the # of columns on the current line
+            # for the next line of data
+            lentoks = new_lentoks
+            # If 5 or more lines, this is considering the set data
+            if len(rows) >= self.min_data_pts:
+                break
+        else:
+            return rows, lentoks
+
+        # The data continues up to the first line with a different number
+        # of columns, which is found without converting the values.
+        rest = lines[line_no + 1:]
+        counts = self.count_columns(rest)
+        footer = np.flatnonzero((counts != 0) & (counts != lentoks))
+        if footer.size > 0:
+            rest = rest[:footer[0]]
+            counts = counts[:footer[0]]
+        rows.extend(compress(rest, counts))
+        return rows, lentoks
+
+    def _parse_data_block(self, rows, lentoks):
+        """
+        Convert the Q, I, dI and dQ columns of the data block to floats.
+
+        A line with a non numerical value in these columns ends the data,
+        as for a footer.
+
+        :param rows: The lines of the data block
+        :param lentoks: The number of columns of the data block
+        :return: An array with a row for each line and up to four columns
+        """
+        n_cols = min(lentoks, 4)
+        try:
+            return np.loadtxt(rows, delimiter=self.find_delimiter(rows[0]),
+                              comments=None, usecols=range(n_cols), ndmin=2)
+        except ValueError:
+            pass
+        # Mixed delimiters or text: convert up to the first bad line
+        values = []
+        for line in rows:
+            try:
+                values.append([float(tok) for tok in
+                               self.splitline(line.strip())[:n_cols]])
+            except ValueError:
+                break
+        return np.array(values, dtype=np.float64).reshape(-1, n_cols)
+
+    @staticmethod
+    def find_delimiter(line):
+        """
+        Find the delimiter splitline would use for a line of text
+
+        :param line: A single line of text
+        :return: ',' or ';', or None for whitespace
+        """
+        for delimiter in (',', ';'):
+            if delimiter in line:
+                return delimiter
+        return None
+
+    @staticmethod
+    def count_columns(lines):
+        """
+        Count the values splitline would find in each line of text, without
+        converting them
+
+        :param lines: A list of lines of text
+        :return: An array with the number of values in each line
+        """
+        text = "\n".join(lines)
+        if ',' not in text and ';' not in text:
+            return np.array([len(line.split()) for line in lines], dtype=int)
+        counts = []
+        for line in lines:
+            if ',' in line:
+                counts.append(line.count(',') + 1)
+            elif ';' in line:
+                counts.append(line.count(';') + 1)
+            else:
+                counts.append(len(line.split()))
+        return np.array(counts, dtype=int)
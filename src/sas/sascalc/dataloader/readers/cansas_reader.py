@@ -12,7 +12,7 @@ from xml.dom.minidom import parseString
 
 from lxml import etree
 
-from sas.sascalc.data_util.nxsunit import Converter
+from sas.sascalc.data_util.nxsunit import convert
 
 # For saving individual sections of data
 from ..data_info import Data1D, Data2D, DataInfo, plottable_1D, plottable_2D, \
@@ -37,6 +37,11 @@ CONSTANTS = CansasConstants()
 CANSAS_FORMAT = CONSTANTS.format
 CANSAS_NS = CONSTANTS.names
 ALLOW_ALL = True
+# Idata elements of 1D data and the plottable_1D arrays they are stored in
+IDATA_COLUMNS = {'Q': 'x', 'I': 'y', 'Idev': 'dy', 'Qdev': 'dx', 'dQw': 'dxw',
+                 'dQl': 'dxl'}
+# Idata elements of 1D data that are not stored
+IDATA_IGNORED = ('Qmean', 'Shadowfactor')
 
 class Reader(XMLreader):
     cansas_version = "1.0"
@@ -213,6 +218,8 @@ class Reader(XMLreader):
             self._initialize_new_data_set(dom)
         self.base_ns = "{" + CANSAS_NS.get(self.cansas_version).get("ns") + "}"
 
+        # Set to True once the Idata points of 1D data are stored by column
+        idata_stored = None
         # Loop through each child in the parent element
         for node in dom:
             attr = node.attrib
@@ -224,6 +231,12 @@ class Reader(XMLreader):
             # Skip this iteration when loading in save state information
             if tagname in ["fitting_plug_in", "pr_inversion", "invariant", "corfunc"]:
                 continue
+            if tagname == 'Idata' and isinstance(self.current_dataset,
+                                                 plottable_1D):
+                if idata_stored is None:
+                    idata_stored = self._parse_idata_1d(dom)
+                if idata_stored:
+                    continue
             # Get where to store content
             self.names.append(tagname_original)
             self.ns_list = CONSTANTS.iterate_namespace(self.names)
@@ -498,6 +511,70 @@ class Reader(XMLreader):
             self.reset_data_list()
             return self.output[0], None
 
+    def _parse_idata_1d(self, dom):
+        """
+        Store all the Idata points of a SASdata element of 1D data, one
+        column at a time, so the units of each column are converted once.
+
+        :param dom: The SASdata element
+        :return: False, with nothing stored, if the points have to be read
+            one element at a time
+        """
+        def xpath(path):
+            return dom.xpath(path, namespaces=namespaces, smart_strings=False)
+
+        namespaces = {'ns': self.base_ns[1:-1]}
+        # Points with no values or with nested elements
+        if xpath("boolean(ns:Idata[not(*)] | ns:Idata/*/* | "
+                 "ns:Idata/*/processing-instruction())"):
+            return False
+        counts = dict((tagname, int(xpath("count(ns:Idata/ns:%s)" % tagname)))
+                      for tagname in list(IDATA_COLUMNS) + list(IDATA_IGNORED))
+        # Points with unknown elements
+        if sum(counts.values()) != int(xpath("count(ns:Idata/*)")):
+            return False
+
+        values = {}
+        for tagname in IDATA_COLUMNS:
+            if counts[tagname] == 0:
+                continue
+            texts = xpath("ns:Idata/ns:%s/text()" % tagname)
+            units = xpath("ns:Idata/ns:%s/@unit" % tagname)
+            # Empty elements, or units given for some points only or
+            # changing from point to point
+            if (len(texts) != counts[tagname]
+                    or 0 < len(units) < counts[tagname]
+                    or len(set(units)) > 1):
+                return False
+            try:
+                column = np.array(texts, dtype=float)
+            except ValueError:
+                return False
+            # nan values are stored as zero
+            for i in np.flatnonzero(np.isnan(column)):
+                if texts[i].strip().lower() == "nan":
+                    column[i] = 0.0
+            values[tagname] = column
+
+        names = self.names
+        try:
+            for tagname, column in values.items():
+                node = dom.find("{0}Idata/{0}{1}".format(self.base_ns,
+                                                         tagname))
+                self.names = names + ['Idata', tagname]
+                self.ns_list = CONSTANTS.iterate_namespace(self.names)
+                column, unit = self._unit_conversion(node, tagname, column)
+                if tagname == 'Q':
+                    self.current_dataset.xaxis("Q", unit)
+                elif tagname == 'I':
+                    self.current_dataset.yaxis("Intensity", unit)
+                attr = IDATA_COLUMNS[tagname]
+                setattr(self.current_dataset, attr,
+                        np.append(getattr(self.current_dataset, attr), column))
+        finally:
+            self.names = names
+        return True
+
     def _is_call_local(self):
         if self.frm == "":
             inter = inspect.stack()
@@ -581,7 +658,7 @@ class Reader(XMLreader):
         value_unit = ''
         err_msg = None
         default_unit = None
-        if not isinstance(node_value, float):
+        if not isinstance(node_value, (float, np.ndarray)):
             node_value = float(node_value)
         if 'unit' in attr and attr.get('unit') is not None:
             try:
@@ -621,9 +698,8 @@ class Reader(XMLreader):
                         and local_unit.lower() != "none"):
                     # Check local units - bad units raise KeyError
                     #print("loading", tagname, node_value, local_unit, default_unit)
-                    data_conv_q = Converter(local_unit)
                     value_unit = default_unit
-                    node_value = data_conv_q(node_value, units=default_unit)
+                    node_value = convert(node_value, local_unit, default_unit)
                 else:
                     value_unit = local_unit
             except KeyError:
@@ -648,12 +724,10 @@ class Reader(XMLreader):
 
     def _initialize_new_data_set(self, node=None):
         if node is not None:
-            for child in node:
-                if child.tag.replace(self.base_ns, "") == "Idata":
-                    for i_child in child:
-                        if i_child.tag.replace(self.base_ns, "") == "Qx":
-                            self.current_dataset = plottable_2D()
-                            return
+            namespaces = {'ns': self.base_ns[1:-1]}
+            if node.xpath("boolean(ns:Idata/ns:Qx)", namespaces=namespaces):
+                self.current_dataset = plottable_2D()
+                return
         self.current_dataset = plottable_1D(np.array(0), np.array(0))
 
     ## Writing Methods
@@ -1237,8 +1311,8 @@ class Reader(XMLreader):
                 local_unit = getattr(storage, toks[0]+"_unit")
                 if local_unit is not None and units.lower() != local_unit.lower():
                     try:
-                        conv = Converter(units)
-                        setattrchain(storage, variable, conv(value, units=local_unit))
+                        setattrchain(storage, variable,
+                                     convert(value, units, local_unit))
                     except Exception as exc:
                         err_mess = "CanSAS reader: could not convert"
                         err_mess += " %s unit [%s]; expecting [%s]\n  %s" \
@@ -4,6 +4,7 @@
 
 import h5py
 import numpy as np
+import copy
 import re
 import os
 import sys
@@ -44,6 +45,11 @@ class Reader(FileReader):
     within each SASdata group can be a single 1D I(Q), multi-framed 1D I(Q),
     2D I(Qx, Qy) or multi-framed 2D I(Qx, Qy).
 
+    With lazy=True, the intensities of multi-framed 1D data are not read
+    with the rest of the file. Each such SASdata group is returned as a
+    :class:`FrameSet` that reads its frames from the file on demand, and the
+    file is kept open until the FrameSet is closed or garbage collected.
+
     :Dependencies:
         The NXcanSAS HDF5 reader requires h5py => v2.5.0 or later.
     """
@@ -59,6 +65,11 @@ class Reader(FileReader):
     # Flag to bypass extension check
     allow_all = True
 
+    def __init__(self, lazy=False):
+        super(Reader, self).__init__()
+        # Read the frames of multi-framed data on demand
+        self.lazy = lazy
+
     def get_file_contents(self):
         """
         This is the general read method that all SasView data_loaders must have.
@@ -95,8 +106,10 @@ class Reader(FileReader):
                 except Exception as exc:
                     raise FileContentsException(exc.message)
                 finally:
-                    # Close the data file
-                    self.raw_data.close()
+                    # Close the data file unless frames are still to be read
+                    if not any(isinstance(data_set, FrameSet)
+                               for data_set in self.output):
+                        self.raw_data.close()
 
                 for data_set in self.output:
                     if isinstance(data_set, Data1D):
@@ -116,6 +129,8 @@ class Reader(FileReader):
         self.multi_frame = False
         self.data_frames = []
         self.data_uncertainty_frames = []
+        self.frame_nodes = {}
+        self.frame_sets = []
         self.errors = []
         self.logging = []
         self.q_names = []
@@ -174,9 +189,17 @@ class Reader(FileReader):
                 parent_list.remove(key)
 
             elif isinstance(value, h5py.Dataset):
-                # If this is a dataset, store the data appropriately
-                data_set = value.value
                 unit = self._get_unit(value)
+                if (self.lazy and self.multi_frame
+                        and self.parent_class == u'SASdata'
+                        and key in (self.i_name, self.i_uncertainties_name)):
+                    # Leave the frames in the file until they are needed
+                    self.frame_nodes[key] = value
+                    if key == self.i_name:
+                        self.current_dataset.yaxis("Intensity", unit)
+                    continue
+                # If this is a dataset, store the data appropriately
+                data_set = value[()]
 
                 for data_point in data_set:
                     if isinstance(data_point, np.ndarray):
@@ -269,6 +292,7 @@ class Reader(FileReader):
             if self.multi_frame:
                 for x in range(0, data_set.shape[0]):
                     self.data_frames.append(data_set[x].flatten())
+                self.current_dataset.yaxis("Intensity", unit)
             else:
                 self.current_dataset.y = data_set.flatten()
                 self.current_dataset.yaxis("Intensity", unit)
@@ -538,15 +562,24 @@ class Reader(FileReader):
             if isinstance(self.current_dataset, plottable_2D):
                 self.data2d.append(self.current_dataset)
             elif isinstance(self.current_dataset, plottable_1D):
-                if self.multi_frame:
+                if self.multi_frame and self.lazy:
+                    self.frame_sets.append(FrameSet(
+                        self.current_dataset,
+                        self.frame_nodes.get(self.i_name),
+                        self.frame_nodes.get(self.i_uncertainties_name)))
+                elif self.multi_frame:
+                    # One data set per frame, sharing the Q arrays
                     for x in range(0, len(self.data_frames)):
-                        self.current_dataset.y = self.data_frames[x]
+                        frame = copy.copy(self.current_dataset)
+                        frame.y = self.data_frames[x]
                         if len(self.data_uncertainty_frames) > x:
-                            self.current_dataset.dy = \
-                                self.data_uncertainty_frames[x]
-                        self.data1d.append(self.current_dataset)
+                            frame.dy = self.data_uncertainty_frames[x]
+                        self.data1d.append(frame)
                 else:
                     self.data1d.append(self.current_dataset)
+                self.data_frames = []
+                self.data_uncertainty_frames = []
+                self.frame_nodes = {}
 
     def final_data_cleanup(self):
         """
@@ -602,6 +635,10 @@ class Reader(FileReader):
             self.current_dataset = dataset
             self.send_to_output()
 
+        for frame_set in self.frame_sets:
+            frame_set.datainfo = self.current_datainfo
+            self.output.append(frame_set)
+
     def add_data_set(self, key=""):
         """
         Adds the current_dataset to the list of outputs after preforming final
@@ -615,6 +652,8 @@ class Reader(FileReader):
             self.final_data_cleanup()
         self.data_frames = []
         self.data_uncertainty_frames = []
+        self.frame_nodes = {}
+        self.frame_sets = []
         self.data1d = []
         self.data2d = []
         self.current_datainfo = DataInfo()
@@ -739,3 +778,63 @@ class Reader(FileReader):
         if unit is None:
             unit = h5attr(value, u'unit')
         return unit
+
+
+class FrameSet(object):
+    """
+    The frames of a multi-framed 1D SASdata group, read from the file on
+    demand by a lazy :class:`Reader`.
+
+    Indexing returns a Data1D for that frame, processed the same way as the
+    data sets returned by the reader, and slicing returns a list of them.
+    Only the intensities of the requested frames are read; the Q arrays and
+    the metadata are shared by all frames.
+    """
+    def __init__(self, template, i_node, di_node=None):
+        """
+        :param template: plottable_1D holding the Q data of the frames
+        :param i_node: h5py Dataset of the intensities, one row per frame
+        :param di_node: h5py Dataset of the intensity uncertainties, if any
+        """
+        self.template = template
+        self.i_node = i_node
+        self.di_node = di_node
+        # DataInfo shared by all frames, set by the reader
+        self.datainfo = None
+
+    def __len__(self):
+        return self.i_node.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame {} out of range".format(index))
+        frame = copy.copy(self.template)
+        frame.y = self.i_node[index].flatten()
+        if self.di_node is not None:
+            frame.dy = self.di_node[index].flatten()
+        reader = Reader()
+        reader.current_datainfo = self.datainfo
+        reader.current_dataset = frame
+        reader.send_to_output()
+        reader.convert_data_units()
+        reader.sort_data()
+        data = reader.output[0]
+        if data.x.size < 5:
+            data.errors.append(FileContentsException(
+                "Fewer than 5 data points found."))
+        return data
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        """
+        Close the data file. No more frames can be read afterwards.
+        """
+        self.i_node.file.close()
@@ -27,7 +27,7 @@ logger = logging.getLogger(__name__)
 # Look for unit converter
 has_converter = True
 try:
-    from sas.sascalc.data_util.nxsunit import Converter
+    from sas.sascalc.data_util.nxsunit import get_converter
 except:
     has_converter = False
 
@@ -157,20 +157,20 @@ class Reader(FileReader):
         # Store all data
         # Store wavelength
         if has_converter and self.current_datainfo.source.wavelength_unit != 'A':
-            conv = Converter('A')
+            conv = get_converter('A')
             wavelength = conv(wavelength,
                               units=self.current_datainfo.source.wavelength_unit)
         self.current_datainfo.source.wavelength = wavelength
 
         # Store distance
         if has_converter and detector.distance_unit != 'm':
-            conv = Converter('m')
+            conv = get_converter('m')
             distance = conv(distance, units=detector.distance_unit)
         detector.distance = distance
 
         # Store pixel size
         if has_converter and detector.pixel_size_unit != 'mm':
-            conv = Converter('mm')
+            conv = get_converter('mm')
             pixel = conv(pixel, units=detector.pixel_size_unit)
         detector.pixel_size.x = pixel
         detector.pixel_size.y = pixel
@@ -11,10 +11,11 @@
 import os
 import math
 import time
+import warnings
 
 import numpy as np
 
-from sas.sascalc.data_util.nxsunit import Converter
+from sas.sascalc.data_util.nxsunit import get_converter
 
 from ..data_info import plottable_2D, DataInfo, Detector
 from ..file_reader_base_class import FileReader
@@ -80,10 +81,6 @@ class Reader(FileReader):
         data_started = False
 
         ## Defaults
-        lines = buf.split('\n')
-        x = []
-        y = []
-
         wavelength = None
         distance = None
         transmission = None
@@ -94,19 +91,17 @@ class Reader(FileReader):
         is_info = False
         is_center = False
 
-        # Remove the last lines before the for loop if the lines are empty
-        # to calculate the exact number of data points
-        count = 0
-        while (len(lines[len(lines) - (count + 1)].lstrip().rstrip()) < 1):
-            del lines[len(lines) - (count + 1)]
-            count = count + 1
-
-        #Read Header and find the dimensions of 2D data
-        line_num = 0
+        # Read Header and find the dimensions of 2D data, stopping at the
+        # first data line. offset is the position of the line in buf.
+        offset = 0
+        col_num = 0
         # Old version NIST files: 0
         ver = 0
-        for line in lines:
-            line_num += 1
+        while offset < len(buf):
+            end = buf.find('\n', offset)
+            if end < 0:
+                end = len(buf)
+            line = buf[offset:end]
             ## Reading the header applies only to IGOR/NIST 2D q_map data files
             # Find setup info line
             if is_info:
@@ -117,7 +112,7 @@ class Reader(FileReader):
                     wavelength = float(line_toks[1])
                     # Wavelength is stored in angstroms; convert if necessary
                     if self.current_datainfo.source.wavelength_unit != 'A':
-                        conv = Converter('A')
+                        conv = get_converter('A')
                         wavelength = conv(wavelength,
                                           units=self.current_datainfo.source.wavelength_unit)
                 except Exception:
@@ -126,7 +121,7 @@ class Reader(FileReader):
                     distance = float(line_toks[3])
                     # Distance is stored in meters; convert if necessary
                     if self.current_datainfo.detector[0].distance_unit != 'm':
-                        conv = Converter('m')
+                        conv = get_converter('m')
                         distance = conv(distance,
                             units=self.current_datainfo.detector[0].distance_unit)
                 except Exception:
@@ -137,7 +132,7 @@ class Reader(FileReader):
                 except Exception:
                     pass  # Not required
 
-            if line.count("LAMBDA") > 0:
+            if "LAMBDA" in line:
                 is_info = True
 
             # Find center info line
@@ -148,63 +143,42 @@ class Reader(FileReader):
                 center_x = float(line_toks[0])
                 center_y = float(line_toks[1])
 
-            if line.count("BCENT") > 0:
+            if "BCENT" in line:
                 is_center = True
             # Check version
-            if line.count("Data columns") > 0:
-                if line.count("err(I)") > 0:
+            if "Data columns" in line:
+                if "err(I)" in line:
                     ver = 1
             # Find data start
-            if line.count("ASCII data") > 0:
+            if "ASCII data" in line:
                 data_started = True
-                continue
-
-            ## Read and get data.
-            if data_started:
-                line_toks = line.split()
-                if len(line_toks) == 0:
-                    #empty line
-                    continue
+            elif data_started and line.split():
                 # the number of columns must be stayed same
-                col_num = len(line_toks)
+                col_num = len(line.split())
                 break
+            offset = end + 1
 
-        # Make numpy array to remove header lines using index
-        lines_array = np.array(lines)
-
-        # index for lines_array
-        lines_index = np.arange(len(lines))
-
-        # get the data lines
-        data_lines = lines_array[lines_index >= (line_num - 1)]
-        # Now we get the total number of rows (i.e., # of data points)
-        row_num = len(data_lines)
-        # make it as list again to control the separators
-        data_list = " ".join(data_lines.tolist())
-        # split all data to one big list w/" "separator
-        data_list = data_list.split()
-
-        # Check if the size is consistent with data, otherwise
-        #try the tab(\t) separator
-        # (this may be removed once get the confidence
-        #the former working all cases).
-        if len(data_list) != (len(data_lines)) * col_num:
-            data_list = "\t".join(data_lines.tolist())
-            data_list = data_list.split()
-
-        # Change it(string) into float
-        #data_list = map(float,data_list)
-        data_list1 = list(map(check_point, data_list))
-
-        # numpy array form
-        data_array = np.array(data_list1)
-        # Redimesion based on the row_num and col_num,
-        #otherwise raise an error.
-        try:
-            data_point = data_array.reshape(row_num, col_num).transpose()
-        except Exception:
-            msg = "red2d_reader can't read this file: Incorrect number of data points provided."
+        if col_num == 0:
+            msg = "red2d_reader can't read this file: No data found."
             raise FileContentsException(msg)
+
+        # Convert the data block, from the first data line to the end of
+        # the file, in one pass without splitting it into lines or tokens
+        block = buf[offset:].rstrip()
+        del buf
+        row_num = block.count('\n') + 1
+        with warnings.catch_warnings():
+            # Raised when the block holds text, which is set to zero by
+            # _parse_data_block
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                data_point = np.fromstring(block, sep=' ')
+            except (ValueError, DeprecationWarning):
+                data_point = None
+        if data_point is None or data_point.size != row_num * col_num:
+            data_point = self._parse_data_block(block, col_num)
+        else:
+            data_point = data_point.reshape(row_num, col_num).transpose()
         ## Get the all data: Let's HARDcoding; Todo find better way
         # Defaults
         dqx_data = np.zeros(0)
@@ -319,3 +293,21 @@ class Reader(FileReader):
         self.current_datainfo.meta_data['loader'] = self.type_name
 
         self.send_to_output()
+
+    @staticmethod
+    def _parse_data_block(block, col_num):
+        """
+        Convert a data block token by token, setting non numerical values
+        to zero.
+
+        :param block: The text of the data block
+        :param col_num: The number of columns
+        :return: A (columns, rows) array
+        """
+        lines = block.split('\n')
+        data_list = list(map(check_point, block.split()))
+        try:
+            return np.array(data_list).reshape(len(lines), col_num).transpose()
+        except Exception:
+            msg = "red2d_reader can't read this file: Incorrect number of data points provided."
+            raise FileContentsException(msg)
@@ -16,7 +16,7 @@ from ..loader_exceptions import FileContentsException
 # Check whether we have a converter available
 has_converter = True
 try:
-    from sas.sascalc.data_util.nxsunit import Converter
+    from sas.sascalc.data_util.nxsunit import convert
 except ImportError:
     has_converter = False
 _ZERO = 1e-16
@@ -164,8 +164,7 @@ class Reader(FileReader):
         """
         # (float, string, string) -> float
         if has_converter and value_unit != default_unit:
-            data_conv_q = Converter(default_unit)
-            value = data_conv_q(value, units=value_unit)
+            value = convert(value, default_unit, value_unit)
             new_unit = default_unit
         else:
             new_unit = value_unit
@@ -15,6 +15,8 @@
 #############################################################################
 
 import logging
+import os
+import threading
 
 from lxml import etree
 from lxml.builder import E
@@ -25,6 +27,48 @@ logger = logging.getLogger(__name__)
 
 PARSER = etree.ETCompatXMLParser(remove_comments=True, remove_pis=False)
 
+# Parsed and compiled schemas, shared by the readers of the process
+_SCHEMA_CACHE = {}
+# Validation with a compiled schema is not thread safe
+_SCHEMA_LOCK = threading.RLock()
+
+
+class _CachedSchema(object):
+    """
+    A schema document, and the XMLSchema compiled from it on first use.
+    """
+    def __init__(self, path):
+        self.doc = etree.parse(path, parser=PARSER)
+        self._xmlschema = None
+
+    @property
+    def xmlschema(self):
+        if self._xmlschema is None:
+            self._xmlschema = etree.XMLSchema(self.doc)
+        return self._xmlschema
+
+
+def get_schema(path):
+    """
+    Parse a schema file, or return it from the cache if the file has not
+    changed since it was parsed.
+
+    :param path: path to the schema file
+    :return: _CachedSchema object
+    """
+    with _SCHEMA_LOCK:
+        try:
+            key = (os.path.abspath(path), os.path.getmtime(path))
+        except (OSError, TypeError):
+            # Not a file path, so cannot be cached
+            return _CachedSchema(path)
+        schema = _SCHEMA_CACHE.get(key)
+        if schema is None:
+            schema = _CachedSchema(path)
+            _SCHEMA_CACHE[key] = schema
+        return schema
+
+
 class XMLreader(FileReader):
     """
     Generic XML read and write class. Mostly helper functions.
@@ -39,6 +83,7 @@ class XMLreader(FileReader):
     xmlroot = None
     schema = None
     schemadoc = None
+    _cached_schema = None
     encoding = None
     processing_instructions = None
 
@@ -107,12 +152,23 @@ class XMLreader(FileReader):
         """
         try:
             self.schema = schema
-            self.schemadoc = etree.parse(self.schema, parser=PARSER)
+            self._cached_schema = get_schema(self.schema)
+            self.schemadoc = self._cached_schema.doc
         except etree.XMLSyntaxError as xml_error:
             logger.info(xml_error)
         except Exception:
             self.schema = None
             self.schemadoc = None
+            self._cached_schema = None
+
+    def _compiled_schema(self):
+        """
+        Return the XMLSchema compiled from the current schema.
+        """
+        if self._cached_schema is None or \
+                self._cached_schema.doc is not self.schemadoc:
+            return etree.XMLSchema(self.schemadoc)
+        return self._cached_schema.xmlschema
 
     def validate_xml(self):
         """
@@ -120,9 +176,10 @@ class XMLreader(FileReader):
         """
         valid = True
         if self.schema is not None:
-            self.parse_schema_and_doc()
-            schema_check = etree.XMLSchema(self.schemadoc)
-            valid = schema_check.validate(self.xmldoc)
+            if self.xmldoc is None or self.schemadoc is None:
+                self.parse_schema_and_doc()
+            with _SCHEMA_LOCK:
+                valid = self._compiled_schema().validate(self.xmldoc)
         return valid
 
     def find_invalid_xml(self):
@@ -130,10 +187,11 @@ class XMLreader(FileReader):
         Finds the first offending element that should not be present in XML file
         """
         first_error = ""
-        self.parse_schema_and_doc()
-        schema = etree.XMLSchema(self.schemadoc)
+        if self.xmldoc is None or self.schemadoc is None:
+            self.parse_schema_and_doc()
         try:
-            first_error = schema.assertValid(self.xmldoc)
+            with _SCHEMA_LOCK:
+                first_error = self._compiled_schema().assertValid(self.xmldoc)
         except etree.DocumentInvalid as err:
             # Suppress errors for <'any'> elements
             if "##other" in str(err):
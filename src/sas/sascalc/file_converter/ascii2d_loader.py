@@ -121,29 +121,30 @@ class ASCII2DLoader(object):
 
             current_line += 1
 
-            try:
-                current_line, I = _load_points(all_lines, current_line,
-                    width * height)
-                dI = np.zeros(width*height)
-
-                # Load error data if it's provided
-                if iflag == 3:
-                    _, dI = _load_points(all_lines, current_line, width*height)
-            except Exception as e:
+            # The intensities, followed by the errors if provided, fill the
+            # rest of the file and are converted in a single pass
+            n_points = width * height
+            n_values = 2 * n_points if iflag == 3 else n_points
+            values = np.fromstring(" ".join(all_lines[current_line:]),
+                dtype=np.float32, sep=' ')
+            if len(values) < n_values:
                 err_msg = "File incorrectly formatted.\n"
-                if str(e).find("list index") != -1:
-                    err_msg += ("Incorrect number of data points. Expected {}"
-                        " intensity").format(width * height)
-                    if iflag == 3:
-                        err_msg += " and error"
-                    err_msg += " points."
-                else:
-                    err_msg += str(e)
+                err_msg += ("Incorrect number of data points. Expected {}"
+                    " intensity").format(n_points)
+                if iflag == 3:
+                    err_msg += " and error"
+                err_msg += " points."
                 raise ValueError(err_msg)
+            values = values[:n_values].astype(np.float64)
+            I = values[:n_points]
+            dI = np.zeros(n_points)
+            # Load error data if it's provided
+            if iflag == 3:
+                dI = values[n_points:]
 
             # Format data for use with Data2D
-            qx = list(qx) * height
-            qy = np.array([[y] * width for y in qy]).flatten()
+            qx = np.tile(qx, height)
+            qy = np.repeat(qy, width)
 
             data = Data2D(qx_data=qx, qy_data=qy, data=I, err_data=dI)
 
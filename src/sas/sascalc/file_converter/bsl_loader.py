@@ -3,6 +3,7 @@ import os
 import numpy as np
 
 from ..dataloader.data_info import Data2D
+from .frame_stack import FrameStack, map_frames
 
 class BSLParsingError(Exception):
     pass
@@ -41,6 +42,7 @@ class BSLLoader:
         self.n_pixels = data_info['pixels']
         self.n_rasters = data_info['rasters']
         self.swap_bytes = data_info['swap_bytes']
+        self._frames = None
 
     def _parse_header(self, header_file, filename, sasdata_filename, folder):
         """
@@ -140,19 +142,49 @@ class BSLLoader:
         self._swap_bytes = bool(swap_bytes)
 
 
-    def load_frames(self, frames):
+    @property
+    def frames(self):
+        """
+        The frames of the data file as a :class:`FrameStack`.
+
+        The file is memory mapped the first time this is used, and each
+        frame is a 4 byte float view into the file, one value per pixel.
+        """
+        if self._frames is None:
+            # 4 byte float, big or little endian depending on swap_bytes.
+            dtype = ('>f4', '<f4')[self.swap_bytes]
+            try:
+                data = map_frames(self.filename, self.n_frames,
+                                  self.n_pixels * self.n_rasters, dtype)
+            except (IOError, OSError, ValueError) as exc:
+                raise BSLParsingError(str(exc))
+            self._frames = FrameStack([data])
+        return self._frames
+
+    def __len__(self):
+        return self.n_frames
+
+    def __getitem__(self, index):
+        """
+        Returns a view of the frame at index, or a list of views for a slice.
+        """
+        return self.frames[index]
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def iter_frames(self, frames):
         """
-        Loads all frames of the BSl file into a Data2D object.
+        Generates a Data2D object for each frame, reading the frames as
+        they are needed.
 
-        :param frames: Number of frames.
+        :param frames: Indices of the frames to load.
 
-        :return: Data2D frame_data.
+        :return: generator of Data2D frame data.
         """
-        frame_data = []
-        # Prepare axis values (arbitrary scale)
-        x = self.n_rasters * range(1, self.n_pixels+1)
-        y = [self.n_pixels * [i] for i in range(1, self.n_rasters+1)]
-        y = np.reshape(y, (1, self.n_pixels*self.n_rasters))[0]
+        # Prepare axis values (arbitrary scale), shared by all frames
+        x = np.tile(np.arange(1, self.n_pixels+1), self.n_rasters)
+        y = np.repeat(np.arange(1, self.n_rasters+1), self.n_pixels)
         x_bins = x[:self.n_pixels]
         y_bins = y[0::self.n_pixels]
 
@@ -162,32 +194,27 @@ class BSLLoader:
             data2d.x_bins = x_bins
             data2d.y_bins = y_bins
             data2d.Q_unit = '' # Using arbitrary units
-            frame_data.append(data2d)
+            yield data2d
+
+    def load_frames(self, frames):
+        """
+        Loads the given frames of the BSl file into Data2D objects.
+
+        :param frames: Indices of the frames to load.
 
-        return frame_data
+        :return: list of Data2D frame_data.
+        """
+        return list(self.iter_frames(frames))
 
     def load_data(self, frame):
         """
-        Loads the file named in filename in 4 byte float, in either
-        little or big Endian depending on self.swap_bytes.
+        Loads one frame of the file named in filename, stored as 4 byte
+        floats in either little or big Endian depending on self.swap_bytes.
 
         :param frame: The frame to load.
         :return: np array of loaded floats.
         """
-        # Set dtype to 4 byte float, big or little endian depending on swap_bytes.
-        dtype = ('>f4', '<f4')[self.swap_bytes]
-
-        # Size of float as stored in binary file should be 4 bytes.
-        float_size = 4
-
-        offset = self.n_pixels * self.n_rasters * frame * float_size
-
-        with open(self.filename, 'rb') as input_file:
-            input_file.seek(offset)
-            # CRUFT: With numpy 1.17, could use np.fromfile(self.filename, dtype=dtype, offset=offset).
-            data = np.float64(np.fromfile(input_file, dtype=dtype))
-
-        return data
+        return np.float64(self.frames[frame])
 
     def __str__(self):
         """
@@ -0,0 +1,81 @@
+"""
+Frame-indexed access to the binary files of BSL and OTOKO data sets.
+
+The files are memory mapped, so opening a stack with thousands of frames
+does not read anything and each frame is a view into the mapped file.
+"""
+import os
+
+import numpy as np
+
+
+def map_frames(path, n_frames, frame_size, dtype):
+    """
+    Memory map a binary file as an (n_frames, frame_size) array.
+
+    :param path: Path to the binary file.
+    :param n_frames: Number of frames in the file.
+    :param frame_size: Number of values in each frame.
+    :param dtype: Type of the stored values, including the byte order.
+    :return: Read only np.memmap of the frames.
+    """
+    dtype = np.dtype(dtype)
+    expected = n_frames * frame_size * dtype.itemsize
+    actual = os.path.getsize(path)
+    if actual < expected:
+        msg = "{} has {} bytes, expected at least {} for {} frames of {} values"
+        raise ValueError(msg.format(path, actual, expected, n_frames, frame_size))
+    if expected == 0:
+        return np.empty((n_frames, frame_size), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r',
+                     shape=(n_frames, frame_size))
+
+
+class FrameStack(object):
+    """
+    Sequence of frames stored in one or more memory mapped files.
+
+    Indexing with an integer returns a view of that frame in the stored
+    dtype, without copying the data.  Indexing with a slice returns a list
+    of views.  Iterating reads the frames one at a time.
+    """
+
+    def __init__(self, segments):
+        """
+        :param segments: List of 2D arrays (from :func:`map_frames`), one
+            row per frame, all with the same number of columns.
+        """
+        self.segments = list(segments)
+        self._starts = np.cumsum([0] + [len(s) for s in self.segments])
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame {} out of range".format(index))
+        segment = np.searchsorted(self._starts, index, side='right') - 1
+        return self.segments[segment][index - self._starts[segment]]
+
+    def __iter__(self):
+        for segment in self.segments:
+            for frame in segment:
+                yield frame
+
+    def to_array(self, frames=None):
+        """
+        Copy frames into a float64 array.
+
+        :param frames: Frame indices to copy, all frames if None.
+        :return: Array with one row per frame.
+        """
+        if frames is None:
+            if not self.segments:
+                return np.zeros((0, 0))
+            return np.concatenate([np.float64(s) for s in self.segments])
+        return np.array([self[i] for i in frames], dtype=np.float64)
@@ -10,17 +10,126 @@ import os
 from sas.sascalc.dataloader.readers.cansas_reader_HDF5 import Reader
 from sas.sascalc.dataloader.data_info import Data1D, Data2D
 
+
+# Compression filters accepted by NXcanSASWriter
+COMPRESSION_FILTERS = (None, 'gzip', 'lzf')
+
+
+def _h5_string(string):
+    """
+    Convert a string to a numpy string in a numpy array. This way it is
+    written to the HDF5 file as a fixed length ASCII string and is
+    compatible with the Reader read() method.
+    """
+    if isinstance(string, np.ndarray):
+        return string
+    elif not isinstance(string, str):
+        string = str(string)
+
+    return np.array([np.string_(string)])
+
+
+def _write_h5_string(entry, value, key):
+    entry[key] = _h5_string(value)
+
+
+def _h5_float(x):
+    if not (isinstance(x, list)):
+        x = [x]
+    return np.array(x, dtype=np.float32)
+
+
+def _write_h5_float(entry, value, key):
+    entry.create_dataset(key, data=_h5_float(value))
+
+
+def _write_h5_vector(entry, vector, names=['x_position', 'y_position'],
+    units=None, write_fn=_write_h5_string):
+    """
+    Write a vector to an h5 entry
+
+    :param entry: The H5Py entry to write to
+    :param vector: The Vector to write
+    :param names: What to call the x,y and z components of the vector
+        when writing to the H5Py entry
+    :param units: The units of the vector (optional)
+    :param write_fn: A function to convert the value to the required
+        format and write it to the H5Py entry, of the form
+        f(entry, value, name) (optional)
+    """
+    if len(names) < 2:
+        raise ValueError("Length of names must be >= 2.")
+
+    if vector.x is not None:
+        write_fn(entry, vector.x, names[0])
+        if units is not None:
+            entry[names[0]].attrs['units'] = units
+    if vector.y is not None:
+        write_fn(entry, vector.y, names[1])
+        if units is not None:
+            entry[names[1]].attrs['units'] = units
+    if len(names) == 3 and vector.z is not None:
+        write_fn(entry, vector.z, names[2])
+        if units is not None:
+            entry[names[2]].attrs['units'] = units
+
+
+def _as_values(values):
+    """
+    Return values as an array, with None replaced by NaN, or None if there
+    are no values that are not None or NaN.
+    """
+    if values is None:
+        return None
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = values.astype(np.float64)
+    if values.size == 0:
+        return None
+    if values.dtype.kind in 'fc' and np.isnan(values).all():
+        return None
+    return values
+
+
 class NXcanSASWriter(Reader):
     """
     A class for writing in NXcanSAS data files. Any number of data sets may be
     written to the file. Currently 1D and 2D SAS data sets are supported
 
+    Data sets can be written all at once with write(), or streamed into the
+    file one at a time with open(), append() and close(), so that long runs
+    of frames never need to be held in memory together::
+
+        with NXcanSASWriter(compression='gzip').open(filename, first) as w:
+            for data in frames:
+                w.append(data)
+
+    Array datasets are chunked, and compressed when a compression filter is
+    given.
+
     NXcanSAS spec: http://download.nexusformat.org/sphinx/classes/contributed_definitions/NXcanSAS.html
 
     :Dependencies:
         The NXcanSAS writer requires h5py => v2.5.0 or later.
     """
 
+    def __init__(self, compression=None, compression_opts=None):
+        """
+        :param compression: None, 'gzip' or 'lzf'
+        :param compression_opts: The gzip level, 0-9 (default 4)
+        """
+        super(NXcanSASWriter, self).__init__()
+        if compression not in COMPRESSION_FILTERS:
+            raise ValueError("compression must be one of {}".format(
+                COMPRESSION_FILTERS))
+        if compression != 'gzip' and compression_opts is not None:
+            raise ValueError("compression_opts is only used with gzip")
+        self.compression = compression
+        self.compression_opts = compression_opts
+        self._file = None
+        self._sasentry = None
+        self._n_sasdata = 0
+
     def write(self, dataset, filename):
         """
         Write an array of Data1d or Data2D objects to an NXcanSAS file, as
@@ -31,68 +140,29 @@ class NXcanSASWriter(Reader):
         :param dataset: A list of Data1D or Data2D objects to write
         :param filename: Where to write the NXcanSAS file
         """
-
-        def _h5_string(string):
-            """
-            Convert a string to a numpy string in a numpy array. This way it is
-            written to the HDF5 file as a fixed length ASCII string and is
-            compatible with the Reader read() method.
-            """
-            if isinstance(string, np.ndarray):
-                return string
-            elif not isinstance(string, str):
-                string = str(string)
-
-            return np.array([np.string_(string)])
-
-        def _write_h5_string(entry, value, key):
-            entry[key] = _h5_string(value)
-
-        def _h5_float(x):
-            if not (isinstance(x, list)):
-                x = [x]
-            return np.array(x, dtype=np.float32)
-
-        def _write_h5_float(entry, value, key):
-            entry.create_dataset(key, data=_h5_float(value))
-
-        def _write_h5_vector(entry, vector, names=['x_position', 'y_position'],
-            units=None, write_fn=_write_h5_string):
-            """
-            Write a vector to an h5 entry
-
-            :param entry: The H5Py entry to write to
-            :param vector: The Vector to write
-            :param names: What to call the x,y and z components of the vector
-                when writing to the H5Py entry
-            :param units: The units of the vector (optional)
-            :param write_fn: A function to convert the value to the required
-                format and write it to the H5Py entry, of the form
-                f(entry, value, name) (optional)
-            """
-            if len(names) < 2:
-                raise ValueError("Length of names must be >= 2.")
-
-            if vector.x is not None:
-                write_fn(entry, vector.x, names[0])
-                if units is not None:
-                    entry[names[0]].attrs['units'] = units
-            if vector.y is not None:
-                write_fn(entry, vector.y, names[1])
-                if units is not None:
-                    entry[names[1]].attrs['units'] = units
-            if len(names) == 3 and vector.z is not None:
-                write_fn(entry, vector.z, names[2])
-                if units is not None:
-                    entry[names[2]].attrs['units'] = units
-
         valid_data = all([isinstance(d, (Data1D, Data2D)) for d in dataset])
         if not valid_data:
             raise ValueError("All entries of dataset must be Data1D or Data2D"
                              "objects")
 
-        # Get run name and number from first Data object
-        data_info = dataset[0]
+        with self.open(filename, dataset[0]):
+            for data_obj in dataset:
+                self.append(data_obj)
+
+    def open(self, filename, data_info):
+        """
+        Start a new NXcanSAS file with a single SASentry, to which SASdata
+        elements are added by append(). The metadata of data_info is written
+        as the SASentry metadata; its data is not written.
+
+        :param filename: Where to write the NXcanSAS file
+        :param data_info: Data1D or Data2D object holding the metadata
+        :return: The writer, for use as a context manager
+        """
+        if self._file is not None:
+            raise RuntimeError("{} is already open".format(
+                self._file.filename))
+        # Get run name and number from the Data object
         run_number = ''
         run_name = ''
         if len(data_info.run) > 0:
@@ -101,23 +171,67 @@ class NXcanSASWriter(Reader):
                 run_name = data_info.run_name[run_number]
 
         f = h5py.File(filename, 'w')
-        sasentry = f.create_group('sasentry01')
-        sasentry['definition'] = _h5_string('NXcanSAS')
-        sasentry['run'] = _h5_string(run_number)
-        sasentry['run'].attrs['name'] = run_name
-        sasentry['title'] = _h5_string(data_info.title)
-        sasentry.attrs['canSAS_class'] = 'SASentry'
-        sasentry.attrs['version'] = '1.0'
-
-        for i, data_obj in enumerate(dataset):
-            data_entry = sasentry.create_group("sasdata{0:0=2d}".format(i+1))
-            data_entry.attrs['canSAS_class'] = 'SASdata'
-            if isinstance(data_obj, Data1D):
-                self._write_1d_data(data_obj, data_entry)
-            elif isinstance(data_obj, Data2D):
-                self._write_2d_data(data_obj, data_entry)
-
-        data_info = dataset[0]
+        try:
+            sasentry = f.create_group('sasentry01')
+            sasentry['definition'] = _h5_string('NXcanSAS')
+            sasentry['run'] = _h5_string(run_number)
+            sasentry['run'].attrs['name'] = run_name
+            sasentry['title'] = _h5_string(data_info.title)
+            sasentry.attrs['canSAS_class'] = 'SASentry'
+            sasentry.attrs['version'] = '1.0'
+            self._write_metadata(data_info, sasentry)
+        except Exception:
+            f.close()
+            raise
+        self._file = f
+        self._sasentry = sasentry
+        self._n_sasdata = 0
+        return self
+
+    def append(self, data_obj):
+        """
+        Write a Data1D or Data2D object as the next SASdata element of the
+        file started by open().
+
+        :param data_obj: A Data1D or Data2D object to write
+        """
+        if self._file is None:
+            raise RuntimeError("open() must be called before append()")
+        if not isinstance(data_obj, (Data1D, Data2D)):
+            raise ValueError("All entries of dataset must be Data1D or Data2D"
+                             "objects")
+        self._n_sasdata += 1
+        data_entry = self._sasentry.create_group(
+            "sasdata{0:0=2d}".format(self._n_sasdata))
+        data_entry.attrs['canSAS_class'] = 'SASdata'
+        if isinstance(data_obj, Data1D):
+            self._write_1d_data(data_obj, data_entry)
+        else:
+            self._write_2d_data(data_obj, data_entry)
+
+    def close(self):
+        """
+        Close the file started by open().
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._sasentry = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_metadata(self, data_info, sasentry):
+        """
+        Writes the sample, instrument, process, transmission and note
+        metadata of a Data1D or Data2D object to the SASentry h5py Group
+
+        :param data_info: A Data1D or Data2D object holding the metadata
+        :param sasentry: A h5py Group object representing the SASentry
+        """
         # Sample metadata
         sample_entry = sasentry.create_group('sassample')
         sample_entry.attrs['canSAS_class'] = 'SASsample'
@@ -272,7 +386,7 @@ class NXcanSASWriter(Reader):
                                        data=trans.transmission_deviation)
             trans_entry.create_dataset('lambda', data=trans.wavelength)
 
-        note_entry = sasentry.create_group('sasnote'.format(i))
+        note_entry = sasentry.create_group('sasnote')
         note_entry.attrs['canSAS_class'] = 'SASnote'
         notes = None
         if len(data_info.notes) > 1:
@@ -283,7 +397,24 @@ class NXcanSASWriter(Reader):
         if notes is not None:
             note_entry.create_dataset('SASnote', data=notes)
 
-        f.close()
+
+    def _create_array(self, entry, key, data):
+        """
+        Create a dataset holding an array of SASdata values, chunked, and
+        compressed if the writer was given a compression filter.
+
+        :param entry: The h5py Group to create the dataset in
+        :param key: The name of the dataset
+        :param data: The array to write
+        :return: The new h5py Dataset
+        """
+        data = np.asarray(data)
+        if data.size == 0 or data.ndim == 0:
+            return entry.create_dataset(key, data=data)
+        return entry.create_dataset(key, data=data, chunks=True,
+                                    compression=self.compression,
+                                    compression_opts=self.compression_opts,
+                                    shuffle=self.compression is not None)
 
     def _write_1d_data(self, data_obj, data_entry):
         """
@@ -295,23 +426,23 @@ class NXcanSASWriter(Reader):
         data_entry.attrs['signal'] = 'I'
         data_entry.attrs['I_axes'] = 'Q'
         data_entry.attrs['Q_indices'] = [0]
-        q_entry = data_entry.create_dataset('Q', data=data_obj.x)
+        q_entry = self._create_array(data_entry, 'Q', data_obj.x)
         q_entry.attrs['units'] = data_obj.x_unit
-        i_entry = data_entry.create_dataset('I', data=data_obj.y)
+        i_entry = self._create_array(data_entry, 'I', data_obj.y)
         i_entry.attrs['units'] = data_obj.y_unit
         if data_obj.dy is not None:
             i_entry.attrs['uncertainties'] = 'Idev'
-            i_dev_entry = data_entry.create_dataset('Idev', data=data_obj.dy)
+            i_dev_entry = self._create_array(data_entry, 'Idev', data_obj.dy)
             i_dev_entry.attrs['units'] = data_obj.y_unit
         if data_obj.dx is not None:
             q_entry.attrs['resolutions'] = 'dQ'
-            dq_entry = data_entry.create_dataset('dQ', data=data_obj.dx)
+            dq_entry = self._create_array(data_entry, 'dQ', data_obj.dx)
             dq_entry.attrs['units'] = data_obj.x_unit
         elif data_obj.dxl is not None:
             q_entry.attrs['resolutions'] = ['dQl','dQw']
-            dql_entry = data_entry.create_dataset('dQl', data=data_obj.dxl)
+            dql_entry = self._create_array(data_entry, 'dQl', data_obj.dxl)
             dql_entry.attrs['units'] = data_obj.x_unit
-            dqw_entry = data_entry.create_dataset('dQw', data=data_obj.dxw)
+            dqw_entry = self._create_array(data_entry, 'dQw', data_obj.dxw)
             dqw_entry.attrs['units'] = data_obj.x_unit
 
     def _write_2d_data(self, data, data_entry):
@@ -340,29 +471,30 @@ class NXcanSASWriter(Reader):
         qx = np.reshape(data.qx_data, (n_rows, n_cols))
         qy = np.reshape(data.qy_data, (n_rows, n_cols))
 
-        i_entry = data_entry.create_dataset('I', data=intensity)
+        i_entry = self._create_array(data_entry, 'I', intensity)
         i_entry.attrs['units'] = data.I_unit
-        qx_entry = data_entry.create_dataset('Qx', data=qx)
+        qx_entry = self._create_array(data_entry, 'Qx', qx)
         qx_entry.attrs['units'] = data.Q_unit
-        qy_entry = data_entry.create_dataset('Qy', data=qy)
+        qy_entry = self._create_array(data_entry, 'Qy', qy)
         qy_entry.attrs['units'] = data.Q_unit
-        if (data.err_data is not None
-                and not all(v is None for v in data.err_data)):
-            d_i = np.reshape(data.err_data, (n_rows, n_cols))
+        err_data = _as_values(data.err_data)
+        if err_data is not None:
+            d_i = np.reshape(err_data, (n_rows, n_cols))
             i_entry.attrs['uncertainties'] = 'Idev'
-            i_dev_entry = data_entry.create_dataset('Idev', data=d_i)
+            i_dev_entry = self._create_array(data_entry, 'Idev', d_i)
             i_dev_entry.attrs['units'] = data.I_unit
-        if (data.dqx_data is not None
-                and not all(v is None for v in data.dqx_data)):
+        dqx_data = _as_values(data.dqx_data)
+        if dqx_data is not None:
             qx_entry.attrs['resolutions'] = 'dQx'
-            dqx_entry = data_entry.create_dataset('dQx', data=data.dqx_data)
+            dqx_entry = self._create_array(data_entry, 'dQx', dqx_data)
             dqx_entry.attrs['units'] = data.Q_unit
-        if (data.dqy_data is not None
-                and not all(v is None for v in data.dqy_data)):
+        dqy_data = _as_values(data.dqy_data)
+        if dqy_data is not None:
             qy_entry.attrs['resolutions'] = 'dQy'
-            dqy_entry = data_entry.create_dataset('dQy', data=data.dqy_data)
+            dqy_entry = self._create_array(data_entry, 'dQy', dqy_data)
             dqy_entry.attrs['units'] = data.Q_unit
-        if data.mask is not None and not all(v is None for v in data.mask):
+        mask = _as_values(data.mask)
+        if mask is not None:
             data_entry.attrs['mask'] = "mask"
-            mask = np.invert(np.asarray(data.mask, dtype=bool))
-            data_entry.create_dataset('mask', data=mask)
+            mask = np.invert(np.asarray(mask, dtype=bool))
+            self._create_array(data_entry, 'mask', mask)
@@ -5,7 +5,6 @@ aim to load the data into numpy arrays for use later.
 """
 
 import os
-import struct
 
 try:
     from itertoops import izip as zip
@@ -14,6 +13,8 @@ except ImportError:
 
 import numpy as np
 
+from .frame_stack import FrameStack, map_frames
+
 class CStyleStruct:
     """A nice and easy way to get "C-style struct" functionality."""
     def __init__(self, **kwds):
@@ -33,7 +34,7 @@ class OTOKOLoader(object):
         self.qaxis_path = qaxis_path
         self.data_path = data_path
 
-    def load_otoko_data(self):
+    def load_otoko_data(self, lazy=False):
         """
         Loads "OTOKO" data, which is a format that stores each axis separately.
         An axis is represented by a "header" file, which in turn will give details
@@ -46,13 +47,18 @@ class OTOKOLoader(object):
         For more information on the OTOKO file format, please see:
         http://www.diamond.ac.uk/Home/Beamlines/small-angle/SAXS-Software/CCP13/
         XOTOKO.html
+
+        The binary files are memory mapped, and the frames of each axis are
+        available as a :class:`FrameStack` in its *frames* attribute.  By
+        default *data* holds a float64 copy of all frames; with lazy=True it
+        is the FrameStack itself, so frames are only read when indexed.
         """
-        q_axis    = self._load_otoko_axis(self.qaxis_path)
-        data_axis = self._load_otoko_axis(self.data_path)
+        q_axis    = self._load_otoko_axis(self.qaxis_path, lazy)
+        data_axis = self._load_otoko_axis(self.data_path, lazy)
 
         return OTOKOData(q_axis, data_axis)
 
-    def _load_otoko_axis(self, header_path):
+    def _load_otoko_axis(self, header_path, lazy=False):
         """
         Loads an "OTOKO" axis, given the header file path.  Essentially, the
         header file contains information about the data in the form of integer
@@ -123,33 +129,27 @@ class OTOKOLoader(object):
             raise OTOKOParsingError(
                 "Expected all binary files listed in %s to have the same number of channels." % header_path)
 
-        data = np.zeros(shape=(total_frames, all_n_channels[0]))
-        frames_so_far = 0
-
+        # If the swap indicator flag has been raised then the bytes of each
+        # float occur in reverse order from the native float.
+        native = np.dtype('f4')
+        segments = []
         for info in binary_file_info_list:
             if not os.path.exists(info.file_path):
                 raise OTOKOParsingError(
                     "The data file %s does not exist." % info.file_path)
-
-            with open(info.file_path, "rb") as binary_file:
-                # Ideally we'd like to use numpy's fromfile() to read in binary
-                # data, but we are forced to roll our own float-by-float file
-                # reader because of the rules imposed on us by the file format;
-                # namely, if the swap indicator flag has been raised then the bytes
-                # of each float occur in reverse order.
-                for frame in range(info.n_frames):
-                    for channel in range(info.n_channels):
-                        b = bytes(binary_file.read(4))
-                        if info.swap_bytes:
-                            b = b[::-1] # "Extended slice" syntax, used to reverse.
-                        value = struct.unpack('f', b)[0]
-                        data[frames_so_far + frame][channel] = value
-
-                frames_so_far += info.n_frames
+            dtype = native.newbyteorder('S') if info.swap_bytes else native
+            try:
+                segments.append(map_frames(info.file_path, info.n_frames,
+                                           info.n_channels, dtype))
+            except (IOError, OSError, ValueError) as exc:
+                raise OTOKOParsingError(str(exc))
+        frames = FrameStack(segments)
+        data = frames if lazy else frames.to_array()
 
         return CStyleStruct(
             header_path = header_path,
             data = data,
+            frames = frames,
             binary_file_info_list = binary_file_info_list,
             header_info = info
         )
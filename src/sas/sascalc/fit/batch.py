@@ -0,0 +1,474 @@
+"""
+Headless batch fitting.
+
+Fit the same model to many data files without the GUI.  Each file is
+loaded with the data loader, given a smearer from its resolution
+information and fitted with :class:`BumpsFit`.  Files are spread over a
+pool of worker processes and each result is written to the output file as
+soon as it arrives, so an interrupted run can be restarted with the same
+command and will only fit the files that do not have a successful result
+yet.  Files whose load or fit failed are fitted again, and their new
+results are written after the failed ones.
+
+Run from the command line with::
+
+    python -m sas.sascalc.fit.batch sphere "data/*.xml" \\
+        -p radius=50:10:200 -p scale=1: -p background=0.001 \\
+        -c sld=2*sld_solvent -o results.csv -n 8
+
+Parameters are given as *name=value* to fix the value, *name=value:* to
+fit it without bounds or *name=value:lower:upper* to fit it within a range
+(either bound may be left empty).  Constraints are given as *name=expr*,
+where the expression can refer to any other parameter of the model.  The
+model is either the name of a sasmodels model or the path to a plugin
+model file.  Results go to a CSV file, or to HDF5 if the output name ends
+in *.h5* or *.hdf5*.
+"""
+from __future__ import print_function, division
+
+import os
+import re
+import csv
+import sys
+import glob
+import time
+import logging
+import argparse
+import traceback
+import multiprocessing
+
+import numpy as np
+
+from bumps import parameter
+
+from sasmodels.core import load_model_info
+from sasmodels.sasview_model import make_model_from_info, load_custom_model
+
+from sas.sascalc.dataloader.loader import Loader
+from .AbstractFitEngine import Model
+from .BumpsFitting import BumpsFit
+from .expression import compile_constraints
+from .qsmearing import smear_selection
+
+logger = logging.getLogger(__name__)
+
+#: Name given to the model in the fit problem; constraint expressions are
+#: qualified with it so that they match the bumps parameter names.
+MODEL_ID = "M1"
+
+HDF5_EXTENSIONS = ('.h5', '.hdf5')
+
+_SYMBOL = re.compile('([a-zA-Z_][a-zA-Z_0-9.]*)')
+
+class BatchSpec(object):
+    """
+    Description of a batch fit: the model, the parameter values, which of
+    them are fitted and the constraints between them.
+
+    *pars* maps parameter name to value, *fitted* maps each fitted
+    parameter to its (lower, upper) bounds, with None for an open bound,
+    and *constraints* maps parameter name to an expression string.
+    """
+    def __init__(self, model, pars=None, fitted=None, constraints=None,
+                 qmin=None, qmax=None):
+        self.model = model
+        self.pars = dict(pars or {})
+        self.fitted = dict(fitted or {})
+        self.constraints = dict(constraints or {})
+        self.qmin = qmin
+        self.qmax = qmax
+
+    def fit_names(self):
+        """
+        Names of the parameters reported for each fit: the fitted parameters
+        followed by the constrained ones, each in sorted order.
+        """
+        return (sorted(k for k in self.fitted if k not in self.constraints)
+                + sorted(self.constraints))
+
+    def make_model(self):
+        """
+        Create a model instance with the starting values and bounds.
+
+        Raises ValueError if a parameter is not in the model or if the
+        constraint expressions do not compile.
+        """
+        model = load_model(self.model)()
+        available = model.getParamList()
+        names = set(self.pars) | set(self.fitted) | set(self.constraints)
+        unknown = sorted(k for k in names if k not in available)
+        if unknown:
+            raise ValueError("parameter %s not available in model %s; use one"
+                             " of [%s] instead" % (", ".join(unknown),
+                                                   model.name,
+                                                   ", ".join(available)))
+        for name, value in self.pars.items():
+            model.setParam(name, value)
+        for name, (lower, upper) in self.fitted.items():
+            if name in model.details:
+                model.details[name] = [model.details[name][0], lower, upper]
+        self._check_constraints(model)
+        return model
+
+    def qualified_constraints(self, available):
+        """
+        Constraints as (name, expression) pairs with the model parameters
+        listed in *available* prefixed by :data:`MODEL_ID` in the expressions.
+        """
+        available = set(available)
+        def qualify(match):
+            name = match.group(1)
+            return MODEL_ID + "." + name if name in available else name
+        return [(name, _SYMBOL.sub(qualify, expr))
+                for name, expr in sorted(self.constraints.items())]
+
+    def _check_constraints(self, model):
+        # Evaluate with the starting values so that errors in the expressions
+        # are reported before any work is sent to the workers.
+        if not self.constraints:
+            return
+        available = model.getParamList()
+        symtab = dict((MODEL_ID + "." + k,
+                       parameter.Parameter(value=model.getParam(k), name=k))
+                      for k in available)
+        exprs = dict((MODEL_ID + "." + k, v)
+                     for k, v in self.qualified_constraints(available))
+        try:
+            compile_constraints(symtab, exprs)()
+        except Exception as exc:
+            raise ValueError("invalid constraint: %s" % exc)
+
+
+def load_model(name):
+    """
+    Return the model class for a sasmodels model name, such as *sphere* or
+    *sphere+cylinder*, or for a plugin file path.
+    """
+    if name.endswith('.py'):
+        return load_custom_model(os.path.abspath(name))
+    return make_model_from_info(load_model_info(name))
+
+def parse_par(text):
+    """
+    Parse *name=value*, *name=value:* or *name=value:lower:upper*.
+
+    Returns (name, value, bounds) where bounds is None for a fixed
+    parameter, or a (lower, upper) pair with None for an open bound.
+    """
+    name, sep, value = text.partition('=')
+    if not sep or not name.strip():
+        raise ValueError("expected name=value in parameter %r" % text)
+    fields = value.split(':')
+    if len(fields) > 3:
+        raise ValueError("expected value:lower:upper in parameter %r" % text)
+    number = float(fields[0])
+    if len(fields) == 1:
+        return name.strip(), number, None
+    fields += [''] * (3 - len(fields))
+    bounds = tuple(float(v) if v.strip() else None for v in fields[1:])
+    return name.strip(), number, bounds
+
+def parse_constraint(text):
+    """
+    Parse *name=expression*, returning (name, expression).
+    """
+    name, sep, expr = text.partition('=')
+    if not sep or not name.strip() or not expr.strip():
+        raise ValueError("expected name=expression in constraint %r" % text)
+    return name.strip(), expr.strip()
+
+
+def fit_data(spec, model, data, name=""):
+    """
+    Fit a single data set with a copy of *model*, returning the result
+    for the first (and only) fit problem.
+    """
+    model = model.clone()
+    # SasFitness names the parameters "<model> <data name>.<par>"; dropping
+    # the data name leaves "M1.<par>", which the constraints refer to.
+    data.name = None
+    smearer = smear_selection(data, model)
+    fitmodel = Model(model, data)
+    fitmodel.name = MODEL_ID
+    names = spec.fit_names()
+    fitter = BumpsFit()
+    fitter.fitter_id = name
+    constraints = spec.qualified_constraints(model.getParamList())
+    fitter.set_model(fitmodel, MODEL_ID, names, constraints=constraints,
+                     data=data)
+    fitter.set_data(data=data, id=MODEL_ID, smearer=smearer,
+                    qmin=spec.qmin, qmax=spec.qmax)
+    if data.__class__.__name__ == 'Data2D':
+        # FitEngine.set_data only attaches the smearer to 1D data
+        fitter.fit_arrange_dict[MODEL_ID].get_data().set_smearer(smearer)
+    fitter.select_problem_for_fit(id=MODEL_ID, value=1)
+    return fitter.fit()[0]
+
+def fit_file(spec, model, path):
+    """
+    Load *path* and fit each data set in it.
+
+    Returns a list of result records, one per data set.  Errors are caught
+    and recorded so that a bad file does not stop the batch.
+    """
+    names = spec.fit_names()
+    try:
+        datasets = Loader().load(path)
+        if not isinstance(datasets, list):
+            datasets = [datasets]
+    except Exception as exc:
+        return [_failed(path, 0, names, "load failed: %s" % exc)]
+    records = []
+    for entry, data in enumerate(datasets):
+        start = time.time()
+        try:
+            result = fit_data(spec, model, data, name=path)
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            records.append(_failed(path, entry, names, str(exc)))
+            continue
+        records.append({
+            'file': path,
+            'entry': entry,
+            'success': bool(result.success),
+            'chisq': float(result.fitness),
+            'npoints': int(np.sum(result.index)),
+            'names': list(result.param_list),
+            'values': np.asarray(result.pvec, 'd'),
+            'errors': np.asarray(result.stderr, 'd'),
+            'time': time.time() - start,
+            'message': (result.mesg or "").split("\n", 1)[0],
+        })
+    return records
+
+def _failed(path, entry, names, message):
+    nan = np.NaN*np.ones(len(names))
+    return {
+        'file': path, 'entry': entry, 'success': False, 'chisq': np.NaN,
+        'npoints': 0, 'names': list(names), 'values': nan, 'errors': nan,
+        'time': 0., 'message': message,
+    }
+
+
+# Worker state, set once per process by the pool initializer so that the
+# model is only built once per worker.
+_worker_spec = None
+_worker_model = None
+def _init_worker(spec):
+    global _worker_spec, _worker_model
+    _worker_spec = spec
+    _worker_model = spec.make_model()
+
+def _fit_in_worker(path):
+    return fit_file(_worker_spec, _worker_model, path)
+
+
+class CSVResults(object):
+    """
+    Append fit results to a CSV file, one row per data set.
+    """
+    def __init__(self, filename, names):
+        self.filename = filename
+        self.columns = (['file', 'entry', 'success', 'chisq', 'npoints']
+                        + [c for k in names for c in (k, k + '_err')]
+                        + ['time', 'message'])
+
+    def completed(self):
+        """Return the set of files whose data sets were all fitted"""
+        if not os.path.exists(self.filename):
+            return set()
+        with open(self.filename) as fid:
+            reader = csv.DictReader(fid)
+            if reader.fieldnames != self.columns:
+                raise ValueError("columns in %s do not match the fit"
+                                 % self.filename)
+            return _completed((row['file'], int(row['entry']),
+                               int(row['success'])) for row in reader)
+
+    def open(self):
+        new = (not os.path.exists(self.filename)
+               or os.path.getsize(self.filename) == 0)
+        self._fid = open(self.filename, 'a')
+        self._writer = csv.writer(self._fid)
+        if new:
+            self._writer.writerow(self.columns)
+            self._fid.flush()
+
+    def write(self, record):
+        row = [record['file'], record['entry'], int(record['success']),
+               "%.15g" % record['chisq'], record['npoints']]
+        for value, error in zip(record['values'], record['errors']):
+            row.extend(("%.15g" % value, "%.15g" % error))
+        row.extend(("%.3f" % record['time'],
+                    " ".join(record['message'].split())))
+        self._writer.writerow(row)
+        self._fid.flush()
+
+    def close(self):
+        self._fid.close()
+
+
+class HDF5Results(object):
+    """
+    Append fit results to an HDF5 file, one group per data set.
+    """
+    def __init__(self, filename, names):
+        self.filename = filename
+        self.names = names
+
+    def completed(self):
+        """Return the set of files whose data sets were all fitted"""
+        import h5py
+        if not os.path.exists(self.filename):
+            return set()
+        with h5py.File(self.filename, 'r') as fid:
+            return _completed((_as_str(group.attrs['file']),
+                               int(group.attrs['entry']),
+                               group.attrs['success'])
+                              for group in fid.values())
+
+    def open(self):
+        import h5py
+        self._fid = h5py.File(self.filename, 'a')
+
+    def write(self, record):
+        group = self._fid.create_group("fit%06d" % len(self._fid))
+        for key in ('file', 'entry', 'success', 'chisq', 'npoints', 'time',
+                    'message'):
+            group.attrs[key] = record[key]
+        group.create_dataset('names', data=[np.string_(k)
+                                            for k in record['names']])
+        group.create_dataset('values', data=record['values'])
+        group.create_dataset('errors', data=record['errors'])
+        self._fid.flush()
+
+    def close(self):
+        self._fid.close()
+
+def _completed(rows):
+    """
+    Return the files of the (file, entry, success) *rows* for which the
+    latest row of each data set is successful.
+    """
+    latest = dict(((path, entry), bool(success))
+                  for path, entry, success in rows)
+    failed = set(path for (path, _), success in latest.items() if not success)
+    return set(path for path, _ in latest) - failed
+
+def _as_str(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+def open_results(filename, names):
+    """
+    Return the results writer for *filename*, chosen by its extension.
+    """
+    if filename.lower().endswith(HDF5_EXTENSIONS):
+        return HDF5Results(filename, names)
+    return CSVResults(filename, names)
+
+
+def run_batch(spec, files, output, nworkers=1, resume=True):
+    """
+    Fit each of *files* and write the results to *output*.
+
+    With *resume*, files that already have successful results in *output*
+    are skipped; files with a failed load or fit are fitted again.
+    Fits are run in *nworkers* processes, or in this process if *nworkers*
+    is 1.  Returns the number of files fitted.
+    """
+    # Build the model here to check the spec before starting the workers
+    model = spec.make_model()
+    results = open_results(output, spec.fit_names())
+    done = results.completed() if resume else set()
+    todo = [path for path in files if path not in done]
+    if len(todo) < len(files):
+        logger.info("skipping %d files with successful results in %s",
+                    len(files) - len(todo), output)
+    if not todo:
+        return 0
+
+    results.open()
+    pool = None
+    try:
+        if nworkers > 1:
+            pool = multiprocessing.Pool(nworkers, initializer=_init_worker,
+                                        initargs=(spec,))
+            stream = pool.imap_unordered(_fit_in_worker, todo)
+        else:
+            stream = (fit_file(spec, model, path) for path in todo)
+        for k, records in enumerate(stream):
+            for record in records:
+                results.write(record)
+            logger.info("%d/%d %s", k + 1, len(todo), records[0]['file'])
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        results.close()
+    return len(todo)
+
+
+def main(argv=None):
+    """
+    Command line entry point for batch fitting.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", help="model name or plugin model file")
+    parser.add_argument("files", nargs="+",
+                        help="data files or glob patterns")
+    parser.add_argument("-p", "--par", action="append", default=[],
+                        help="parameter value, fitted if bounds are given")
+    parser.add_argument("-c", "--constraint", action="append", default=[],
+                        help="parameter constraint name=expression")
+    parser.add_argument("-o", "--output", default="batch_fit.csv",
+                        help="results file (.csv, .h5 or .hdf5)")
+    parser.add_argument("-n", "--workers", type=int, default=1,
+                        help="number of worker processes (0 for all cpus)")
+    parser.add_argument("--qmin", type=float, default=None)
+    parser.add_argument("--qmax", type=float, default=None)
+    parser.add_argument("--restart", action="store_true",
+                        help="fit all files even if they have successful results")
+    opts = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        pars, fitted = {}, {}
+        for text in opts.par:
+            name, value, bounds = parse_par(text)
+            pars[name] = value
+            if bounds is not None:
+                fitted[name] = bounds
+        constraints = dict(parse_constraint(text) for text in opts.constraint)
+        if not fitted:
+            raise ValueError("no fitting parameters")
+        spec = BatchSpec(opts.model, pars=pars, fitted=fitted,
+                         constraints=constraints,
+                         qmin=opts.qmin, qmax=opts.qmax)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    files = []
+    for pattern in opts.files:
+        matches = sorted(glob.glob(pattern))
+        files.extend(matches if matches else [pattern])
+    nworkers = opts.workers if opts.workers > 0 else multiprocessing.cpu_count()
+    start = time.time()
+    try:
+        count = run_batch(spec, files, opts.output, nworkers=nworkers,
+                          resume=not opts.restart)
+    except ValueError as exc:
+        logger.error(str(exc))
+        return 1
+    logger.info("fitted %d files in %.1f s", count, time.time() - start)
+    return 0
+
+if __name__ == "__main__":
+    # Allow run with:
+    #    python -m sas.sascalc.fit.batch
+    sys.exit(main())
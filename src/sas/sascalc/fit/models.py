@@ -12,9 +12,11 @@ import traceback
 import py_compile
 import shutil
 import io
+import hashlib
 
 from six import reraise
 
+from sasmodels import custom
 from sasmodels.sasview_model import load_custom_model, load_standard_models
 
 from sas import get_user_dir
@@ -158,9 +160,119 @@ def compile_file(dir):
     return None
 
 
-def find_plugin_models():
+def _plugin_stamp(paths):
+    """
+    Return the [mtime, size] of each file, keyed by path
+    """
+    stamp = {}
+    for path in paths:
+        info = os.stat(path)
+        stamp[path] = [info.st_mtime, info.st_size]
+    return stamp
+
+
+def _plugin_hash(paths):
+    """
+    Return the sha1 hex digest of the contents of the files
+    """
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        with open(path, 'rb') as fid:
+            digest.update(fid.read())
+    return digest.hexdigest()
+
+
+def _plugin_changed(entry):
+    """
+    Check if the files of a plugin index entry have changed since the
+    entry was made.  Files which were touched without changing their
+    contents get their new time stamps in the entry.
+    """
+    try:
+        stamp = _plugin_stamp(entry['files'])
+        if stamp == entry['files']:
+            return False
+        if _plugin_hash(stamp) != entry['hash']:
+            return True
+    except (OSError, IOError):
+        return True
+    entry['files'] = stamp
+    return False
+
+
+def _plugin_files(path, model_info):
+    """
+    Return the plugin file and the files of the plugin directory that the
+    model uses: its C sources and, for sum, multiplication and product
+    models, the plugin files of its parts and their C sources.
+    """
+    plugins_dir = os.path.dirname(path)
+    files = [path]
+    pending = [(path, model_info)]
+    while pending:
+        filename, info = pending.pop()
+        if info is None:
+            continue
+        base = os.path.dirname(filename) if filename else plugins_dir
+        candidates = [filename] if filename else []
+        candidates += [os.path.join(base, source)
+                       for source in getattr(info, 'source', None) or []]
+        for candidate in candidates:
+            candidate = os.path.abspath(candidate)
+            if (candidate not in files and os.path.isfile(candidate)
+                    and os.path.dirname(candidate) == plugins_dir):
+                files.append(candidate)
+        composition = getattr(info, 'composition', None)
+        if composition:
+            pending.extend((getattr(part, 'filename', None), part)
+                           for part in composition[1])
+    return files
+
+
+def _load_plugin(path):
+    """
+    Load a plugin model into a new plugin index entry
+
+    The entry holds the time stamps and hash of the plugin file and of the
+    files it depends on (see :func:`_plugin_files`), and either the model
+    or the error from loading it.
+    """
+    files = [path]
+    stamp, digest = _plugin_stamp(files), _plugin_hash(files)
+    # sasmodels keeps the module of the plugin unless the plugin file is
+    # newer, but after a failed load it forgets the parts a sum model
+    # uses, so a retry would return the old sum.
+    getattr(custom, '_MODULE_CACHE', {}).pop(path, None)
+    try:
+        model = load_custom_model(path)
+        # TODO: add [plug-in] tag to model name in sasview_model
+        if not model.name.startswith(PLUGIN_NAME_BASE):
+            model.name = PLUGIN_NAME_BASE + model.name
+    except Exception as exc:
+        msg = traceback.format_exc()
+        msg += "\nwhile accessing model in %r" % path
+        plugin_log(msg)
+        logger.warning("Failed to load plugin %r. See %s for details",
+                       path, PLUGIN_LOG)
+        return dict(files=stamp, hash=digest, name=None,
+                    error="%s: %s" % (type(exc).__name__, exc))
+    files = _plugin_files(path, getattr(model, '_model_info', None))
+    if len(files) > 1:
+        stamp, digest = _plugin_stamp(files), _plugin_hash(files)
+    return dict(files=stamp, hash=digest, name=model.name, error=None,
+                model=model)
+
+
+def find_plugin_models(index=None):
     """
     Find custom models
+
+    The index maps the path of each plugin file to the time stamps and
+    content hash of the files it depends on, and its loaded model.  Plugins
+    whose files are unchanged are taken from the index rather than loaded
+    again.  Plugins which failed to load are tried again whenever another
+    plugin is added, changed or removed, since they may depend on it.  The
+    index is updated in place; if it is not given all plugins are loaded.
     """
     # List of plugin objects
     plugins_dir = find_plugins_dir()
@@ -174,24 +286,57 @@ def find_plugin_models():
     # compile_file(plugins_dir)  #always recompile the folder plugin
     logger.info("plugin model dir: %s", plugins_dir)
 
+    if index is None:
+        index = {}
+    start = time.time()
+    counts = dict(loaded=0, cached=0, failed=0, skipped=0)
+    changed = False
     plugins = {}
-    for filename in os.listdir(plugins_dir):
+    found = set()
+    failed = []
+
+    def load(path):
+        entry = index[path] = _load_plugin(path)
+        if entry['error'] is not None:
+            counts['failed'] += 1
+        else:
+            counts['loaded'] += 1
+            plugins[entry['model'].name] = entry['model']
+
+    for filename in sorted(os.listdir(plugins_dir)):
         name, ext = os.path.splitext(filename)
         if ext == '.py' and not name == '__init__':
             path = os.path.abspath(os.path.join(plugins_dir, filename))
-            try:
-                model = load_custom_model(path)
-                # TODO: add [plug-in] tag to model name in sasview_model
-                if not model.name.startswith(PLUGIN_NAME_BASE):
-                    model.name = PLUGIN_NAME_BASE + model.name
-                plugins[model.name] = model
-            except Exception as exc:
-                msg = traceback.format_exc()
-                msg += "\nwhile accessing model in %r" % path
-                plugin_log(msg)
-                logger.warning("Failed to load plugin %r. See %s for details",
-                               path, PLUGIN_LOG)
-
+            found.add(path)
+            entry = index.get(path)
+            if entry is not None and not _plugin_changed(entry):
+                if entry['error'] is not None:
+                    failed.append(path)
+                    continue
+                counts['cached'] += 1
+                plugins[entry['model'].name] = entry['model']
+                continue
+            load(path)
+            changed = True
+    for path in set(index) - found:
+        del index[path]
+        changed = True
+    # A plugin may have failed because a plugin it uses was broken
+    for path in failed:
+        if changed:
+            load(path)
+        else:
+            counts['skipped'] += 1
+
+    msg = ("found %d plugin models in %.3f s: %d loaded, %d cached,"
+           " %d failed, %d skipped as unchanged since they failed"
+           % (len(plugins), time.time() - start, counts['loaded'],
+              counts['cached'], counts['failed'], counts['skipped']))
+    plugin_log(msg)
+    if counts['failed'] or counts['skipped']:
+        logger.warning(msg)
+    else:
+        logger.info(msg)
     return plugins
 
 
@@ -208,6 +353,8 @@ class ModelManagerBase(object):
     plugin_models = None  # type: Dict[str, Model]
     #: timestamp on the plugin directory at the last plugin update
     last_time_dir_modified = 0  # type: int
+    #: index of the plugin files and their models, see find_plugin_models
+    plugin_index = None  # type: Dict[str, Dict]
 
     def __init__(self):
         # the model dictionary is allocated at the start and updated to
@@ -218,6 +365,7 @@ class ModelManagerBase(object):
         #Build list automagically from sasmodels package
         self.standard_models = {model.name: model
                                 for model in load_standard_models()}
+        self.plugin_index = {}
         # Look for plugins
         self.plugins_reset()
 
@@ -250,17 +398,15 @@ class ModelManagerBase(object):
         return a dictionary of model if
         new models were added else return empty dictionary
         """
+        # The directory time stamp doesn't change when a plugin is edited
+        # in place, so always rescan; only changed plugins are reloaded.
         return self.plugins_reset()
-        #if self._is_plugin_dir_changed():
-        #    return self.plugins_reset()
-        #else:
-        #    return {}
 
     def plugins_reset(self):
         """
         return a dictionary of model
         """
-        self.plugin_models = find_plugin_models()
+        self.plugin_models = find_plugin_models(self.plugin_index)
         self.model_dictionary.clear()
         self.model_dictionary.update(self.standard_models)
         self.model_dictionary.update(self.plugin_models)
@@ -0,0 +1,135 @@
+"""
+Run independent fits in a pool of worker processes.
+
+Each fitter is a :class:`FitEngine` with its fit problems already set up,
+as for a batch fit in the GUI.  The workers are forked so that they
+inherit the fitters: the model classes are generated on the fly by
+sasmodels and cannot be pickled.  Forking without exec is only safe on
+Linux; on other platforms :func:`fit_parallel` returns None and the caller
+fits in its own process.  Forked workers also inherit any OpenCL context
+of the parent, which is not safe to use from a child process, so the
+workers compute with the compiled C kernels instead.
+"""
+import os
+import sys
+
+from sasmodels import sasview_model
+
+#: Environment variable overriding the configured number of workers
+WORKERS_ENV = 'SAS_FIT_WORKERS'
+
+def default_workers(setting=1):
+    """
+    Number of worker processes for batch fits.
+
+    The configured *setting* is overridden by the SAS_FIT_WORKERS
+    environment variable.  A value of 0 uses one worker per CPU, and 1
+    fits in the calling process.
+    """
+    workers = int(os.environ.get(WORKERS_ENV, setting))
+    if workers <= 0:
+        from multiprocessing import cpu_count
+        workers = cpu_count()
+    return workers
+
+def fork_context():
+    """
+    Return a multiprocessing context whose workers are forked, or None if
+    forking is not safe on this platform.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        from multiprocessing import get_context
+    except ImportError:  # CRUFT: python 2 always forks on posix
+        import multiprocessing
+        return multiprocessing
+    return get_context('fork')
+
+# Fitters inherited by the worker processes
+_worker_fitters = None
+
+def _init_worker(fitters):
+    """
+    Keep the fitters for the worker and switch it to the C kernels.
+    """
+    global _worker_fitters
+    _worker_fitters = fitters
+    os.environ['SAS_OPENCL'] = 'none'
+    # Drop the kernels compiled by the parent, including those of models
+    # which are not in the sasmodels registry, so they are rebuilt here.
+    sasview_model.reset_environment()
+    for fitter in fitters:
+        for problem in fitter.fit_arrange_dict.values():
+            type(problem.get_model().model)._model = None
+
+def _fit_in_worker(index, reset_flag):
+    """
+    Run fitter *index* in a worker process.  The model and data are
+    stripped from the results since they are not picklable; the parent
+    process reattaches its own copies.
+    """
+    results = _worker_fitters[index].fit(None, None, None, None,
+                                         reset_flag=reset_flag)
+    for res in results:
+        res.model = res.data = None
+        res.inputs = []
+    return results
+
+def _attach_inputs(fitter, results):
+    """
+    Reattach the model and data of *fitter* to results computed in a
+    worker process, and set the fitted values on the model as a fit in
+    this process would.
+    """
+    problems = [M for M in fitter.fit_arrange_dict.values() if M.get_to_fit()]
+    for res, problem in zip(results, problems):
+        res.model = problem.get_model().model
+        res.data = problem.get_data()
+        res.inputs = [(res.model, res.data)]
+        if res.success:
+            for name, value in zip(res.param_list, res.pvec):
+                res.model.setParam(name, value)
+    return results
+
+def fit_parallel(fitters, nworkers, reset_flag=False, handler=None,
+                 isquit=None, yieldtime=0.03):
+    """
+    Run each of *fitters* in a pool of *nworkers* forked processes.
+
+    Progress is reported through *handler* as each fit completes, and
+    *isquit* is called every *yieldtime* seconds while waiting; an
+    exception raised by it terminates the pool.  Returns the list of
+    results of each fitter, in the order of *fitters*, or None if worker
+    processes cannot be forked.
+    """
+    context = fork_context()
+    if context is None:
+        return None
+    nfits = len(fitters)
+    pool = context.Pool(processes=min(nworkers, nfits),
+                        initializer=_init_worker, initargs=(fitters,))
+    try:
+        jobs = [pool.apply_async(_fit_in_worker, (k, reset_flag))
+                for k in range(nfits)]
+        pool.close()
+        result = [None] * nfits
+        pending = list(range(nfits))
+        while pending:
+            if isquit is not None:
+                isquit()
+            jobs[pending[0]].wait(yieldtime)
+            for k in [k for k in pending if jobs[k].ready()]:
+                pending.remove(k)
+                result[k] = _attach_inputs(fitters[k], jobs[k].get())
+                if handler is not None:
+                    if result[k]:
+                        handler.set_result(result[k][0])
+                    handler.progress(nfits - len(pending), nfits)
+                    handler.update_fit()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return result
@@ -11,6 +11,7 @@
 import math
 import logging
 import sys
+import time
 
 import numpy as np  # type: ignore
 from numpy import pi, exp # type:ignore
@@ -21,6 +22,8 @@ from sasmodels.resolution2d import Pinhole2D
 
 from sas.sascalc.data_util.nxsunit import Converter
 
+logger = logging.getLogger(__name__)
+
 def smear_selection(data, model = None):
     """
     Creates the right type of smearer according
@@ -181,6 +184,12 @@ def pinhole_smear(data, model=None):
 class PySmear2D(object):
     """
     Q smearing class for SAS 2d pinhole data
+
+    The Pinhole2D resolution kernel depends only on the data, the index
+    of the points to compute, the accuracy and the coordinate system, so
+    it is built once and reused until one of these changes.  The time
+    spent building kernels and evaluating the model is accumulated and
+    can be retrieved with :meth:`get_timing`.
     """
 
     def __init__(self, data=None, model=None):
@@ -191,6 +200,10 @@ class PySmear2D(object):
         self.index = None
         self.coords = 'polar'
         self.smearer = True
+        # Cached resolution kernel and the coords it was built for
+        self._resolution = None
+        self._resolution_coords = None
+        self.reset_timing()
 
     def set_accuracy(self, accuracy='Low'):
         """
@@ -198,6 +211,8 @@ class PySmear2D(object):
 
         :param accuracy:  string
         """
+        if accuracy != self.accuracy:
+            self._resolution = None
         self.accuracy = accuracy
 
     def set_smearer(self, smearer=True):
@@ -215,6 +230,7 @@ class PySmear2D(object):
 
         :param data: DataLoader.Data_info type
         """
+        self._resolution = None
         self.data = data
 
     def set_model(self, model=None):
@@ -231,24 +247,64 @@ class PySmear2D(object):
 
         :param index: 1d arrays
         """
+        if index is not self.index:
+            if (index is None or self.index is None
+                    or not np.array_equal(index, self.index)):
+                self._resolution = None
         self.index = index
 
+    def get_resolution(self):
+        """
+        Return the Pinhole2D resolution kernel for the current data, index
+        and accuracy, building it only if one of them has changed.
+        """
+        if self._resolution is None or self._resolution_coords != self.coords:
+            start = time.time()
+            self._resolution = Pinhole2D(data=self.data, index=self.index,
+                                         nsigma=3.0, accuracy=self.accuracy,
+                                         coords=self.coords)
+            self._resolution_coords = self.coords
+            elapsed = time.time() - start
+            self._timing['build_time'] += elapsed
+            self._timing['builds'] += 1
+            logger.debug("PySmear2D: built %s accuracy kernel in %g s",
+                         self.accuracy, elapsed)
+        return self._resolution
+
+    def get_timing(self):
+        """
+        Return the accumulated time spent building resolution kernels and
+        evaluating the model, and the number of each.
+
+        :return: dict with keys build_time, builds, eval_time, evals
+        """
+        return dict(self._timing)
+
+    def reset_timing(self):
+        """
+        Reset the accumulated timing information.
+        """
+        self._timing = dict(build_time=0.0, builds=0, eval_time=0.0, evals=0)
+
     def get_value(self):
         """
         Over sampling of r_nbins times phi_nbins, calculate Gaussian weights,
         then find smeared intensity
         """
         if self.smearer:
-            res = Pinhole2D(data=self.data, index=self.index,
-                            nsigma=3.0, accuracy=self.accuracy,
-                            coords=self.coords)
+            res = self.get_resolution()
+            start = time.time()
             val = self.model.evalDistribution(res.q_calc)
+            self._timing['eval_time'] += time.time() - start
+            self._timing['evals'] += 1
             return res.apply(val)
         else:
             index = self.index if self.index is not None else slice(None)
             qx_data = self.data.qx_data[index]
             qy_data = self.data.qy_data[index]
             q_calc = [qx_data, qy_data]
+            start = time.time()
             val = self.model.evalDistribution(q_calc)
+            self._timing['eval_time'] += time.time() - start
+            self._timing['evals'] += 1
             return val
-
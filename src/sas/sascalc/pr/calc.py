@@ -167,7 +167,63 @@ def ortho_transformed_smeared(q, d_max, n, height, width, npts):
 
     return total / (n_width*n_height)
 
-@njit('f8[:](f8[:], f8[:], f8, f8, f8, u8)')
+def slit_smeared_q(q, height, width, npts):
+    """
+    Effective q values of the slit smearing quadrature.
+    Uses the same grid as :func:`ortho_transformed_smeared`, npts points
+    across the slit width and npts points along the slit height.
+
+    :param q: q (vector).
+    :param height: slit_height.
+    :param width: slit_width.
+    :param npts: npts.
+
+    :return: Array of shape (len(q), number of quadrature points) with the
+        q value seen at each point of the slit, all with equal weight.
+    """
+    n_width = npts if width > 0 else 1
+    n_height = npts if height > 0 else 1
+    dz = height/(npts-1)
+    y0, dy = -0.5*width, width/(npts-1)
+    y = y0 + dy*np.arange(n_width)
+    zsq = (dz*np.arange(n_height))**2
+    qsq = (q[:, None] - y[None, :])**2
+    return np.sqrt(qsq[:, None, :] + zsq[None, :, None]).reshape(len(q), -1)
+
+def ortho_transformed_smeared_matrix(q, d_max, n, height, width, npts):
+    """
+    Slit-smeared Fourier transform of several orthogonal functions.
+    Gives the same values as :func:`ortho_transformed_smeared` for each n,
+    but the slit quadrature grid and sinc(qd) are computed once for all of
+    them.  The q values are processed in blocks to bound the memory used
+    by the grid.
+
+    :param q: q (vector).
+    :param d_max: d_max.
+    :param n: orders of the orthogonal functions (vector).
+    :param height: slit_height.
+    :param width: slit_width.
+    :param npts: npts.
+
+    :return: Array of shape (len(q), len(n)) with one column per order.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    total = np.empty((len(q), len(n)), dtype=np.float64)
+    scale = 8.0 * d_max**2 * n * (-1.0)**(n+1)
+
+    n_quad = (npts if width > 0 else 1) * (npts if height > 0 else 1)
+    block = max(1, 2**20 // n_quad)
+    for start in range(0, len(q), block):
+        stop = start + block
+        qd = slit_smeared_q(q[start:stop], height, width, npts) * (d_max/pi)
+        sinc_qd = np.sinc(qd)
+        qd_sq = qd**2
+        for k, n_k in enumerate(n):
+            total[start:stop, k] = np.mean(sinc_qd / (n_k**2 - qd_sq), axis=1)
+
+    return total * scale
+
 def iq_smeared(p, q, d_max, height, width, npts):
     """
     Scattering intensity calculated from the expansion, slit-smeared.
@@ -180,13 +236,9 @@ def iq_smeared(p, q, d_max, height, width, npts):
 
     :return: Scattering intensity from the expansion slit-smeared across all q.
     """
-    size_q = len(q)
-    total = np.zeros(size_q, dtype=np.float64)
-
-    for i, p_i in enumerate(p):
-        total += p_i * ortho_transformed_smeared(q, d_max, i+1, height, width, npts)
-
-    return total
+    n = np.arange(1, len(p)+1)
+    basis = ortho_transformed_smeared_matrix(q, d_max, n, height, width, npts)
+    return np.dot(basis, p)
 
 @njit('f8[:](f8[:], f8, f8[:])')
 def iq(pars, d_max, q):
@@ -15,7 +15,10 @@ of D_max value. User picks a number of points and a range of
 distances, then get a series of outputs as a function of D_max
 over that range.
 """
-import sys
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
 
 
 class Results(object):
@@ -39,6 +42,74 @@ class Results(object):
         self.d_max = []
         ## List of errors found during the last exploration
         self.errors = []
+        ## D_max value for each entry in errors
+        self.failed = []
+
+    def add(self, d_max, outputs):
+        """
+        Store the outputs of one inversion.
+
+        :param d_max: D_max value of the inversion
+        :param outputs: (bck, chi2, iq0, rg, pos, pos_err, osc) tuple
+        """
+        bck, chi2, iq0, rg, pos, pos_err, osc = outputs
+        self.d_max.append(d_max)
+        self.bck.append(bck)
+        self.chi2.append(chi2)
+        self.iq0.append(iq0)
+        self.rg.append(rg)
+        self.pos.append(pos)
+        self.pos_err.append(pos_err)
+        self.osc.append(osc)
+
+    def add_error(self, d_max, msg):
+        """
+        Store the error message of a failed inversion.
+        """
+        self.failed.append(d_max)
+        self.errors.append(msg)
+
+    def sort(self):
+        """
+        Order the outputs and the errors by D_max.
+        """
+        order = sorted(range(len(self.d_max)), key=self.d_max.__getitem__)
+        for name in ('d_max', 'bck', 'chi2', 'iq0', 'rg',
+                     'pos', 'pos_err', 'osc'):
+            values = getattr(self, name)
+            setattr(self, name, [values[i] for i in order])
+        order = sorted(range(len(self.failed)), key=self.failed.__getitem__)
+        self.failed = [self.failed[i] for i in order]
+        self.errors = [self.errors[i] for i in order]
+
+
+def _invert(args):
+    """
+    Perform the inversion for one D_max value.
+
+    This is run in the pool workers, so it only returns plain values.
+
+    :param args: (pr_state, d) - a copy of the invertor and the D_max
+        value to use with it
+    :return: d_max, outputs, error - outputs is the tuple taken by
+        :meth:`Results.add`, or None and an error message on failure
+    """
+    pr_state, d = args
+    try:
+        pr_state.d_max = d
+        out, cov = pr_state.invert(pr_state.nfunc)
+
+        outputs = (pr_state.background, pr_state.chi2,
+                   pr_state.iq0(out), pr_state.rg(out),
+                   pr_state.get_positive(out),
+                   pr_state.get_pos_err(out, cov),
+                   pr_state.oscillations(out))
+        return d, outputs, None
+    except Exception as exc:
+        # This inversion failed, skip this D_max value
+        msg = "ExploreDialog: inversion failed for "
+        msg += "D_max=%s\n %s" % (str(d), exc)
+        return d, None, msg
 
 
 class DistExplorer(object):
@@ -57,13 +128,33 @@ class DistExplorer(object):
         self._default_min = 0.8 * self.pr_state.d_max
         self._default_max = 1.2 * self.pr_state.d_max
 
-    def __call__(self, dmin=None, dmax=None, npts=10):
+    def __call__(self, dmin=None, dmax=None, npts=10, nworkers=1,
+                 processes=False, refine=0, pos_tol=0.05, chi2_tol=0.1,
+                 callback=None):
         """
         Compute the outputs as a function of D_max.
 
+        Each D_max value is inverted on its own clone of the invertor,
+        so pr_state is left unchanged and the inversions can run on a pool
+        of *nworkers* threads, or processes if *processes* is True.  The
+        outputs are stored as they finish and sorted by D_max at the end.
+
+        With *refine* > 0, the grid is refined that many times in the
+        intervals where something changes quickly: the positive fraction
+        of P(r) changes by more than *pos_tol*, chi2 changes by more than
+        a fraction *chi2_tol*, or only one of the end points failed.  A
+        point is added in the middle of each such interval.
+
         :param dmin: minimum value for D_max
         :param dmax: maximum value for D_max
         :param npts: number of points for D_max
+        :param nworkers: number of inversions to run at the same time
+        :param processes: if True, use processes rather than threads
+        :param refine: number of refinement passes
+        :param pos_tol: change in positive fraction that triggers refinement
+        :param chi2_tol: relative change in chi2 that triggers refinement
+        :param callback: function called with the results and the D_max
+            value after each inversion
 
         """
         # Take care of the defaults if needed
@@ -76,32 +167,78 @@ class DistExplorer(object):
         # Results object to store the computation outputs.
         results = Results()
 
-        # Loop over d_max values
-        for i in range(npts):
-            d = dmin + i * (dmax - dmin) / (npts - 1.0)
-            self.pr_state.d_max = d
-            try:
-                out, cov = self.pr_state.invert(self.pr_state.nfunc)
-
-                # Store results
-                iq0 = self.pr_state.iq0(out)
-                rg = self.pr_state.rg(out)
-                pos = self.pr_state.get_positive(out)
-                pos_err = self.pr_state.get_pos_err(out, cov)
-                osc = self.pr_state.oscillations(out)
-
-                results.d_max.append(self.pr_state.d_max)
-                results.bck.append(self.pr_state.background)
-                results.chi2.append(self.pr_state.chi2)
-                results.iq0.append(iq0)
-                results.rg.append(rg)
-                results.pos.append(pos)
-                results.pos_err.append(pos_err)
-                results.osc.append(osc)
-            except Exception as exc:
-                # This inversion failed, skip this D_max value
-                msg = "ExploreDialog: inversion failed for "
-                msg += "D_max=%s\n %s" % (str(d), exc)
-                results.errors.append(msg)
-
+        d_values = [dmin + i * (dmax - dmin) / (npts - 1.0)
+                    for i in range(npts)]
+
+        pool = None
+        if nworkers > 1:
+            if processes:
+                pool = multiprocessing.Pool(nworkers)
+            else:
+                pool = ThreadPool(nworkers)
+        try:
+            self._run(d_values, results, pool, callback)
+            for _ in range(refine):
+                results.sort()
+                d_values = self._refine_points(results, pos_tol, chi2_tol)
+                if not d_values:
+                    break
+                self._run(d_values, results, pool, callback)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        results.sort()
         return results
+
+    def _run(self, d_values, results, pool, callback):
+        """
+        Perform the inversion for each D_max value, storing the outputs
+        in results as they finish.
+        """
+        states = ((self._clone(), d) for d in d_values)
+        if pool is None:
+            finished = (_invert(pr) for pr in states)
+        else:
+            finished = pool.imap_unordered(_invert, states)
+        for d, outputs, msg in finished:
+            if outputs is None:
+                results.add_error(d, msg)
+            else:
+                results.add(d, outputs)
+            if callback is not None:
+                callback(results, d)
+
+    def _clone(self):
+        """
+        Return a copy of pr_state for one inversion.
+        """
+        pr = self.pr_state.clone()
+        # invert() shifts y in place, so each clone needs its own copy
+        pr.y = np.array(self.pr_state.y)
+        return pr
+
+    @staticmethod
+    def _refine_points(results, pos_tol, chi2_tol):
+        """
+        Return the mid points of the intervals between neighbouring
+        D_max values where the outputs change by more than the tolerances.
+        """
+        ok = [(d, True) for d in results.d_max]
+        ok += [(d, False) for d in results.failed]
+        ok.sort()
+        values = dict(zip(results.d_max, zip(results.pos, results.chi2)))
+        new_points = []
+        for (d_0, ok_0), (d_1, ok_1) in zip(ok[:-1], ok[1:]):
+            if ok_0 and ok_1:
+                pos_0, chi2_0 = values[d_0]
+                pos_1, chi2_1 = values[d_1]
+                step = (abs(pos_1 - pos_0) > pos_tol
+                        or abs(chi2_1 - chi2_0)
+                        > chi2_tol * min(abs(chi2_0), abs(chi2_1)))
+            else:
+                step = ok_0 != ok_1
+            if step:
+                new_points.append(0.5 * (d_0 + d_1))
+        return new_points
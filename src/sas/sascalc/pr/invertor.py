@@ -130,7 +130,9 @@ class Invertor(Pinvertor):
         Overwrite the __reduce_ex__
         """
 
-        state = (self.__dict__,
+        # Don't pickle the cached A matrix; it is rebuilt on demand.
+        state = (dict((k, v) for k, v in self.__dict__.items()
+                      if k != '_design'),
                  self.alpha, self.d_max,
                  self.q_min, self.q_max,
                  self.x, self.y,
@@ -177,6 +179,8 @@ class Invertor(Pinvertor):
             return self.set_slit_height(value)
         elif name == 'slit_width':
             return self.set_slit_width(value)
+        elif name == 'smear_npts':
+            return self.set_smear_npts(value)
         elif name == 'est_bck':
             if value == True:
                 return self.set_est_bck(1)
@@ -250,8 +254,11 @@ class Invertor(Pinvertor):
         invertor.background = self.background
         invertor.slit_height = self.slit_height
         invertor.slit_width = self.slit_width
+        invertor.smear_npts = self.smear_npts
 
         invertor.info = copy.deepcopy(self.info)
+        # The clone has the same data, so it can share the cached A matrix
+        invertor._design = self._design
 
         return invertor
 
@@ -297,6 +304,78 @@ class Invertor(Pinvertor):
             self.y += self.background
         return out, cov
 
+    def invert_alphas(self, alphas, nfunc=10, nr=20):
+        """
+        Perform the inversion for each regularization constant in alphas.
+
+        This gives the same coefficients as setting alpha and calling
+        :meth:`invert` for each value, but A is only decomposed once for
+        the whole set.  With D the data rows and R the regularization rows
+        of A for alpha = 1, the problem for each alpha is
+        (D^T D + alpha R^T R) c = D^T b.  Writing D = U S V^T and
+        M = R V S^-1 = P G W^T, the solution is ::
+
+            c = V S^-1 W (1 + alpha G^2)^-1 W^T U^T b
+
+        so each alpha only costs a few matrix-vector products.  If D does
+        not have full rank, e.g., when the q range leaves fewer points than
+        base functions, each alpha is solved with lstsq instead, which still
+        reuses the cached D.
+
+        The state of the invertor is not changed.
+
+        :param alphas: sequence of regularization constants.
+        :param nfunc: number of base functions to use.
+        :param nr: number of r points to evaluate the 2nd derivative at for the reg. term.
+        :return: c_out, chi2 - the coefficients for each alpha, as returned
+            by :meth:`invert`, and the chi2 of each solution
+        """
+        if self.is_valid() < 0:
+            msg = "Invertor: invalid data; incompatible data lengths."
+            raise RuntimeError(msg)
+
+        alphas = np.asarray(alphas, 'd')
+        nterms = nfunc + 1 if self.est_bck else nfunc
+        try:
+            a_data = self._get_data_matrix(nterms)
+            a_reg = self._get_reg_matrix(nterms, nr)
+        except Exception as exc:
+            raise RuntimeError("Invertor: could not invert I(Q)\n  %s" % str(exc))
+        y = self.y if self.est_bck else self.y - self.background
+        b = self._get_data_vector(y)
+
+        u, sig, vt = np.linalg.svd(a_data, full_matrices=False)
+        rcond = np.finfo(float).eps * max(len(b) + nr, nterms)
+        if len(sig) == nterms and sig[-1] > rcond * sig[0]:
+            v_s = vt.T / sig
+            m = np.dot(a_reg, v_s)
+            _, gam, wt = np.linalg.svd(m, full_matrices=False)
+            lam, w = gam**2, wt.T
+            proj = np.dot(w.T, np.dot(u.T, b))
+            v_s_w = np.dot(v_s, w)
+            coeffs = [np.dot(v_s_w, proj / (1.0 + alpha*lam))
+                      for alpha in alphas]
+        else:
+            b_full = np.hstack((b, np.zeros(nr)))
+            coeffs = []
+            for alpha in alphas:
+                a = np.vstack((a_data, np.sqrt(alpha) * a_reg))
+                rcond = np.finfo(float).eps * max(a.shape)
+                coeffs.append(lstsq(a, b_full, rcond=rcond)[0])
+
+        outs = []
+        chi2 = np.empty(len(alphas))
+        for k, (alpha, c) in enumerate(zip(alphas, coeffs)):
+            chi2[k] = (np.sum((np.dot(a_data, c) - b)**2)
+                       + alpha * np.sum(np.dot(a_reg, c)**2))
+            if self.est_bck:
+                # Drop the background term, as in lstsq
+                c_0 = np.zeros(nterms)
+                c_0[:-1] = c[1:]
+                c = c_0
+            outs.append(c)
+        return outs, chi2
+
     def iq(self, out, q):
         """
         Function to call to evaluate the scattering intensity
@@ -554,54 +633,57 @@ class Invertor(Pinvertor):
         elapsed is the computation time
         """
         #import time
+        elapsed = 0
         try:
             pr = self.clone()
 
             # T_0 for computation time
             starttime = time.time()
-            elapsed = 0
 
             # If the current alpha is zero, try
             # another value
             if pr.alpha <= 0:
                 pr.alpha = 0.0001
+            initial_alpha = pr.alpha
 
-            # Perform inversion to find the largest alpha
-            out, _ = pr.invert(nfunc)
-
+            # Alpha to get the reg term the same size as the signal; this
+            # is what lstsq reports as suggested_alpha for any alpha > 0.
+            nterms = nfunc + 1 if pr.est_bck else nfunc
+            sum_sig = np.sum(pr._get_data_matrix(nterms)**2)
+            sum_reg = np.sum(pr._get_reg_matrix(nterms, 20)**2)
+            suggested_alpha = sum_sig / sum_reg
+            pr.suggested_alpha = suggested_alpha
+
+            # Solve for the initial alpha, the suggested alpha and the
+            # smaller values to scan all at once
+            alphas = ([initial_alpha, suggested_alpha]
+                      + [(0.33) ** (i + 1) * suggested_alpha for i in range(10)])
+            outs, _ = pr.invert_alphas(alphas, nfunc)
             elapsed = time.time() - starttime
-            initial_alpha = pr.alpha
-            initial_peaks = pr.get_peaks(out)
+            initial_peaks = pr.get_peaks(outs[0])
 
             # Try the inversion with the estimated alpha
-            pr.alpha = pr.suggested_alpha
-            out, _ = pr.invert(nfunc)
-
-            npeaks = pr.get_peaks(out)
+            npeaks = pr.get_peaks(outs[1])
             # if more than one peak to start with
             # just return the estimate
             if npeaks > 1:
                 #message = "Your P(r) is not smooth,
                 #please check your inversion parameters"
                 message = None
-                return pr.suggested_alpha, message, elapsed
+                return suggested_alpha, message, elapsed
             else:
 
                 # Look at smaller values
                 # We assume that for the suggested alpha, we have 1 peak
                 # if not, send a message to change parameters
-                alpha = pr.suggested_alpha
-                best_alpha = pr.suggested_alpha
+                best_alpha = suggested_alpha
                 found = False
-                for i in range(10):
-                    pr.alpha = (0.33) ** (i + 1) * alpha
-                    out, _ = pr.invert(nfunc)
-
+                for alpha, out in zip(alphas[2:], outs[2:]):
                     peaks = pr.get_peaks(out)
                     if peaks > 1:
                         found = True
                         break
-                    best_alpha = pr.alpha
+                    best_alpha = alpha
 
                 # If we didn't find a turning point for alpha and
                 # the initial alpha already had only one peak,
@@ -615,7 +697,7 @@ class Invertor(Pinvertor):
 
                 if not found:
                     message = None
-                elif best_alpha >= 0.5 * pr.suggested_alpha:
+                elif best_alpha >= 0.5 * suggested_alpha:
                     # best alpha is too big, return a
                     # reasonable value
                     message = "The estimated alpha for your system is too "
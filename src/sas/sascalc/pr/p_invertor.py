@@ -30,6 +30,10 @@ class Pinvertor(object):
     slit_height = 0.0
     #Slit width in units of q [A-1]
     slit_width = 0.0
+    #Number of points across each slit dimension for slit smearing
+    smear_npts = 21
+    #Cached data rows of the A matrix, as (key, columns)
+    _design = None
 
     def __init__(self):
         #Maximum distance between any two points in the system
@@ -276,6 +280,27 @@ class Pinvertor(object):
         """
         return self.slit_height
 
+    def set_smear_npts(self, smear_npts):
+        """
+        Sets the number of quadrature points used across the slit width
+        and along the slit height when slit smearing.
+
+        :param smear_npts: int to set smear_npts to, at least 2.
+        :return: smear_npts.
+        """
+        if int(smear_npts) < 2:
+            raise ValueError("Pinvertor: smear_npts must be at least 2.")
+        self.__dict__['smear_npts'] = int(smear_npts)
+        return self.smear_npts
+
+    def get_smear_npts(self):
+        """
+        Gets the number of slit smearing quadrature points.
+
+        :return: smear_npts.
+        """
+        return self.smear_npts
+
     def set_est_bck(self, est_bck):
         """
         Sets background flag.
@@ -349,9 +374,8 @@ class Pinvertor(object):
         q = np.atleast_1d(q)
         pars = np.float64(pars)
 
-        npts = 21
         iq_val = calc.iq_smeared(pars, q, self.d_max, self.slit_height,
-                                 self.slit_width, npts)
+                                 self.slit_width, self.smear_npts)
         return iq_val[0] if iq_val.shape[0] == 1 else iq_val
 
     def pr(self, pars, r):
@@ -542,38 +566,103 @@ class Pinvertor(object):
         b_obj = np.zeros(self.npoints + nr)
 
         sqrt_alpha = np.sqrt(self.alpha)
-        offset = 0 if self.est_bck == 1 else 1
 
+        # Compute A
+        a_obj[0:self.npoints, :] = self._get_data_matrix(nfunc)
+        a_obj[self.npoints:self.npoints+nr, :] = self._get_reg_matrix(
+            nfunc, nr, sqrt_alpha)
+
+        # Compute B
+        b_obj[0:self.npoints] = self._get_data_vector(self.y)
+
+        return a_obj, b_obj
+
+    def _get_data_vector(self, y):
+        """
+        Returns the first npoints entries of the b vector, y/err for the
+        accepted q values and zero elsewhere.
+
+        :param y: I(q) values to use.
+        """
+        q_accept_x = self.accept_q(self.x)
+        b_obj = np.zeros(self.npoints)
+        b_obj[q_accept_x] = y[q_accept_x] / self.err[q_accept_x]
+        return b_obj
+
+    def _get_data_matrix(self, nfunc):
+        """
+        Returns the first npoints rows of the A matrix, the Fourier
+        transformed base functions divided by the errors.
+
+        The columns are cached along with the data, d_max, q range, slit
+        size and background flag they were computed for.  Later calls with
+        the same settings only compute the columns that are missing, so
+        changing alpha or the number of base functions is cheap.  The
+        returned array is shared with the cache and must not be modified.
+
+        :param nfunc: number of base functions.
+        """
         if self.check_for_zero(self.err):
             raise RuntimeError("Pinvertor.get_matrix: Some I(Q) points have no error.")
 
+        key = (self.get_dmax(), self.get_qmin(), self.get_qmax(),
+               self.slit_height, self.slit_width, self.smear_npts, self.est_bck,
+               self.x.tobytes(), self.err.tobytes())
+        if self._design is not None and self._design[0] == key:
+            columns = self._design[1]
+        else:
+            columns = np.zeros([self.npoints, 0])
+        if columns.shape[1] < nfunc:
+            # Replace rather than extend the cache since clones share it.
+            columns = np.hstack((columns,
+                                 self._data_columns(columns.shape[1], nfunc)))
+            self._design = (key, columns)
+        return columns[:, :nfunc]
+
+    def _data_columns(self, start, stop):
+        """
+        Computes columns *start* to *stop* of the data rows of the A matrix.
+        """
+        a_obj = np.zeros([self.npoints, stop - start])
+        offset = 0 if self.est_bck == 1 else 1
+
         # Whether or not to use ortho_transformed_smeared.
         smeared = (self.slit_width > 0 or self.slit_height > 0)
-        smear_npts = 21
 
-        # Get valid points as x, y and err.
+        # Get valid points as x and err.
         q_accept_x = self.accept_q(self.x)
         x_use = self.x[q_accept_x]
-        y_use = self.y[q_accept_x]
         err_use = self.err[q_accept_x]
 
-        # Create views into the a_obj/b_obj arrays containing the first
-        # n rows.  Since these are views into the original array updating
-        # the values will update the original.
-        a_view = a_obj[0:self.npoints, :]
-        b_view = b_obj[0:self.npoints]
+        res = np.zeros([len(x_use), stop - start])
+        first = start
+        if self.est_bck == 1 and start == 0:
+            # Column for the constant background
+            res[:, 0] = 1.0
+            first = 1
+        if smeared:
+            # All smeared columns share the slit quadrature grid
+            res[:, first-start:] = calc.ortho_transformed_smeared_matrix(
+                x_use, self.d_max, np.arange(first, stop)+offset,
+                self.slit_height, self.slit_width, self.smear_npts)
+        else:
+            for j in range(first, stop):
+                res[:, j-start] = calc.ortho_transformed(x_use, self.d_max, j+offset)
+        a_obj[q_accept_x, :] = res/err_use[:, None]
 
-        # Compute A
-        for j in range(nfunc):
-            if self.est_bck == 1 and j == 0:
-                res = 1.0
-            elif smeared:
-                res = calc.ortho_transformed_smeared(
-                    x_use, self.d_max, j+offset,
-                    self.slit_height, self.slit_width, smear_npts)
-            else:
-                res = calc.ortho_transformed(x_use, self.d_max, j+offset)
-            a_view[q_accept_x, j] = res/err_use
+        return a_obj
+
+    def _get_reg_matrix(self, nfunc, nr, sqrt_alpha=1.0):
+        """
+        Returns the regularization rows of the A matrix, the second
+        derivative of each base function at nr points, scaled by sqrt_alpha.
+
+        :param nfunc: number of base functions.
+        :param nr: number of r-points used when evaluating reg term.
+        :param sqrt_alpha: square root of the regularization constant.
+        """
+        a_obj = np.zeros([nr, nfunc])
+        offset = 0 if self.est_bck == 1 else 1
 
         for j in range(nfunc):
             i_r = np.arange(nr, dtype=np.float64)
@@ -584,12 +673,9 @@ class Pinvertor(object):
             res = ((2.0 * sqrt_alpha * self.d_max/nr * tmp)
                    * (2.0 * np.cos(tmp*r) + tmp * r * np.sin(tmp*r)))
             # Res should now be np vector size i_r.
-            a_obj[self.npoints:self.npoints+nr, j] = res
+            a_obj[:, j] = res
 
-        # Compute B
-        b_view[q_accept_x] = y_use / err_use
-
-        return a_obj, b_obj
+        return a_obj
 
     def _get_invcov_matrix(self, nfunc, nr, a_obj):
         """
@@ -17,6 +17,8 @@ from collections import defaultdict, OrderedDict
 from sas import get_user_dir
 
 USER_FILE = 'categories.json'
+#: sasmodels version and standard model names categories.json was built for
+MODEL_STAMP_FILE = 'categories_models.json'
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +119,37 @@ class CategoryInstaller(object):
     def get_default_file():
         logger.warning("CategoryInstaller.get_default_file is deprecated.")
 
+    @staticmethod
+    def get_model_stamp():
+        """
+        returns the sasmodels version and the names of the standard models,
+        found without loading the models
+        """
+        import sasmodels
+        from sasmodels.core import list_models
+        return {'sasmodels': sasmodels.__version__,
+                'models': sorted(list_models())}
+
+    @staticmethod
+    def is_current(homedir=None):
+        """
+        Returns True if categories.json exists and was built for the
+        current set of standard models, so check_install can be skipped.
+
+        :param homedir: Override the default home directory
+        """
+        if homedir is None:
+            homedir = get_user_dir()
+        stamp_file = os.path.join(homedir, MODEL_STAMP_FILE)
+        if not os.path.isfile(os.path.join(homedir, USER_FILE)):
+            return False
+        try:
+            with open(stamp_file) as fd:
+                stamp = json.load(fd)
+        except (OSError, IOError, ValueError):
+            return False
+        return stamp == CategoryInstaller.get_model_stamp()
+
     @staticmethod
     def check_install(homedir = None, model_list=None):
         """
@@ -180,3 +213,11 @@ class CategoryInstaller(object):
                                                           model_enabled_dict)
 
             json_dump(master_category_dict, serialized_file)
+
+        # Only record the model set if all the standard models are listed,
+        # so a model that failed to load is looked for again next time.
+        stamp = CategoryInstaller.get_model_stamp()
+        if set(stamp['models']).issubset(_model_dict):
+            stamp_file = os.path.join(os.path.dirname(serialized_file),
+                                      MODEL_STAMP_FILE)
+            json_dump(stamp, stamp_file)
@@ -27,8 +27,6 @@ import copy
 import wx
 import wx.aui
 
-from matplotlib import _pylab_helpers
-
 from sas import get_local_config, get_custom_config, get_app_dir, get_user_dir
 from sas.sasgui.guiframe.events import EVT_CATEGORY
 from sas.sasgui.guiframe.events import EVT_STATUS
@@ -43,11 +41,9 @@ from sas.sasgui.guiframe.gui_style import GUIFRAME_ID
 from sas.sasgui.guiframe.data_panel import DataPanel
 from sas.sasgui.guiframe.panel_base import PanelBase
 from sas.sasgui.guiframe.gui_toolbar import GUIToolBar
-from sas.sasgui.guiframe.data_processor import GridFrame
 from sas.sasgui.guiframe.events import EVT_NEW_BATCH
 from sas.sasgui.guiframe.CategoryManager import CategoryManager
 from sas.sascalc.dataloader.loader import Loader
-from sas.sascalc.file_converter.nxcansas_writer import NXcanSASWriter
 from sas.sasgui.guiframe.proxy import Connection
 
 logger = logging.getLogger(__name__)
@@ -93,6 +89,7 @@ WELCOME_PANEL_SHOW = (custom_value('WELCOME_PANEL_SHOW', False)
 TOOLBAR_SHOW = custom_value('TOOLBAR_SHOW', True)
 DEFAULT_PERSPECTIVE = custom_value('DEFAULT_PERSPECTIVE', 'Fitting')
 SAS_OPENCL = custom_value('SAS_OPENCL', 'None')
+FIT_WORKERS = custom_value('FIT_WORKERS', 1)
 
 DEFAULT_STYLE = config.DEFAULT_STYLE
 PLUGIN_STATE_EXTENSIONS = config.PLUGIN_STATE_EXTENSIONS
@@ -231,8 +228,8 @@ class ViewerFrame(PARENT_FRAME):
         self.schedule_full_draw_list = []
         self.idletimer = wx.CallLater(TIME_FACTOR, self._onDrawIdle)
 
-        self.batch_frame = GridFrame(parent=self)
-        self.batch_frame.Hide()
+        # the batch grid frame is created when it is first shown
+        self._batch_frame = None
         self.on_batch_selection(event=None)
         self.add_icon()
 
@@ -762,7 +759,9 @@ class ViewerFrame(PARENT_FRAME):
         is_loaded = False
         for item in self.plugins:
             item.set_batch_selection(self.batch_on)
-            if plugin.__class__ == item.__class__:
+            # Stubs of perspectives not imported yet share their class
+            if (plugin.__class__ == item.__class__
+                    and plugin.sub_menu == item.sub_menu):
                 msg = "Plugin %s already loaded" % plugin.sub_menu
                 logger.info(msg)
                 is_loaded = True
@@ -939,6 +938,35 @@ class ViewerFrame(PARENT_FRAME):
             win.SetPosition((0, mac_pos_y + size_t_bar))
         win.Show(is_visible)
         # Add the panels to the AUI manager
+        self._add_panels(panels)
+
+        if not IS_WIN:
+            win_height = mac_pos_y
+            if IS_LINUX:
+                if wx.VERSION_STRING >= '3.0.0.0':
+                    win_height = mac_pos_y + 10
+                else:
+                    win_height = mac_pos_y + 55
+                self.SetMaxSize((-1, win_height))
+            else:
+                self.SetSize((self._window_width, win_height))
+
+    def _add_panels(self, panels):
+        """
+        Add the panels of the plug-ins to the AUI manager, next to the
+        data panel
+        """
+        if wx.VERSION_STRING >= '3.0.0.0':
+            mac_pos_y = 85
+        else:
+            mac_pos_y = 40
+        size_t_bar = 70
+        if IS_LINUX:
+            size_t_bar = 115
+        d_panel_width, _ = self._get_panels_size(self._data_panel)
+        is_visible = self.__gui_style & \
+                     GUIFRAME.MANAGER_ON == GUIFRAME.MANAGER_ON
+        w, h = self._get_panels_size(self.defaultPanel)
         for panel_class in panels:
             frame = panel_class.get_frame()
             wx_id = wx.NewId()
@@ -963,16 +991,14 @@ class ViewerFrame(PARENT_FRAME):
             else:
                 frame.SetPosition((d_panel_width + 1, mac_pos_y + size_t_bar))
 
-        if not IS_WIN:
-            win_height = mac_pos_y
-            if IS_LINUX:
-                if wx.VERSION_STRING >= '3.0.0.0':
-                    win_height = mac_pos_y + 10
-                else:
-                    win_height = mac_pos_y + 55
-                self.SetMaxSize((-1, win_height))
-            else:
-                self.SetSize((self._window_width, win_height))
+    def load_perspective(self, plugin):
+        """
+        Add a perspective imported after the GUI was built, see
+        PerspectiveStub: its panels are added and its post_init is called
+        as build_gui does for the others.
+        """
+        self._add_panels(plugin.get_panels(self))
+        plugin.post_init()
 
     def update_data(self, prev_data, new_data):
         """
@@ -1359,6 +1385,17 @@ class ViewerFrame(PARENT_FRAME):
 
         self._menubar.Append(self._view_menu, '&View')
 
+    @property
+    def batch_frame(self):
+        """
+        The batch grid frame, created on first use
+        """
+        if self._batch_frame is None:
+            from sas.sasgui.guiframe.data_processor import GridFrame
+            self._batch_frame = GridFrame(parent=self)
+            self._batch_frame.Hide()
+        return self._batch_frame
+
     def show_batch_frame(self, event=None):
         """
         show the grid of result
@@ -2009,6 +2046,7 @@ class ViewerFrame(PARENT_FRAME):
         """
         flag = self.quit_guiframe()
         if flag:
+            from matplotlib import _pylab_helpers
             _pylab_helpers.Gcf.figs = {}
             self.Close()
 
@@ -2441,6 +2479,8 @@ class ViewerFrame(PARENT_FRAME):
                 loader = Loader()
                 loader.save(fName, data, ext_format)
             elif os.path.splitext(mypath)[1].lower() == options[2]:
+                from sas.sascalc.file_converter.nxcansas_writer \
+                    import NXcanSASWriter
                 nxcansaswriter = NXcanSASWriter()
                 nxcansaswriter.write([data], fName)
             try:
@@ -2582,6 +2622,8 @@ class ViewerFrame(PARENT_FRAME):
                 # Make sure the ext included in the file name
                 # especially on MAC
                 fileName = os.path.splitext(path)[0] + ext_format
+                from sas.sascalc.file_converter.nxcansas_writer \
+                    import NXcanSASWriter
                 nxcansaswriter = NXcanSASWriter()
                 nxcansaswriter.write([data], fileName)
             try:
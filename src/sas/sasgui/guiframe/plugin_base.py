@@ -283,3 +283,170 @@ class PluginBase(object):
         update state
         """
 
+
+
+class PerspectiveStub(PluginBase):
+    """
+    Stand-in for a perspective whose module is imported on first use.
+
+    Until then the stub lists the perspective in the Analysis menu and
+    the data panel, and takes the saved analyses with its extension.  The
+    first time the perspective is activated, is sent data, or opens a
+    saved analysis, *loader* is called to import and create the plug-in.
+    The stub then passes every call on to it, and asks the frame to add
+    its panels with load_perspective.  Perspectives which only add tools
+    are loaded when the Tools menu is built.
+    """
+
+    def __init__(self, name, loader, extension='', tools=False):
+        """
+        :param name: name of the plug-in, as shown in the Analysis menu
+        :param loader: function returning the plug-in, or None if it
+            cannot be created
+        :param extension: extension of the saved analyses of the plug-in
+        :param tools: True if the plug-in only adds entries to the Tools
+            menu
+        """
+        self.plugin = None
+        self._loader = loader
+        self._loaded = False
+        self._tools = tools
+        PluginBase.__init__(self, name=name)
+        self._extensions = extension
+
+    def __getattr__(self, name):
+        # Attributes of the plug-in which PluginBase doesn't have
+        plugin = self.__dict__.get('plugin')
+        if plugin is None:
+            raise AttributeError(name)
+        return getattr(plugin, name)
+
+    def load(self):
+        """
+        Import and create the plug-in the first time it is needed
+
+        :return: the plug-in, or None if it could not be created
+        """
+        if not self._loaded:
+            self._loaded = True
+            self.plugin = self._loader()
+            if self.plugin is not None:
+                self.plugin.set_batch_selection(self.batch_on)
+                # Before build_gui the frame asks for the panels itself
+                if self.parent is not None:
+                    self.parent.load_perspective(self.plugin)
+        return self.plugin
+
+    def read(self, path):
+        """
+        Read a saved analysis with the reader of the plug-in
+        """
+        plugin = self.load()
+        if plugin is not None:
+            reader, _ = plugin.get_extensions()
+            if reader is not None:
+                reader.read(path)
+
+    def get_batch_capable(self):
+        if self.plugin is None:
+            return False
+        return self.plugin.get_batch_capable()
+
+    def add_color(self, color, id):
+        if self.plugin is not None:
+            self.plugin.add_color(color, id)
+
+    def clear_panel(self):
+        if self.plugin is not None:
+            self.plugin.clear_panel()
+
+    def get_extensions(self):
+        if self.plugin is not None:
+            return self.plugin.get_extensions()
+        if self._extensions and not self._loaded:
+            return self, self._extensions
+        return None, ''
+
+    def use_data(self):
+        if self.plugin is None:
+            return True
+        return self.plugin.use_data()
+
+    def is_in_use(self, data_id):
+        if self.plugin is None:
+            return []
+        return self.plugin.is_in_use(data_id)
+
+    def delete_data(self, data_id):
+        if self.plugin is not None:
+            self.plugin.delete_data(data_id)
+
+    def populate_file_menu(self):
+        if self.plugin is None:
+            return []
+        return self.plugin.populate_file_menu()
+
+    def populate_menu(self, parent):
+        if self.plugin is None:
+            return []
+        return self.plugin.populate_menu(parent)
+
+    def get_frame(self):
+        if self.plugin is None:
+            return None
+        return self.plugin.get_frame()
+
+    def get_panels(self, parent):
+        self.parent = parent
+        if self.plugin is None:
+            return []
+        return self.plugin.get_panels(parent)
+
+    def get_tools(self):
+        plugin = self.load() if self._tools else self.plugin
+        if plugin is None:
+            return []
+        return plugin.get_tools()
+
+    def get_context_menu(self, plotpanel=None):
+        if self.plugin is None:
+            return []
+        return self.plugin.get_context_menu(plotpanel=plotpanel)
+
+    def get_perspective(self):
+        if self.plugin is not None:
+            return self.plugin.get_perspective()
+        if self._tools or self._loaded:
+            return []
+        # A name to list the perspective by until its panels exist
+        return [self.sub_menu]
+
+    def on_perspective(self, event=None):
+        plugin = self.load()
+        if plugin is not None:
+            plugin.on_perspective(event=event)
+
+    def set_batch_selection(self, flag):
+        self.batch_on = flag
+        if self.plugin is not None:
+            self.plugin.set_batch_selection(flag)
+
+    def post_init(self):
+        if self.plugin is not None:
+            self.plugin.post_init()
+
+    def set_state(self, state=None, datainfo=None):
+        plugin = self.load()
+        if plugin is not None:
+            plugin.set_state(state=state, datainfo=datainfo)
+
+    def set_data(self, data_list=None):
+        plugin = self.load()
+        if plugin is not None:
+            plugin.set_data(data_list)
+
+    def set_theory(self, theory_list=None):
+        plugin = self.load()
+        if plugin is None:
+            return PluginBase.set_theory(self, theory_list)
+        plugin.set_theory(theory_list)
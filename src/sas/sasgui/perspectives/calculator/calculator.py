@@ -16,18 +16,8 @@ import logging
 import wx
 
 from sas.sasgui.guiframe.plugin_base import PluginBase
-from sas.sasgui.perspectives.calculator.data_operator import DataOperatorWindow
-from sas.sasgui.perspectives.calculator.data_editor import DataEditorWindow
-from sas.sasgui.perspectives.calculator.kiessig_calculator_panel import KiessigWindow
-from sas.sasgui.perspectives.calculator.sld_panel import SldWindow
-from sas.sasgui.perspectives.calculator.density_panel import DensityWindow
-from sas.sasgui.perspectives.calculator.slit_length_calculator_panel \
-            import SlitLengthCalculatorWindow
-from sas.sasgui.perspectives.calculator.resolution_calculator_panel \
-            import ResolutionWindow
-from sas.sasgui.perspectives.calculator.gen_scatter_panel import SasGenWindow
-from sas.sasgui.perspectives.calculator.image_viewer import ImageView
-from sas.sasgui.perspectives.calculator.pyconsole import PyConsole
+# The calculator windows are imported when they are first opened, so that
+# the Tools menu can be built without them.
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +86,8 @@ class Plugin(PluginBase):
         Edit meta data
         """
         if self.data_edit_frame is None:
+            from sas.sasgui.perspectives.calculator.data_editor \
+                import DataEditorWindow
             self.data_edit_frame = DataEditorWindow(parent=self.parent,
                                                     manager=self, data=[],
                                                     title="Data Editor")
@@ -110,6 +102,8 @@ class Plugin(PluginBase):
         """
         if self.data_operator_frame is None:
             # Use one frame all the time
+            from sas.sasgui.perspectives.calculator.data_operator \
+                import DataOperatorWindow
             self.data_operator_frame = DataOperatorWindow(parent=self.parent,
                                                 manager=self,
                                                 title="Data Operation")
@@ -124,6 +118,8 @@ class Plugin(PluginBase):
         Compute the Kiessig thickness
         """
         if self.kiessig_frame is None:
+            from sas.sasgui.perspectives.calculator.kiessig_calculator_panel \
+                import KiessigWindow
             frame = KiessigWindow(parent=self.parent, manager=self)
             self.put_icon(frame)
             self.kiessig_frame = frame
@@ -136,6 +132,7 @@ class Plugin(PluginBase):
         Compute the scattering length density of molecula
         """
         if self.sld_frame is None:
+            from sas.sasgui.perspectives.calculator.sld_panel import SldWindow
             frame = SldWindow(parent=self.parent,
                                   base=self.parent, manager=self)
             self.put_icon(frame)
@@ -149,6 +146,8 @@ class Plugin(PluginBase):
         Compute the mass density or molar voulme
         """
         if self.cal_md_frame is None:
+            from sas.sasgui.perspectives.calculator.density_panel \
+                import DensityWindow
             frame = DensityWindow(parent=self.parent,
                                   base=self.parent, manager=self)
             self.put_icon(frame)
@@ -162,6 +161,8 @@ class Plugin(PluginBase):
         Compute the slit size a given data
         """
         if self.cal_slit_frame is None:
+            from sas.sasgui.perspectives.calculator.slit_length_calculator_panel \
+                import SlitLengthCalculatorWindow
             frame = SlitLengthCalculatorWindow(parent=self.parent, manager=self)
             self.put_icon(frame)
             self.cal_slit_frame = frame
@@ -174,6 +175,8 @@ class Plugin(PluginBase):
         Estimate the instrumental resolution
         """
         if self.cal_res_frame is None:
+            from sas.sasgui.perspectives.calculator.resolution_calculator_panel \
+                import ResolutionWindow
             frame = ResolutionWindow(parent=self.parent, manager=self)
             self.put_icon(frame)
             self.cal_res_frame = frame
@@ -186,6 +189,8 @@ class Plugin(PluginBase):
         On Generic model menu event
         """
         if self.gen_frame is None:
+            from sas.sasgui.perspectives.calculator.gen_scatter_panel \
+                import SasGenWindow
             frame = SasGenWindow(parent=self.parent, manager=self)
             self.put_icon(frame)
             self.gen_frame = frame
@@ -206,6 +211,7 @@ class Plugin(PluginBase):
 
         :param event: menu event
         """
+        from sas.sasgui.perspectives.calculator.image_viewer import ImageView
         self.image_view = ImageView(parent=self.parent)
         self.image_view.load()
 
@@ -224,6 +230,7 @@ class Plugin(PluginBase):
         :param filename: file name to open in editor
         """
         if self.py_frame is None:
+            from sas.sasgui.perspectives.calculator.pyconsole import PyConsole
             frame = PyConsole(parent=self.parent, base=self,
                               filename=filename)
             self.put_icon(frame)
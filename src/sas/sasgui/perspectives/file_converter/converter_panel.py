@@ -25,6 +25,7 @@ from sas.sascalc.file_converter.otoko_loader import OTOKOLoader
 from sas.sascalc.file_converter.bsl_loader import BSLLoader
 from sas.sascalc.file_converter.ascii2d_loader import ASCII2DLoader
 from sas.sascalc.file_converter.nxcansas_writer import NXcanSASWriter
+from sas.sascalc.file_converter.frame_stack import FrameStack
 from sas.sascalc.dataloader.data_info import Detector
 from sas.sascalc.dataloader.data_info import Sample
 from sas.sascalc.dataloader.data_info import Source
@@ -167,11 +168,12 @@ class ConverterPanel(ScrolledPanel, PanelBase):
         Extracts data from a 1D OTOKO file
 
         :param filename: The OTOKO file to load the data from
-        :return: A numpy array containing the extracted data
+        :return: The Q axis as a numpy array, and the intensity frames as a
+            FrameStack of views into the memory mapped data files
         """
         loader = OTOKOLoader(self.q_input.GetPath(),
             self.iq_input.GetPath())
-        otoko_data = loader.load_otoko_data()
+        otoko_data = loader.load_otoko_data(lazy=True)
         qdata = otoko_data.q_axis.data
         iqdata = otoko_data.data_axis.data
         if len(qdata) > 1:
@@ -181,7 +183,7 @@ class ConverterPanel(ScrolledPanel, PanelBase):
                 StatusEvent(status=msg, info="error"))
             return
         else:
-            qdata = qdata[0]
+            qdata = np.float64(qdata[0])
 
         return qdata, iqdata
 
@@ -190,9 +192,8 @@ class ConverterPanel(ScrolledPanel, PanelBase):
         Extracts data from a 2D BSL file
 
         :param filename: The header file to extract the data from
-        :return x_data: A 1D array containing all the x coordinates of the data
-        :return y_data: A 1D array containing all the y coordinates of the data
-        :return frame_data: A dictionary of the form *{frame_number: data}*, where data is a 2D numpy array containing the intensity data
+        :return: A generator of Data2D objects, one per selected frame, each
+            read from the file when it is needed
         """
         loader = BSLLoader(filename)
         frames = [0]
@@ -226,9 +227,7 @@ class ConverterPanel(ScrolledPanel, PanelBase):
         if not should_continue:
             return None
 
-        frame_data = loader.load_frames(frames)
-
-        return frame_data
+        return loader.iter_frames(frames)
 
     def ask_frame_range(self, n_frames):
         """
@@ -304,6 +303,25 @@ class ConverterPanel(ScrolledPanel, PanelBase):
 
         return metadata
 
+    def write_nxcansas(self, dataset, output_path, metadata):
+        """
+        Writes Data1D or Data2D objects to an NXcanSAS file one at a time,
+        as they are produced, so that only one frame is held in memory.
+
+        :param dataset: An iterable of Data1D or Data2D objects
+        :param output_path: Where to save the NXcanSAS file
+        :param metadata: Metadata to set on the first data object, which is
+            written as the SASentry metadata
+        """
+        dataset = iter(dataset)
+        first = next(dataset)
+        for key, value in metadata.items():
+            setattr(first, key, value)
+        with NXcanSASWriter().open(output_path, first) as writer:
+            writer.append(first)
+            for data in dataset:
+                writer.append(data)
+
     def convert_1d_data(self, qdata, iqdata):
         """
         Formats a 1D array of q_axis data and a 2D array of I axis data (where
@@ -312,7 +330,7 @@ class ConverterPanel(ScrolledPanel, PanelBase):
         frames = []
         increment = 1
         single_file = True
-        n_frames = iqdata.shape[0]
+        n_frames = len(iqdata)
         # Standard file has 3 frames: SAS, calibration and WAS
         if n_frames > 3:
             # File has multiple frames - ask the user which ones they want to
@@ -328,9 +346,23 @@ class ConverterPanel(ScrolledPanel, PanelBase):
         output_path = self.output.GetPath()
         metadata = self.get_metadata()
 
+        def make_frame(i):
+            y = iqdata[i]
+            if isinstance(iqdata, FrameStack):
+                # Copy the mapped frame, stored in the file byte order
+                y = np.float64(y)
+            return Data1D(x=qdata, y=y)
+
+        _, ext = os.path.splitext(output_path)
+        if ext != '.xml': # ext == '.h5'
+            # Stream the frames into the file, one frame at a time
+            self.write_nxcansas((make_frame(i) for i in frames),
+                                output_path, metadata)
+            return
+
         frame_data = {}
         for i in frames:
-            data = Data1D(x=qdata, y=iqdata[i])
+            data = make_frame(i)
             frame_data[i] = data
         if single_file:
             # Only need to set metadata on first Data1D object
@@ -345,20 +377,11 @@ class ConverterPanel(ScrolledPanel, PanelBase):
                 for key, value in metadata.items():
                     setattr(datainfo, key, value)
 
-        _, ext = os.path.splitext(output_path)
-        if ext == '.xml':
-            self.convert_to_cansas(frame_data, output_path, single_file)
-        else: # ext == '.h5'
-            w = NXcanSASWriter()
-            w.write(frame_data, output_path)
+        self.convert_to_cansas(frame_data, output_path, single_file)
 
     def convert_2d_data(self, dataset):
-        metadata = self.get_metadata()
-        for key, value in metadata.items():
-            setattr(dataset[0], key, value)
-
-        w = NXcanSASWriter()
-        w.write(dataset, self.output.GetPath())
+        self.write_nxcansas(dataset, self.output.GetPath(),
+                            self.get_metadata())
 
     def on_convert(self, event):
         """Called when the Convert button is clicked"""
@@ -4,7 +4,6 @@ File Converter Plugin
 
 import logging
 from sas.sasgui.guiframe.plugin_base import PluginBase
-from sas.sasgui.perspectives.file_converter.converter_panel import ConverterWindow
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +28,8 @@ class Plugin(PluginBase):
 
     def on_file_converter(self, event):
         if self.converter_frame is None:
+            from sas.sasgui.perspectives.file_converter.converter_panel \
+                import ConverterWindow
             frame = ConverterWindow(parent=self.parent, base=self.parent,
                 manager=self)
             self.put_icon(frame)
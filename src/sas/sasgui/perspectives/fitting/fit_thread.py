@@ -2,6 +2,7 @@
 import sys
 import time
 from sas.sascalc.data_util.calcthread import CalcThread
+from sas.sascalc.fit.parallel import fit_parallel
 
 def map_getattr(classInstance, classFunc, *args):
     """
@@ -28,7 +29,8 @@ class FitThread(CalcThread):
                  updatefn=None,
                  yieldtime=0.03,
                  worktime=0.03,
-                 reset_flag=False):
+                 reset_flag=False,
+                 nworkers=1):
         CalcThread.__init__(self, completefn, updatefn, yieldtime, worktime)
         self.handler = handler
         self.fitter = fn
@@ -40,6 +42,9 @@ class FitThread(CalcThread):
         self.updatefn = updatefn
         #Relative error desired in the sum of squares.
         self.reset_flag = reset_flag
+        # Number of worker processes used when there are several
+        # independent fit problems; 1 runs them in this thread.
+        self.nworkers = nworkers
 
     def isquit(self):
         """
@@ -52,31 +57,47 @@ class FitThread(CalcThread):
             msg = "Fitting: terminated by the user."
             raise KeyboardInterrupt(msg)
 
+    def _compute_parallel(self):
+        """
+        Run each fitter in a pool of worker processes.
+
+        The fits run without handler or thread in the workers; progress
+        is reported through the handler as each fit completes, and
+        isquit() is polled while waiting so that a stop request
+        terminates the pool.  Results are returned in the order of
+        self.fitter.  Returns None if worker processes cannot be forked.
+        """
+        return fit_parallel(self.fitter, self.nworkers,
+                            reset_flag=self.reset_flag, handler=self.handler,
+                            isquit=self.isquit, yieldtime=self.yieldtime)
+
     def compute(self):
         """
         Perform a fit
         """
         msg = ""
         try:
-            import copy
-            list_handler = []
-            list_curr_thread = []
-            list_reset_flag = []
-            list_map_get_attr = []
-            list_fit_function = []
-            list_q = []
-            for i in range(len(self.fitter)):
-                list_handler.append(self.handler)
-                list_q.append(None)
-                list_curr_thread.append(self)
-                list_reset_flag.append(self.reset_flag)
-                list_fit_function.append('fit')
-                list_map_get_attr.append(map_getattr)
-            #from multiprocessing import Pool
-            inputs = zip(list_map_get_attr, self.fitter, list_fit_function,
-                         list_q, list_q, list_handler, list_curr_thread,
-                         list_reset_flag)
-            result = list(map(map_apply, inputs))
+            result = None
+            if self.nworkers > 1 and len(self.fitter) > 1:
+                result = self._compute_parallel()
+            if result is None:
+                list_handler = []
+                list_curr_thread = []
+                list_reset_flag = []
+                list_map_get_attr = []
+                list_fit_function = []
+                list_q = []
+                for i in range(len(self.fitter)):
+                    list_handler.append(self.handler)
+                    list_q.append(None)
+                    list_curr_thread.append(self)
+                    list_reset_flag.append(self.reset_flag)
+                    list_fit_function.append('fit')
+                    list_map_get_attr.append(map_getattr)
+                inputs = zip(list_map_get_attr, self.fitter, list_fit_function,
+                             list_q, list_q, list_handler, list_curr_thread,
+                             list_reset_flag)
+                result = list(map(map_apply, inputs))
 
             self.complete(result=result,
                           batch_inputs=self.batch_inputs,
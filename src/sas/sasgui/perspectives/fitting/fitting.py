@@ -34,6 +34,7 @@ from sas.sascalc.dataloader.loader import Loader
 from sas.sascalc.fit.BumpsFitting import BumpsFit as Fit
 from sas.sascalc.fit.pagestate import Reader, PageState, SimFitPageState
 from sas.sascalc.fit import models
+from sas.sascalc.fit.parallel import default_workers
 
 from sas.sasgui.guiframe.dataFitting import Data2D
 from sas.sasgui.guiframe.dataFitting import Data1D
@@ -45,7 +46,7 @@ from sas.sasgui.guiframe.events import EVT_SLICER_PARS_UPDATE
 from sas.sasgui.guiframe.gui_style import GUIFRAME_ID
 from sas.sasgui.guiframe.plugin_base import PluginBase
 from sas.sasgui.guiframe.data_processor import BatchCell
-from sas.sasgui.guiframe.gui_manager import MDIFrame
+from sas.sasgui.guiframe.gui_manager import MDIFrame, FIT_WORKERS
 from sas.sasgui.guiframe.documentation_window import DocumentationWindow
 
 from sas.sasgui.perspectives.calculator.model_editor import TextDialog
@@ -102,6 +103,8 @@ class Plugin(PluginBase):
         self.closed_page_dict = {}
         ## Relative error desired in the sum of squares (float)
         self.batch_reset_flag = True
+        ## Number of worker processes for batch fits
+        self.batch_workers = default_workers(FIT_WORKERS)
         #List of selected data
         self.selected_data_list = []
         ## list of slicer panel created to display slicer parameters and results
@@ -1102,6 +1105,9 @@ class Plugin(PluginBase):
         else:
             page = self.fit_panel.get_page_by_id(uid)
         if page.batch_on:
+            # Chain fitting starts each fit from the result of the previous
+            # one, so only independent batch fits can run in parallel.
+            nworkers = self.batch_workers if self.batch_reset_flag else 1
             calc_fit = FitThread(handler=handler,
                                  fn=fitter_list,
                                  pars=pars,
@@ -1109,7 +1115,8 @@ class Plugin(PluginBase):
                                  batch_outputs=batch_outputs,
                                  page_id=list_page_id,
                                  completefn=self._batch_fit_complete,
-                                 reset_flag=self.batch_reset_flag)
+                                 reset_flag=self.batch_reset_flag,
+                                 nworkers=nworkers)
         else:
             ## Perform more than 1 fit at the time
             calc_fit = FitThread(handler=handler,
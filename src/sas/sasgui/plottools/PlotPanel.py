@@ -26,6 +26,9 @@ import pylab
 DEFAULT_CMAP = pylab.cm.jet
 
 from sas.sasgui.guiframe.events import StatusEvent
+from sas.sascalc.dataloader.manipulations import (get_image_bins,
+                                                  rebin_to_image,
+                                                  fill_image_holes)
 
 #TODO: make the plottables interactive
 from . import transform
@@ -1542,31 +1545,13 @@ class PlotPanel(wx.Panel):
         max_loop = 1
         # get the x and y_bin arrays.
         self._get_bins()
-        # set zero to None
 
         #Note: Can not use scipy.interpolate.Rbf:
         # 'cause too many data points (>10000)<=JHC.
-        # 1d array to use for weighting the data point averaging
-        #when they fall into a same bin.
-        weights_data = np.ones([self.data.size])
-        # get histogram of ones w/len(data); this will provide
-        #the weights of data on each bins
-        weights, xedges, yedges = np.histogram2d(x=self.qy_data,
-                                                    y=self.qx_data,
-                                                    bins=[self.y_bins, self.x_bins],
-                                                    weights=weights_data)
-        # get histogram of data, all points into a bin in a way of summing
-        image, xedges, yedges = np.histogram2d(x=self.qy_data,
-                                                  y=self.qx_data,
-                                                  bins=[self.y_bins, self.x_bins],
-                                                  weights=self.data)
-        # Now, normalize the image by weights only for weights>1:
-        # If weight == 1, there is only one data point in the bin so
-        # that no normalization is required.
-        image[weights > 1] = image[weights > 1] / weights[weights > 1]
-        # Set image bins w/o a data point (weight==0) as None (was set to zero
-        # by histogram2d.)
-        image[weights == 0] = None
+        # Average the data points falling into a same bin, with the bins
+        # w/o a data point (weight==0) set to None.
+        image, weights = rebin_to_image(self.qx_data, self.qy_data, self.data,
+                                        self.x_bins, self.y_bins)
 
         # Fill empty bins with 8 nearest neighbors only when at least
         #one None point exists
@@ -1597,38 +1582,7 @@ class PlotPanel(wx.Panel):
             # do we need deepcopy here?
             return copy.deepcopy(self.data)
 
-        # find max and min values of qx and qy
-        xmax = self.qx_data.max()
-        xmin = self.qx_data.min()
-        ymax = self.qy_data.max()
-        ymin = self.qy_data.min()
-
-        # calculate the range of qx and qy: this way, it is a little
-        # more independent
-        x_size = xmax - xmin
-        y_size = ymax - ymin
-
-        # estimate the # of pixels on each axes
-        npix_y = int(math.floor(math.sqrt(len(self.qy_data))))
-        npix_x = int(math.floor(len(self.qy_data) / npix_y))
-
-        # bin size: x- & y-directions
-        xstep = x_size / (npix_x - 1)
-        ystep = y_size / (npix_y - 1)
-
-        # max and min taking account of the bin sizes
-        xmax = xmax + xstep / 2.0
-        xmin = xmin - xstep / 2.0
-        ymax = ymax + ystep / 2.0
-        ymin = ymin - ystep / 2.0
-
-        # store x and y bin centers in q space
-        x_bins = np.linspace(xmin, xmax, npix_x)
-        y_bins = np.linspace(ymin, ymax, npix_y)
-
-        #set x_bins and y_bins
-        self.x_bins = x_bins
-        self.y_bins = y_bins
+        self.x_bins, self.y_bins = get_image_bins(self.qx_data, self.qy_data)
 
     def _fillup_pixels(self, image=None, weights=None):
         """
@@ -1639,63 +1593,12 @@ class PlotPanel(wx.Panel):
 
         :return: image (2d array )
 
-        :TODO: Find better way to do for-loop below
-
         """
         # No image matrix given
         if (image is None or np.ndim(image) != 2
                 or np.isfinite(image).all() or weights is None):
             return image
-        # Get bin size in y and x directions
-        len_y = len(image)
-        len_x = len(image[1])
-        temp_image = np.zeros([len_y, len_x])
-        weit = np.zeros([len_y, len_x])
-        # do for-loop for all pixels
-        for n_y in range(len(image)):
-            for n_x in range(len(image[1])):
-                # find only null pixels
-                if weights[n_y][n_x] > 0 or np.isfinite(image[n_y][n_x]):
-                    continue
-                else:
-                    # find 4 nearest neighbors
-                    # check where or not it is at the corner
-                    if n_y != 0 and np.isfinite(image[n_y - 1][n_x]):
-                        temp_image[n_y][n_x] += image[n_y - 1][n_x]
-                        weit[n_y][n_x] += 1
-                    if n_x != 0 and np.isfinite(image[n_y][n_x - 1]):
-                        temp_image[n_y][n_x] += image[n_y][n_x - 1]
-                        weit[n_y][n_x] += 1
-                    if n_y != len_y - 1 and np.isfinite(image[n_y + 1][n_x]):
-                        temp_image[n_y][n_x] += image[n_y + 1][n_x]
-                        weit[n_y][n_x] += 1
-                    if n_x != len_x - 1 and np.isfinite(image[n_y][n_x + 1]):
-                        temp_image[n_y][n_x] += image[n_y][n_x + 1]
-                        weit[n_y][n_x] += 1
-                    # go 4 next nearest neighbors when no non-zero
-                    # neighbor exists
-                    if (n_y != 0 and n_x != 0
-                            and np.isfinite(image[n_y - 1][n_x - 1])):
-                        temp_image[n_y][n_x] += image[n_y - 1][n_x - 1]
-                        weit[n_y][n_x] += 1
-                    if (n_y != len_y - 1 and n_x != 0
-                            and np.isfinite(image[n_y + 1][n_x - 1])):
-                        temp_image[n_y][n_x] += image[n_y + 1][n_x - 1]
-                        weit[n_y][n_x] += 1
-                    if (n_y != len_y and n_x != len_x - 1
-                            and np.isfinite(image[n_y - 1][n_x + 1])):
-                        temp_image[n_y][n_x] += image[n_y - 1][n_x + 1]
-                        weit[n_y][n_x] += 1
-                    if (n_y != len_y - 1 and n_x != len_x - 1
-                            and np.isfinite(image[n_y + 1][n_x + 1])):
-                        temp_image[n_y][n_x] += image[n_y + 1][n_x + 1]
-                        weit[n_y][n_x] += 1
-
-        # get it normalized
-        ind = (weit > 0)
-        image[ind] = temp_image[ind] / weit[ind]
-
-        return image
+        return fill_image_holes(image, weights)
 
     def curve(self, x, y, dy=None, color=0, symbol=0, label=None):
         """Draw a line on a graph, possibly with confidence intervals."""
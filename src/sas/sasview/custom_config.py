@@ -15,3 +15,4 @@ WELCOME_PANEL_SHOW = False
 TOOLBAR_SHOW = True
 DEFAULT_PERSPECTIVE = "Fitting"
 SAS_OPENCL = "None"
+FIT_WORKERS = 1
@@ -152,6 +152,9 @@ WELCOME_PANEL_SHOW = False
 TOOLBAR_SHOW = True
 # set a default perspective
 DEFAULT_PERSPECTIVE = 'None'
+# Number of worker processes for batch fits (0 = one per CPU, 1 = serial);
+# the SAS_FIT_WORKERS environment variable overrides it
+FIT_WORKERS = 1
 
 # Time out for updating sasview
 UPDATE_TIMEOUT = 2
@@ -16,6 +16,8 @@ import os.path
 import sys
 import traceback
 import logging
+import importlib
+from collections import OrderedDict
 
 try:
     reload(sys)
@@ -27,9 +29,30 @@ except NameError:
     pass
 
 import sas
+from sas.sasview import startup_timing
 
 APP_NAME = 'SasView'
 PLUGIN_MODEL_DIR = 'plugin_models'
+#: perspectives added to the application, by the name shown in the
+#: Analysis menu, with their module.  Only the default perspective is
+#: imported at startup, see SasView.get_perspective_stub.
+PERSPECTIVES = OrderedDict([
+    ('Fitting', 'sas.sasgui.perspectives.fitting'),
+    ('Pr Inversion', 'sas.sasgui.perspectives.pr'),
+    ('Invariant', 'sas.sasgui.perspectives.invariant'),
+    ('Correlation Function', 'sas.sasgui.perspectives.corfunc'),
+    ('Calculator', 'sas.sasgui.perspectives.calculator'),
+    ('File Converter', 'sas.sasgui.perspectives.file_converter'),
+])
+#: extension of the saved analyses of each perspective
+PERSPECTIVE_EXTENSIONS = {
+    'Fitting': '.fitv',
+    'Pr Inversion': '.prv',
+    'Invariant': '.inv',
+    'Correlation Function': '.crf',
+}
+#: perspectives which only add entries to the Tools menu
+TOOL_PERSPECTIVES = ('Calculator', 'File Converter')
 
 class SasView(object):
     """
@@ -38,10 +61,12 @@ class SasView(object):
     def __init__(self):
         """
         """
-        logger = logging.getLogger(__name__)
-
-        from sas.sasgui.guiframe.gui_manager import SasViewApp
-        from sas.sasgui.guiframe.gui_style import GUIFRAME_ICON
+        #: loaded perspective plug-ins by name, see get_perspective
+        self.perspectives = {}
+        with startup_timing.phase("import gui_manager"):
+            from sas.sasgui.guiframe.gui_manager import (
+                SasViewApp, DEFAULT_PERSPECTIVE)
+            from sas.sasgui.guiframe.gui_style import GUIFRAME_ICON
         self.gui = SasViewApp(0)
         GUIFRAME_ICON.load_icons()
         if sys.platform == "darwin":
@@ -52,87 +77,88 @@ class SasView(object):
         # Additional perspectives can still be loaded
         # dynamically
         # Note: py2exe can't find dynamically loaded
-        # modules. We load the fitting module here
-        # to ensure a complete Windows executable build.
-
-        # Rebuild .sasview/categories.json.  This triggers a load of sasmodels
-        # and all the plugins.
-        try:
-            from sas.sascalc.fit.models import ModelManager
-            from sas.sasgui.guiframe.CategoryInstaller import CategoryInstaller
-            model_list = ModelManager().cat_model_list()
-            CategoryInstaller.check_install(model_list=model_list)
-        except Exception:
-            logger.error("%s: could not load SasView models")
-            logger.error(traceback.format_exc())
-
-        # Fitting perspective
-        try:
-            import sas.sasgui.perspectives.fitting as module
-            fitting_plug = module.Plugin()
-            self.gui.add_perspective(fitting_plug)
-        except Exception:
-            logger.error("%s: could not find Fitting plug-in module", APP_NAME)
-            logger.error(traceback.format_exc())
-
-        # P(r) perspective
-        try:
-            import sas.sasgui.perspectives.pr as module
-            pr_plug = module.Plugin()
-            self.gui.add_perspective(pr_plug)
-        except Exception:
-            logger.error("%s: could not find P(r) plug-in module", APP_NAME)
-            logger.error(traceback.format_exc())
-
-        # Invariant perspective
-        try:
-            import sas.sasgui.perspectives.invariant as module
-            invariant_plug = module.Plugin()
-            self.gui.add_perspective(invariant_plug)
-        except Exception:
-            logger.error("%s: could not find Invariant plug-in module",
-                         APP_NAME)
-            logger.error(traceback.format_exc())
-
-        # Corfunc perspective
-        try:
-            import sas.sasgui.perspectives.corfunc as module
-            corfunc_plug = module.Plugin()
-            self.gui.add_perspective(corfunc_plug)
-        except Exception:
-            logger.error("Unable to load corfunc module")
-
-        # Calculator perspective
-        try:
-            import sas.sasgui.perspectives.calculator as module
-            calculator_plug = module.Plugin()
-            self.gui.add_perspective(calculator_plug)
-        except Exception:
-            logger.error("%s: could not find Calculator plug-in module",
-                         APP_NAME)
-            logger.error(traceback.format_exc())
-
-        # File converter tool
-        try:
-            import sas.sasgui.perspectives.file_converter as module
-            converter_plug = module.Plugin()
-            self.gui.add_perspective(converter_plug)
-        except Exception:
-            logger.error("%s: could not find File Converter plug-in module",
-                         APP_NAME)
-            logger.error(traceback.format_exc())
+        # modules. The PERSPECTIVES modules are listed in the
+        # installers to ensure a complete Windows executable build.
+
+        # Rebuild .sasview/categories.json if the standard models changed.
+        # This triggers a load of sasmodels and all the plugins.
+        with startup_timing.phase("categories"):
+            self.check_categories()
+
+        # Only the default perspective is created now; the others are
+        # imported the first time they are used.
+        for name in PERSPECTIVES:
+            if name == DEFAULT_PERSPECTIVE:
+                with startup_timing.phase("perspective %s" % name):
+                    plugin = self.get_perspective(name)
+            else:
+                plugin = self.get_perspective_stub(name)
+            if plugin is not None:
+                self.gui.add_perspective(plugin)
 
         # Add welcome page
         from .welcome_panel import WelcomePanel
         self.gui.set_welcome_panel(WelcomePanel)
 
         # Build the GUI
-        self.gui.build_gui()
+        with startup_timing.phase("build gui"):
+            self.gui.build_gui()
         # delete unused model folder
         self.gui.clean_plugin_models(PLUGIN_MODEL_DIR)
+        startup_timing.finish()
         # Start the main loop
         self.gui.MainLoop()
 
+    def check_categories(self):
+        """
+        Rebuild .sasview/categories.json unless it was built for the
+        current set of standard models
+        """
+        logger = logging.getLogger(__name__)
+        try:
+            from sas.sasgui.guiframe.CategoryInstaller import CategoryInstaller
+            if CategoryInstaller.is_current():
+                logger.info("Model categories are up to date")
+                return
+            from sas.sascalc.fit.models import ModelManager
+            model_list = ModelManager().cat_model_list()
+            CategoryInstaller.check_install(model_list=model_list)
+        except Exception:
+            logger.error("%s: could not load SasView models", APP_NAME)
+            logger.error(traceback.format_exc())
+
+    def get_perspective(self, name):
+        """
+        Return the plug-in of a perspective listed in PERSPECTIVES, creating
+        it the first time it is requested
+
+        :param name: perspective name, a key of PERSPECTIVES
+        :return: the plug-in, or None if it could not be loaded
+        """
+        if name not in self.perspectives:
+            logger = logging.getLogger(__name__)
+            try:
+                module = importlib.import_module(PERSPECTIVES[name])
+                self.perspectives[name] = module.Plugin()
+            except Exception:
+                logger.error("%s: could not find %s plug-in module",
+                             APP_NAME, name)
+                logger.error(traceback.format_exc())
+                self.perspectives[name] = None
+        return self.perspectives[name]
+
+    def get_perspective_stub(self, name):
+        """
+        Return a stub standing in for a perspective listed in PERSPECTIVES
+        until it is first used, see PerspectiveStub
+
+        :param name: perspective name, a key of PERSPECTIVES
+        """
+        from sas.sasgui.guiframe.plugin_base import PerspectiveStub
+        return PerspectiveStub(name, lambda: self.get_perspective(name),
+                               extension=PERSPECTIVE_EXTENSIONS.get(name, ''),
+                               tools=name in TOOL_PERSPECTIVES)
+
     def check_sasmodels_compiler(self):
         """
         Checking c compiler for sasmodels and raises xcode command line
@@ -278,10 +304,13 @@ def run_gui():
     """
     from multiprocessing import freeze_support
     freeze_support()
+    startup_timing.start()
     setup_logging()
-    setup_mpl(backend='WXAgg')
+    with startup_timing.phase("setup matplotlib"):
+        setup_mpl(backend='WXAgg')
     setup_sasmodels()
-    setup_wx()
+    with startup_timing.phase("setup wx"):
+        setup_wx()
     SasView()
 
 
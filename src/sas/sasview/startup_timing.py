@@ -0,0 +1,155 @@
+"""
+Startup timing report for SasView.
+
+Set the environment variable SASVIEW_STARTUP_TIMING to 1 to log, at the end
+of startup, the time taken by each startup step and the modules which took
+longest to import.  The report is written to the SasView log at info level.
+"""
+import os
+import sys
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    import builtins
+except ImportError:  # CRUFT: python 2.7 support
+    import __builtin__ as builtins
+
+ENV_VAR = "SASVIEW_STARTUP_TIMING"
+
+logger = logging.getLogger(__name__)
+
+_TIMER = None
+
+
+class StartupTimer(object):
+    """
+    Record the time spent in startup steps and in importing each module
+
+    Imports are timed by replacing builtins.__import__ while the timer is
+    installed.  Only the first import of a module is timed.  The self time
+    of a module excludes the modules it imports; its total time includes
+    them.
+    """
+    def __init__(self):
+        self.start = time.time()
+        #: module name -> [self time, total time]
+        self.imports = {}
+        #: list of (step name, time)
+        self.phases = []
+        self._children = []
+        self._import = None
+
+    def install(self):
+        """
+        Start timing imports
+        """
+        if self._import is None:
+            self._import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        """
+        Stop timing imports
+        """
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(),
+                      level=0):
+        module_name = _absolute_name(name, globals, level)
+        if module_name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        start = time.time()
+        self._children.append(0.0)
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.time() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            entry = self.imports.setdefault(module_name, [0.0, 0.0])
+            entry[0] += elapsed - children
+            entry[1] += elapsed
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a startup step
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.time() - start))
+
+    def report(self, limit=25):
+        """
+        Return the startup steps and the slowest imports as text
+        """
+        lines = ["startup took %.3f s" % (time.time() - self.start)]
+        for name, elapsed in self.phases:
+            lines.append("  %-50s %8.3f s" % (name, elapsed))
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0],
+                         reverse=True)[:limit]
+        lines.append("%d modules imported in %.3f s; slowest (self, total):"
+                     % (len(self.imports),
+                        sum(entry[0] for entry in self.imports.values())))
+        for name, (self_time, total) in slowest:
+            lines.append("  %-50s %8.3f s %8.3f s" % (name, self_time, total))
+        return "\n".join(lines)
+
+
+def _absolute_name(name, globals, level):
+    """
+    Return the absolute module name of an import statement
+    """
+    if level <= 0 or not globals:
+        return name
+    package = globals.get('__package__')
+    if not package:
+        package = globals.get('__name__', '')
+        if '__path__' not in globals:
+            package = package.rpartition('.')[0]
+    if level > 1:
+        package = package.rsplit('.', level - 1)[0]
+    return package + '.' + name if name else package
+
+
+def start():
+    """
+    Start timing the startup if SASVIEW_STARTUP_TIMING is set
+
+    :return: the timer, or None if timing is off
+    """
+    global _TIMER
+    if _TIMER is None and os.environ.get(ENV_VAR, '0') not in ('', '0'):
+        _TIMER = StartupTimer()
+        _TIMER.install()
+    return _TIMER
+
+
+@contextmanager
+def phase(name):
+    """
+    Time a startup step if timing is on
+    """
+    if _TIMER is None:
+        yield
+    else:
+        with _TIMER.phase(name):
+            yield
+
+
+def finish():
+    """
+    Stop timing and log the report if timing is on
+    """
+    global _TIMER
+    if _TIMER is not None:
+        _TIMER.uninstall()
+        logger.info("SasView startup timing:\n%s", _TIMER.report())
+        _TIMER = None
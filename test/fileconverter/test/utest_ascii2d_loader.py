@@ -0,0 +1,62 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from sas.sascalc.file_converter.ascii2d_loader import ASCII2DLoader
+
+
+def write_file(path, qx, qy, intensity, error=None, per_line=6):
+    """Write an ISIS 2D ASCII file"""
+    def rows(values):
+        return [" ".join("%.6e" % v for v in values[i:i + per_line])
+                for i in range(0, len(values), per_line)]
+    lines = ["Test file", "Qx (1/A)", "Qy (1/A)", "I (1/cm)", "1",
+             "user content", str(len(qx))]
+    lines += rows(qx) + [str(len(qy))] + rows(qy)
+    iflag = "2" if error is None else "3"
+    lines += ["%d %d 1.0" % (len(qx), len(qy)), iflag]
+    lines += rows(intensity)
+    if error is not None:
+        lines += rows(error)
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class ascii2d_test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "data.txt")
+        self.qx = np.linspace(-0.1, 0.1, 13)
+        self.qy = np.linspace(-0.2, 0.2, 7)
+        self.intensity = np.arange(13 * 7, dtype=float)
+
+    def test_load(self):
+        write_file(self.path, self.qx, self.qy, self.intensity,
+                   0.5 * self.intensity)
+        data = ASCII2DLoader(self.path).load()
+        self.assertTrue(np.allclose(data.qx_data, np.tile(self.qx, 7)))
+        self.assertTrue(np.allclose(data.qy_data, np.repeat(self.qy, 13)))
+        self.assertTrue(np.array_equal(data.data, self.intensity))
+        self.assertTrue(np.array_equal(data.err_data, 0.5 * self.intensity))
+
+        write_file(self.path, self.qx, self.qy, self.intensity)
+        data = ASCII2DLoader(self.path).load()
+        self.assertTrue(np.array_equal(data.data, self.intensity))
+        self.assertTrue(np.all(data.err_data == 0))
+
+    def test_missing_points(self):
+        write_file(self.path, self.qx, self.qy, self.intensity,
+                   0.5 * self.intensity[:-1])
+        self.assertRaises(ValueError, ASCII2DLoader(self.path).load)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,3 +39,18 @@ class bsl_test(unittest.TestCase):
         q_test = np.allclose(i_data_array, i_data_load, atol=1e-13)
 
         self.assertTrue(q_test)
+
+    def test_frames(self):
+        # Frames are views into the mapped file
+        frame = self.i_reader[0]
+        self.assertEqual(len(self.i_reader), 1)
+        self.assertEqual(frame.dtype, np.dtype('<f4'))
+        self.assertEqual(len(frame), self.i_reader.n_pixels)
+        self.assertTrue(np.array_equal(frame, self.i_reader[-1]))
+        self.assertEqual(len(self.i_reader[0:5]), 1)
+        self.assertEqual(len(list(self.i_reader)), 1)
+        self.assertRaises(IndexError, lambda: self.i_reader[1])
+
+        [data2d] = self.i_reader.load_frames([0])
+        self.assertTrue(np.array_equal(data2d.data, frame))
+        self.assertEqual(len(data2d.qx_data), self.i_reader.n_pixels)
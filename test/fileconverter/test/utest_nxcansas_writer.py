@@ -1,11 +1,15 @@
 from sas.sascalc.file_converter.nxcansas_writer import NXcanSASWriter
 from sas.sascalc.dataloader.loader import Loader
+from sas.sascalc.dataloader.data_info import Data1D
 
 import os
 import os.path
 import unittest
 import warnings
 
+import h5py
+import numpy as np
+
 warnings.simplefilter("ignore")
 
 
@@ -22,6 +26,7 @@ class nxcansas_writer(unittest.TestCase):
         self.write_file_1d = find("export1d.h5")
         self.read_file_2d = find("exp18_14_igor_2dqxqy.dat")
         self.write_file_2d = find("export2d.h5")
+        self.write_file_frames = find("exportframes.h5")
 
         self.data_1d = self.loader.load(self.read_file_1d)[0]
 
@@ -49,6 +54,41 @@ class nxcansas_writer(unittest.TestCase):
         self.assertTrue(len(data.qy_data) == len(self.data_2d.qy_data))
         self._check_metadata(data, self.data_2d)
 
+    def test_write_frames(self):
+        q = np.linspace(0.001, 0.3, 200)
+        frames = [Data1D(x=q, y=np.exp(-i*q), dy=0.01*np.ones_like(q))
+                  for i in range(5)]
+        writer = NXcanSASWriter(compression='gzip', compression_opts=6)
+        with writer.open(self.write_file_frames, self.data_1d):
+            for frame in frames:
+                writer.append(frame)
+        self.assertRaises(RuntimeError, writer.append, frames[0])
+
+        with h5py.File(self.write_file_frames, 'r') as f:
+            node = f['sasentry01/sasdata05/I']
+            self.assertEqual(node.compression, 'gzip')
+            self.assertEqual(node.compression_opts, 6)
+            self.assertTrue(node.chunks is not None)
+        data = self.loader.load(self.write_file_frames)
+        self.assertEqual(len(data), 5)
+        for written in data:
+            index = int(round(-np.log(written.y[-1]) / written.x[-1]))
+            self.assertTrue(np.allclose(written.y, frames[index].y))
+            self.assertTrue(np.allclose(written.dy, 0.01))
+            self._check_metadata(written, self.data_1d)
+
+    def test_write_2d_lzf(self):
+        self.data_2d.err_data = np.full(self.data_2d.data.shape, np.nan)
+        NXcanSASWriter(compression='lzf').write([self.data_2d],
+                                                self.write_file_2d)
+        with h5py.File(self.write_file_2d, 'r') as f:
+            entry = f['sasentry01/sasdata01']
+            self.assertEqual(entry['I'].compression, 'lzf')
+            self.assertFalse('Idev' in entry)
+        data = self.loader.load(self.write_file_2d)[0]
+        self.assertTrue(np.allclose(data.data, self.data_2d.data))
+        self.assertRaises(ValueError, NXcanSASWriter, compression='szip')
+
     def _check_metadata(self, written, correct):
         self.assertTrue(written.title == correct.title)
         self.assertTrue(written.sample.name == correct.sample.name)
@@ -68,3 +108,5 @@ class nxcansas_writer(unittest.TestCase):
             os.remove(self.write_file_1d)
         if os.path.isfile(self.write_file_2d):
             os.remove(self.write_file_2d)
+        if os.path.isfile(self.write_file_frames):
+            os.remove(self.write_file_frames)
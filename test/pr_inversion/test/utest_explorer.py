@@ -39,6 +39,26 @@ class TestExplorer(unittest.TestCase):
         results = self.explo(120, 200, 25)
         self.assertEqual(len(results.errors), 0)
         self.assertEqual(len(results.chi2), 25)
+        self.assertEqual(self.invertor.d_max, 160.0)
+
+    def test_pool(self):
+        serial = self.explo(120, 200, 9)
+        for processes in (False, True):
+            seen = []
+            results = self.explo(120, 200, 9, nworkers=3, processes=processes,
+                                 callback=lambda r, d: seen.append(d))
+            self.assertEqual(sorted(seen), results.d_max)
+            self.assertEqual(results.d_max, serial.d_max)
+            self.assertTrue(numpy.allclose(results.chi2, serial.chi2))
+            self.assertTrue(numpy.allclose(results.rg, serial.rg))
+
+    def test_refine(self):
+        # D_max <= 0 fails, so the grid is refined next to zero
+        results = self.explo(-40, 200, 13, refine=3)
+        self.assertEqual(results.failed, [-40.0, -20.0, 0.0])
+        self.assertEqual(len(results.errors), 3)
+        self.assertEqual(results.d_max[:3], [2.5, 5.0, 10.0])
+        self.assertEqual(len(results.chi2), 13)
 
 if __name__ == '__main__':
     unittest.main()
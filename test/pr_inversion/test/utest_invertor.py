@@ -16,6 +16,7 @@ import warnings
 import numpy as np
 
 from sas.sascalc.pr.invertor import Invertor
+from sas.sascalc.pr import calc
 
 
 def find(filename):
@@ -185,6 +186,28 @@ class TestBasicComponent(unittest.TestCase):
         self.assertEqual(self.invertor.slit_width, 1.0)
         self.invertor.slit_height = 2.0
         self.assertEqual(self.invertor.slit_height, 2.0)
+        self.assertEqual(self.invertor.smear_npts, 21)
+        self.invertor.smear_npts = 11
+        self.assertEqual(self.invertor.smear_npts, 11)
+        self.assertEqual(self.invertor.clone().smear_npts, 11)
+        def doit():
+            self.invertor.smear_npts = 1
+        self.assertRaises(ValueError, doit)
+
+    def test_smeared_matrix(self):
+        """
+            Test the batched slit smearing against one order at a time
+        """
+        q = np.linspace(0.001, 0.3, 50)
+        n = np.arange(1, 11)
+        for height, width in [(0.05, 0.0), (0.0, 0.01), (0.05, 0.01)]:
+            matrix = calc.ortho_transformed_smeared_matrix(
+                q, 160.0, n, height, width, 11)
+            for k, n_k in enumerate(n):
+                column = calc.ortho_transformed_smeared(
+                    q, 160.0, n_k, height, width, 11)
+                self.assertTrue(np.allclose(matrix[:, k], column,
+                                            rtol=1e-12, atol=1e-12))
 
     def test_inversion(self):
         """
@@ -388,6 +411,40 @@ class TestBasicComponent(unittest.TestCase):
         t30s = t30/30.0**2
         self.assertTrue((t30s-t16/16.0**2)/t30s < 1.2)
 
+    def test_invert_alphas(self):
+        """
+            Test that an alpha scan matches one inversion per alpha
+        """
+        x, y, err = load(find("sphere_80.txt"))
+        self.invertor.d_max = 160.0
+        self.invertor.x = x
+        self.invertor.y = y
+        self.invertor.err = err
+        alphas = [0.0, 1e-9, 1e-7, .005]
+        for est_bck in (False, True):
+            self.invertor.est_bck = est_bck
+            outs, chi2 = self.invertor.invert_alphas(alphas, 12)
+            for alpha, out, chi2_k in zip(alphas, outs, chi2):
+                self.invertor.alpha = alpha
+                expected, _ = self.invertor.lstsq(12)
+                scale = np.max(np.abs(expected))
+                self.assertTrue(np.allclose(out, expected, atol=1e-6*scale))
+                # lstsq reports -1 when A is rank deficient
+                if self.invertor.chi2 >= 0:
+                    self.assertAlmostEqual(
+                        chi2_k/float(self.invertor.chi2), 1.0, 6)
+
+        # The data rows of A are kept between calls and only extended
+        # when more base functions are needed
+        design = self.invertor._design
+        self.invertor.lstsq(5)
+        self.assertTrue(self.invertor._design is design)
+        self.invertor.lstsq(15)
+        self.assertEqual(self.invertor._design[1].shape[1], 16)
+        self.invertor.d_max = 150.0
+        self.invertor.lstsq(5)
+        self.assertEqual(self.invertor._design[1].shape[1], 6)
+
     def test_clone(self):
         self.invertor.x = self.x_in
         clone = self.invertor.clone()
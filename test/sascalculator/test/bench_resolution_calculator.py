@@ -0,0 +1,72 @@
+"""
+Benchmark the resolution map of a whole detector from
+sas.sascalc.calculator.resolution_calculator.ResolutionCalculator.
+
+Usage::
+
+    python bench_resolution_calculator.py [npix ...]
+
+For each detector size npix x npix the resolution at every pixel is computed
+with compute_map, and with compute at each pixel and wavelength for a
+subset of the pixels to estimate the time of the point by point loop.  A
+three wavelength TOF list is used so that the wavelength averaging is
+included in both.
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import numpy as np
+
+from sas.sascalc.calculator.resolution_calculator import ResolutionCalculator
+
+
+def calculator():
+    """Calculator set up for a 3 wavelength TOF measurement"""
+    cal = ResolutionCalculator()
+    cal.set_source_aperture_size([2])
+    cal.set_sample_aperture_size([1])
+    cal.set_detector_pix_size([0.5])
+    cal.set_source2sample_distance([1500])
+    cal.set_sample2detector_distance([1300])
+    cal.set_wave_list([4.0, 6.0, 8.0], [0.1, 0.1, 0.1])
+    return cal
+
+
+def point_by_point(cal, qx, qy):
+    """Resolution at each point from compute, averaged over wavelength"""
+    lamda_list, dlamb_list = cal.get_wave_list()
+    cal.get_all_instrument_params()
+    out = np.zeros((4, len(qx)))
+    total = 0
+    for lam, dlam in zip(lamda_list, dlamb_list):
+        intens = cal.setup_tof(lam, dlam)
+        for i in range(len(qx)):
+            out[:, i] += np.array(cal.compute(lam, dlam, qx[i], qy[i],
+                                              tof=True)[2:])**2 * intens
+        total += intens
+    return np.sqrt(out / total)
+
+
+def main(counts, nsample=2000):
+    cal = calculator()
+    print("%8s %12s %12s %8s  %s"
+          % ("pixels", "loop [s]", "map [s]", "speedup", "check"))
+    for npix in counts:
+        q = np.linspace(-0.2, 0.2, npix)
+        qx, qy = [v.ravel() for v in np.meshgrid(q, q)]
+        t0 = time.time()
+        sigmas = np.array(cal.compute_map(qx, qy))
+        elapsed = time.time() - t0
+        sample = np.linspace(0, len(qx) - 1, min(nsample, len(qx))).astype(int)
+        t0 = time.time()
+        expected = point_by_point(cal, qx[sample], qy[sample])
+        loop = (time.time() - t0) * len(qx) / len(sample)
+        check = "ok" if np.allclose(sigmas[:, sample], expected) else "MISMATCH"
+        print("%8d %12.3f %12.4f %8.0f  %s"
+              % (len(qx), loop, elapsed, loop / elapsed, check))
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [64, 128, 256])
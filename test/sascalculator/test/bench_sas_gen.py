@@ -0,0 +1,74 @@
+"""
+Benchmark the threaded GenSAS calculation in sas.sascalc.calculator.sas_gen.
+
+Usage::
+
+    python bench_sas_gen.py [nthreads ...]
+
+Times the 2D magnetic calculation on the OMF example and the full 1D
+calculation on a random cloud of pixels for each thread count, and checks
+that the result is the same as with a single thread.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import time
+import multiprocessing
+
+import numpy as np
+
+from sas.sascalc.calculator import sas_gen
+
+
+def find(filename):
+    return os.path.join(os.path.dirname(__file__), filename)
+
+
+def omf_model():
+    """2D magnetic model from the OMF example file"""
+    omf = sas_gen.OMFReader().read(find("A_Raw_Example-1.omf"))
+    omf2sld = sas_gen.OMF2SLD()
+    omf2sld.set_data(omf)
+    model = sas_gen.GenSAS()
+    model.set_sld_data(omf2sld.output)
+    model.params['Up_frac_in'] = 0.5
+    q = np.linspace(-0.1, 0.1, 64)
+    qx, qy = [v.flatten() for v in np.meshgrid(q, q)]
+    return model, [qx, qy]
+
+
+def cloud_model(npix=1500):
+    """Full 1D model on a random cloud of pixels"""
+    rng = np.random.RandomState(0)
+    pos = rng.randn(npix, 3) * 30
+    sld = sas_gen.MagSLD(pos[:, 0], pos[:, 1], pos[:, 2],
+                         sld_n=rng.uniform(1e-6, 3e-6, npix),
+                         vol_pix=np.full(npix, 10.))
+    model = sas_gen.GenSAS()
+    model.set_sld_data(sld)
+    return model, [np.logspace(-3, 0, 64), []]
+
+
+def main(counts):
+    print("%-8s %8s %10s %8s  %s"
+          % ("case", "threads", "time [s]", "speedup", "check"))
+    for name, make in (("2D omf", omf_model), ("1D full", cloud_model)):
+        model, q = make()
+        reference = None
+        for nthreads in counts:
+            model.set_threads(nthreads)
+            t0 = time.time()
+            result = model.evalDistribution(q)
+            elapsed = time.time() - t0
+            if reference is None:
+                reference, base = result, elapsed
+            check = "ok" if np.array_equal(result, reference) else "MISMATCH"
+            print("%-8s %8d %10.3f %8.1f  %s"
+                  % (name, nthreads, elapsed, base / elapsed, check))
+
+
+if __name__ == "__main__":
+    ncpu = multiprocessing.cpu_count()
+    default = sorted(set([1, 2, 4, 8, 16, 32, 64, ncpu]) & set(range(1, ncpu + 1)))
+    main([int(v) for v in sys.argv[1:]] or default)
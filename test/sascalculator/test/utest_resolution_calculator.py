@@ -3,6 +3,8 @@
 """
 
 import unittest
+import numpy as np
+from sas.sascalc.dataloader.data_info import Data2D
 from  sas.sascalc.calculator.resolution_calculator import ResolutionCalculator \
                                             as calculator
 
@@ -31,7 +33,60 @@ class resolution_calculator(unittest.TestCase):
         
         # The value "0.000213283" was obtained by manual calculation.
         self.assertAlmostEqual(sigma_1d,   0.000213283, 5)
-        
+
+    def test_compute_map(self):
+        """
+            Compare the resolution map of qx, qy arrays with compute at
+            each point, averaged over the wavelengths of a TOF list
+        """
+        self.cal.set_source_aperture_size([2])
+        self.cal.set_sample_aperture_size([1.5, 1])
+        self.cal.set_detector_pix_size([0.5])
+        self.cal.set_source2sample_distance([1500])
+        self.cal.set_sample2detector_distance([1300])
+        self.cal.set_wave_list([4.0, 6.0, 8.0], [0.1, 0.1, 0.15])
+        qx, qy = np.meshgrid(np.linspace(-0.1, 0.1, 5),
+                             np.linspace(-0.05, 0.15, 4))
+        sigmas = self.cal.compute_map(qx, qy)
+        for sigma in sigmas:
+            self.assertEqual(sigma.shape, qx.shape)
+        lamda_list, dlamb_list = self.cal.get_wave_list()
+        for i, j in np.ndindex(*qx.shape):
+            expected = np.zeros(4)
+            total = 0
+            for lam, dlam in zip(lamda_list, dlamb_list):
+                intens = self.cal.setup_tof(lam, dlam)
+                values = self.cal.compute(lam, dlam, qx[i, j], qy[i, j],
+                                          tof=True)[2:]
+                expected += np.array(values)**2 * intens
+                total += intens
+            expected = np.sqrt(expected / total)
+            for sigma, value in zip(sigmas, expected):
+                self.assertAlmostEqual(sigma[i, j], value, 12)
+
+    def test_set_data_resolution(self):
+        """
+            The x and y resolution of a slit source are turned into radial
+            and azimuthal resolution at each point
+        """
+        self.cal.set_wavelength(6.0)
+        self.cal.set_wavelength_spread(0.125)
+        self.cal.set_source_aperture_size([3.0, 1.0])
+        qx = np.array([0.05, 0.0, -0.05, 0.0])
+        qy = np.array([0.0, 0.05, 0.0, -0.05])
+        data = Data2D(data=np.ones(4), qx_data=qx, qy_data=qy)
+        self.cal.set_data_resolution(data)
+        sigma_x, sigma_y, sigma_r, _ = self.cal.compute_map(qx, qy)
+        # the slit is wider along x
+        self.assertTrue(np.all(sigma_x > 1.1 * sigma_y))
+        # along qx the radial direction is x, along qy it is y
+        radial_x = np.sqrt(sigma_x**2 + sigma_r**2)
+        radial_y = np.sqrt(sigma_y**2 + sigma_r**2)
+        self.assertTrue(np.allclose(data.dqx_data[[0, 2]], radial_x[[0, 2]]))
+        self.assertTrue(np.allclose(data.dqy_data[[0, 2]], sigma_y[[0, 2]]))
+        self.assertTrue(np.allclose(data.dqx_data[[1, 3]], radial_y[[1, 3]]))
+        self.assertTrue(np.allclose(data.dqy_data[[1, 3]], sigma_x[[1, 3]]))
+
         
 if __name__ == '__main__':
     unittest.main()
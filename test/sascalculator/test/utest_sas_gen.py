@@ -67,6 +67,41 @@ class sas_gen_test(unittest.TestCase):
         x = np.linspace(0, 0.1, 11)[1:]
         model.runXY([x, x])
 
+    def test_threads(self):
+        """
+        Test that splitting q between threads gives the same result.
+        """
+        f = self.pdbloader.read(find("c60.pdb"))
+        model = sas_gen.GenSAS()
+        model.set_sld_data(f)
+        q = np.linspace(0.001, 0.5, 51)
+        qx, qy = q - 0.25, 0.5 - q
+        serial_1d = model.run([q, []])
+        serial_2d = model.runXY([qx, qy])
+        for nthreads in (2, 7, 100):
+            model.set_threads(nthreads)
+            self.assertTrue(np.array_equal(model.run([q, []]), serial_1d))
+            self.assertTrue(np.array_equal(model.runXY([qx, qy]), serial_2d))
+
+    def test_distance_histogram(self):
+        """
+        Test the pair distance histogram against the exact sum.
+        """
+        f = self.pdbloader.read(find("c60.pdb"))
+        model = sas_gen.GenSAS()
+        model.set_sld_data(f)
+        q = np.linspace(0.001, 0.5, 51)
+        exact = model.run([q, []])
+        for bin_width, coarse, rtol in [(0.02, None, 1e-3), (0.1, 2.0, 0.1)]:
+            model.set_histogram(bin_width, coarse)
+            approx = model.run([q, []])
+            bound = model.get_error_bound(q)
+            self.assertTrue(np.all(np.abs(approx - exact) <= bound))
+            self.assertTrue(np.allclose(approx, exact, rtol=rtol))
+        model.set_histogram()
+        self.assertTrue(np.array_equal(model.run([q, []]), exact))
+        self.assertTrue(np.all(model.get_error_bound(q) == 0))
+
 
 if __name__ == '__main__':
     unittest.main()
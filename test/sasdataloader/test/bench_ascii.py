@@ -0,0 +1,121 @@
+"""
+Benchmark the block parser of sas.sascalc.dataloader.readers.ascii_reader
+against the line by line parser it replaced.
+
+Usage::
+
+    python bench_ascii.py [npoints ...]
+
+For each number of points a synthetic 4 column file with a header and a
+footer is written to a temporary directory, loaded repeatedly with both
+parsers, and the loaded data are compared.
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sas.sascalc.dataloader.data_info import DataInfo
+from sas.sascalc.dataloader.readers.ascii_reader import Reader
+
+
+class LoopReader(Reader):
+    """Line by line reference parser, without the error reporting"""
+
+    def get_file_contents(self):
+        lines = self.readall().splitlines()
+        self.output = []
+        self.current_datainfo = DataInfo()
+        self.current_datainfo.filename = self.f_open.name
+        self.reset_data_list(len(lines))
+        is_data = False
+        candidate_lines = 0
+        line_no = 0
+        lentoks = 2
+        for line in lines:
+            toks = self.splitline(line.strip())
+            new_lentoks = len(toks)
+            try:
+                if new_lentoks == 0:
+                    continue
+                elif new_lentoks != lentoks and is_data:
+                    break
+                elif new_lentoks != lentoks and not is_data:
+                    candidate_lines = 0
+                    self.reset_data_list(len(lines) - line_no)
+                self.current_dataset.x[candidate_lines] = float(toks[0])
+                if new_lentoks > 1:
+                    self.current_dataset.y[candidate_lines] = float(toks[1])
+                if new_lentoks > 2:
+                    self.current_dataset.dy[candidate_lines] = float(toks[2])
+                if new_lentoks > 3:
+                    self.current_dataset.dx[candidate_lines] = float(toks[3])
+                candidate_lines += 1
+                if candidate_lines >= self.min_data_pts:
+                    is_data = True
+                lentoks = new_lentoks
+                line_no += 1
+            except ValueError:
+                if is_data:
+                    break
+                self.reset_data_list(len(lines) - line_no)
+                lentoks = 2
+                candidate_lines = 0
+        self.remove_empty_q_values()
+        self.current_dataset = self.set_default_1d_units(self.current_dataset)
+        self.current_datainfo.meta_data['loader'] = self.type_name
+        self.send_to_output()
+
+
+def make_file(path, npoints):
+    """
+    Write a reduced 1D data file with a header, 4 columns and a footer.
+    """
+    q = np.linspace(0.001, 0.5, npoints)
+    iq = 1.0 / (1.0 + (50 * q)**2)
+    with open(path, 'w') as f:
+        f.write("Synthetic data set\nQ I(Q) dI(Q) dQ\n")
+        for row in zip(q, iq, 0.01 * iq, 0.05 * q):
+            f.write("%.6e %.6e %.6e %.6e\n" % row)
+        f.write("\nEnd of data\n")
+
+
+def time_reader(reader_class, path, repeat):
+    """Return the data of the last load and the mean time per load"""
+    t0 = time.time()
+    for _ in range(repeat):
+        data = reader_class().read(path)
+    return data[0], (time.time() - t0) / repeat
+
+
+def check(new, ref):
+    ok = all(np.array_equal(getattr(new, name), getattr(ref, name))
+             for name in ('x', 'y', 'dy', 'dx'))
+    return "ok" if ok else "MISMATCH"
+
+
+def main(sizes):
+    print("%10s %12s %12s %8s  %s"
+          % ("points", "loop [ms]", "block [ms]", "speedup", "check"))
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for npoints in sizes:
+            path = os.path.join(tmpdir, "data_%d.txt" % npoints)
+            make_file(path, npoints)
+            repeat = max(1, 20000 // npoints)
+            ref, t_loop = time_reader(LoopReader, path, repeat)
+            new, t_block = time_reader(Reader, path, repeat)
+            print("%10d %12.3f %12.3f %8.1f  %s"
+                  % (npoints, 1e3 * t_loop, 1e3 * t_block,
+                     t_loop / t_block, check(new, ref)))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [100, 1000, 10000, 100000])
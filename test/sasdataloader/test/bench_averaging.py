@@ -0,0 +1,160 @@
+"""
+Benchmark the array based 2D averagers in sas.sascalc.dataloader.manipulations
+against the per-pixel loops they replaced.
+
+Usage::
+
+    python bench_averaging.py [npix_side ...]
+
+For each detector size the averagers are timed on a synthetic 2D data set
+and their output is checked against a pure python reference.
+"""
+from __future__ import print_function
+
+import math
+import sys
+import time
+
+import numpy as np
+
+from sas.sascalc.dataloader import data_info
+from sas.sascalc.dataloader.manipulations import (CircularAverage, Ring,
+                                                  SectorQ, SlabX,
+                                                  reader2D_converter)
+
+
+def make_data(side):
+    """
+    Create a square Data2D with random intensities and errors.
+    """
+    rng = np.random.RandomState(side)
+    data = data_info.Data2D(data=rng.poisson(10, (side, side)).astype(float),
+                            err_data=np.zeros((side, side)))
+    data.x_bins = np.linspace(-0.1, 0.1, side)
+    data.y_bins = np.linspace(-0.1, 0.1, side)
+    data.detector.append(data_info.Detector())
+    return reader2D_converter(data)
+
+
+def _finish(x, y, err, counts):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return x / counts, y / counts, np.sqrt(err) / counts
+
+
+def loop_circular(data2D, r_min, r_max, bin_width):
+    """Per-pixel reference for CircularAverage"""
+    nbins = int(math.ceil((r_max - r_min) / bin_width))
+    x, y, err, counts = [np.zeros(nbins) for _ in range(4)]
+    for q, i, di in zip(data2D.q_data, data2D.data, data2D.err_data):
+        if not r_min <= q <= r_max:
+            continue
+        i_q = min(int(math.floor((q - r_min) / bin_width)), nbins - 1)
+        x[i_q] += q
+        y[i_q] += i
+        err[i_q] += abs(i) if di == 0 else di * di
+        counts[i_q] += 1
+    return _finish(x, y, err, counts)
+
+
+def loop_ring(data2D, r_min, r_max, nbins):
+    """Per-pixel reference for Ring"""
+    y, err, counts = [np.zeros(nbins) for _ in range(3)]
+    for q, qx, qy, i, di in zip(data2D.q_data, data2D.qx_data,
+                                data2D.qy_data, data2D.data, data2D.err_data):
+        if not r_min <= q <= r_max:
+            continue
+        phi = math.atan2(qy, qx) + math.pi
+        i_phi = int(math.floor(nbins * (phi + math.pi / nbins) / (2 * math.pi)))
+        if i_phi >= nbins:
+            i_phi = 0
+        y[i_phi] += i
+        err[i_phi] += abs(i) if di == 0 else di * di
+        counts[i_phi] += 1
+    return _finish(np.zeros(nbins), y, err, counts)
+
+
+def loop_sector_q(data2D, r_min, r_max, phi_min, phi_max, nbins):
+    """Per-pixel reference for SectorQ with 0 < phi_min < phi_max < pi"""
+    x, y, err, counts = [np.zeros(nbins) for _ in range(4)]
+    for q, qx, qy, i, di in zip(data2D.q_data, data2D.qx_data,
+                                data2D.qy_data, data2D.data, data2D.err_data):
+        if not r_min <= q <= r_max:
+            continue
+        phi = math.atan2(qy, qx) + math.pi
+        if not (phi_min <= phi < phi_max
+                or phi_min + math.pi < phi < phi_max + math.pi):
+            continue
+        i_q = min(int(math.floor(nbins * (q - r_min) / (r_max - r_min))),
+                  nbins - 1)
+        x[i_q] += q
+        y[i_q] += i
+        err[i_q] += abs(i) if di == 0 else di * di
+        counts[i_q] += 1
+    return _finish(x, y, err, counts)
+
+
+def loop_slab_x(data2D, x_min, x_max, y_min, y_max, bin_width):
+    """Per-pixel reference for SlabX without folding"""
+    nbins = int(math.ceil((x_max - x_min) / bin_width))
+    x, y, err, counts = [np.zeros(nbins) for _ in range(4)]
+    for qx, qy, i, di in zip(data2D.qx_data, data2D.qy_data,
+                             data2D.data, data2D.err_data):
+        if not (x_min <= qx < x_max and y_min <= qy < y_max):
+            continue
+        i_q = int(math.ceil((qx - x_min) / bin_width)) - 1
+        if i_q < 0 or i_q >= nbins:
+            continue
+        x[i_q] += qx
+        y[i_q] += i
+        err[i_q] += abs(i) if di == 0 else di * di
+        counts[i_q] += 1
+    return _finish(x, y, err, counts)
+
+
+CASES = [
+    ("CircularAverage",
+     CircularAverage(r_min=0.0, r_max=0.1, bin_width=0.001),
+     lambda d: loop_circular(d, 0.0, 0.1, 0.001)),
+    ("Ring",
+     Ring(r_min=0.02, r_max=0.06, nbins=36),
+     lambda d: loop_ring(d, 0.02, 0.06, 36)),
+    ("SectorQ",
+     SectorQ(r_min=0.001, r_max=0.1, phi_min=0.5, phi_max=1.5, nbins=50),
+     lambda d: loop_sector_q(d, 0.001, 0.1, 0.5, 1.5, 50)),
+    ("SlabX",
+     SlabX(x_min=-0.1, x_max=0.1, y_min=-0.01, y_max=0.01, bin_width=0.002),
+     lambda d: loop_slab_x(d, -0.1, 0.1, -0.01, 0.01, 0.002)),
+]
+
+
+def check(name, out, ref):
+    """Compare the averager output with the finite reference bins"""
+    x, y, dy = ref
+    idx = np.isfinite(y)
+    if name == "Ring":
+        x = out.x
+    else:
+        x = x[idx]
+    ok = (np.allclose(out.x, x) and np.allclose(out.y, y[idx])
+          and np.allclose(out.dy, dy[idx]))
+    return "ok" if ok else "MISMATCH"
+
+
+def main(sides):
+    print("%-16s %10s %10s %10s %8s  %s"
+          % ("averager", "pixels", "loop [s]", "numpy [s]", "speedup", "check"))
+    for side in sides:
+        data2D = make_data(side)
+        for name, averager, reference in CASES:
+            t0 = time.time()
+            ref = reference(data2D)
+            t1 = time.time()
+            out = averager(data2D)
+            t2 = time.time()
+            print("%-16s %10d %10.4f %10.4f %8.1f  %s"
+                  % (name, side * side, t1 - t0, t2 - t1,
+                     (t1 - t0) / max(t2 - t1, 1e-9), check(name, out, ref)))
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [128, 512, 1024])
@@ -0,0 +1,80 @@
+"""
+Benchmark summing many boxes of a 2D frame with
+sas.sascalc.dataloader.manipulations.MultiBoxsum against a Boxsum call for
+each box.
+
+Usage::
+
+    python bench_boxsum.py [nboxes ...]
+
+For each number of boxes a grid of boxes covering a 512 x 512 detector is
+summed in one pass and box by box, with the pixels counted whole and by
+their fraction inside the boxes, and the results are checked against each
+other.
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import numpy as np
+
+from sas.sascalc.dataloader.data_info import Data2D, Detector
+from sas.sascalc.dataloader.manipulations import Boxsum, MultiBoxsum
+
+
+def make_data(side=512):
+    """
+    Return a square Data2D with Poisson counts
+    """
+    rng = np.random.RandomState(side)
+    q = np.linspace(-0.1, 0.1, side)
+    qx, qy = [v.ravel() for v in np.meshgrid(q, q)]
+    data = rng.poisson(100.0, qx.size).astype(float)
+    data2D = Data2D(data=data, err_data=np.sqrt(data), qx_data=qx, qy_data=qy)
+    data2D.detector.append(Detector())
+    data2D.x_bins, data2D.y_bins = q, q
+    return data2D
+
+
+def make_boxes(nboxes):
+    """
+    Return a grid of about nboxes boxes over the detector
+    """
+    nside = int(np.ceil(np.sqrt(nboxes)))
+    edges = np.linspace(-0.1, 0.1, nside + 1)
+    return [(x_min, x_max, y_min, y_max)
+            for x_min, x_max in zip(edges[:-1], edges[1:])
+            for y_min, y_max in zip(edges[:-1], edges[1:])][:nboxes]
+
+
+def timed(fn, *args):
+    t0 = time.time()
+    result = fn(*args)
+    return result, time.time() - t0
+
+
+def one_by_one(data2D, boxes, fractional):
+    """Sums of each box from its own Boxsum"""
+    return np.array([Boxsum(*box, fractional=fractional)(data2D)
+                     for box in boxes]).T
+
+
+def main(counts):
+    data2D = make_data()
+    print("%8s %12s %12s %12s %8s  %s"
+          % ("boxes", "mode", "loop [s]", "batch [s]", "speedup", "check"))
+    for nboxes in counts:
+        boxes = make_boxes(nboxes)
+        for fractional in (False, True):
+            expected, loop = timed(one_by_one, data2D, boxes, fractional)
+            sums, batch = timed(MultiBoxsum(boxes, fractional=fractional),
+                                data2D)
+            check = "ok" if np.allclose(sums, expected) else "MISMATCH"
+            print("%8d %12s %12.4f %12.4f %8.1f  %s"
+                  % (len(boxes), "fractional" if fractional else "whole",
+                     loop, batch, loop / batch, check))
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [16, 256, 1024])
@@ -0,0 +1,103 @@
+"""
+Benchmark reading cansas XML files with
+sas.sascalc.dataloader.readers.cansas_reader.
+
+Usage::
+
+    python bench_cansas_xml.py [npoints ...]
+
+For each number of points a synthetic file with several SASentry elements,
+Q in 1/nm so that every Q value is converted, is written to a temporary
+directory and read a few times.  The time per file and the time spent in
+schema validation are reported.
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sas.sascalc.dataloader.readers import xml_reader
+from sas.sascalc.dataloader.readers.cansas_reader import Reader
+
+HEADER = """<?xml version="1.0"?>
+<SASroot version="1.1" xmlns="urn:cansas1d:1.1"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xsi:schemaLocation="urn:cansas1d:1.1 http://www.cansas.org/formats/1.1/cansas1d.xsd">
+"""
+ENTRY = """<SASentry name="entry{0}">
+<Title>bench {0}</Title>
+<Run>{0}</Run>
+<SASdata>
+{1}
+</SASdata>
+<SASsample><ID>sample</ID></SASsample>
+<SASinstrument><name>bench</name>
+<SASsource><radiation>neutron</radiation></SASsource>
+<SAScollimation/>
+<SASdetector><name>detector</name></SASdetector>
+</SASinstrument>
+<SASnote/>
+</SASentry>
+"""
+POINT = ('<Idata><Q unit="1/nm">{:.6e}</Q><I unit="1/cm">{:.6e}</I>'
+         '<Idev unit="1/cm">{:.6e}</Idev><Qdev unit="1/nm">{:.6e}</Qdev>'
+         '</Idata>')
+
+
+def make_file(path, npoints, nentries):
+    """Write nentries SASentry elements of npoints points each"""
+    q = np.linspace(0.01, 5.0, npoints)
+    i = 1.0 / (1.0 + q**2)
+    lines = "\n".join(POINT.format(*p) for p in zip(q, i, 0.1 * i, 0.05 * q))
+    with open(path, "w") as f:
+        f.write(HEADER)
+        for n in range(nentries):
+            f.write(ENTRY.format(n, lines))
+        f.write("</SASroot>\n")
+    return q / 10.0
+
+
+def main(counts, nentries=10, repeat=3):
+    validate = xml_reader.XMLreader.validate_xml
+    timing = {"validate": 0.0}
+
+    def timed_validate(self):
+        t0 = time.time()
+        try:
+            return validate(self)
+        finally:
+            timing["validate"] += time.time() - t0
+
+    xml_reader.XMLreader.validate_xml = timed_validate
+    print("%8s %8s %10s %12s  %s"
+          % ("points", "entries", "read [s]", "validate [s]", "check"))
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for npoints in counts:
+            path = os.path.join(tmpdir, "bench_%d.xml" % npoints)
+            q = make_file(path, npoints, nentries)
+            best = None
+            for _ in range(repeat):
+                timing["validate"] = 0.0
+                t0 = time.time()
+                output = Reader().read(path)
+                elapsed = time.time() - t0
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, timing["validate"])
+            check = ("ok" if len(output) == nentries
+                     and all(np.allclose(d.x, q) for d in output)
+                     else "MISMATCH")
+            print("%8d %8d %10.4f %12.4f  %s"
+                  % (npoints, nentries, best[0], best[1], check))
+    finally:
+        xml_reader.XMLreader.validate_xml = validate
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [100, 1000, 10000])
@@ -0,0 +1,97 @@
+"""
+Benchmark rebinning 2D data into an image for plotting with
+sas.sascalc.dataloader.manipulations, as done by PlotPanel._build_matrix,
+against the two np.histogram2d calls and the per-pixel hole filling loop
+they replaced.
+
+Usage::
+
+    python bench_image_binning.py [npix_side ...]
+
+For each detector size a square detector with a masked beam stop and a
+tenth of its pixels removed at random is rebinned, its empty bins filled,
+and the image checked against the reference.
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import numpy as np
+
+from sas.sascalc.dataloader.manipulations import (get_image_bins,
+                                                  rebin_to_image,
+                                                  fill_image_holes)
+
+
+def make_data(side):
+    """
+    Return qx, qy and intensity vectors of a masked square detector
+    """
+    rng = np.random.RandomState(side)
+    q = np.linspace(-0.1, 0.1, side)
+    qx, qy = [v.ravel() for v in np.meshgrid(q, q)]
+    keep = (np.hypot(qx, qy) > 0.01) & (rng.uniform(size=qx.size) > 0.1)
+    qx, qy = qx[keep], qy[keep]
+    return qx, qy, 1.0 / (1.0 + 1e3 * (qx**2 + qy**2))
+
+
+def reference_rebin(qx, qy, data, x_bins, y_bins):
+    """The histogram2d rebinning of PlotPanel._build_matrix"""
+    weights = np.histogram2d(x=qy, y=qx, bins=[y_bins, x_bins],
+                             weights=np.ones([data.size]))[0]
+    image = np.histogram2d(x=qy, y=qx, bins=[y_bins, x_bins],
+                           weights=data)[0]
+    image[weights > 1] = image[weights > 1] / weights[weights > 1]
+    image[weights == 0] = None
+    return image, weights
+
+
+def reference_fill(image, weights):
+    """The per-pixel loop of PlotPanel._fillup_pixels"""
+    len_y, len_x = image.shape
+    temp_image = np.zeros([len_y, len_x])
+    weit = np.zeros([len_y, len_x])
+    for n_y in range(len_y):
+        for n_x in range(len_x):
+            if weights[n_y][n_x] > 0 or np.isfinite(image[n_y][n_x]):
+                continue
+            for d_y, d_x in [(-1, 0), (0, -1), (1, 0), (0, 1),
+                             (-1, -1), (1, -1), (-1, 1), (1, 1)]:
+                i, j = n_y + d_y, n_x + d_x
+                if (0 <= i < len_y and 0 <= j < len_x
+                        and np.isfinite(image[i][j])):
+                    temp_image[n_y][n_x] += image[i][j]
+                    weit[n_y][n_x] += 1
+    ind = (weit > 0)
+    image[ind] = temp_image[ind] / weit[ind]
+    return image
+
+
+def timed(fn, *args):
+    t0 = time.time()
+    result = fn(*args)
+    return result, time.time() - t0
+
+
+def main(sides):
+    print("%10s %12s %12s %12s %12s  %s"
+          % ("pixels", "rebin old", "rebin new", "fill old", "fill new",
+             "check"))
+    for side in sides:
+        qx, qy, data = make_data(side)
+        x_bins, y_bins = get_image_bins(qx, qy)
+        (old, old_weights), rebin_old = timed(reference_rebin, qx, qy, data,
+                                              x_bins, y_bins)
+        (new, new_weights), rebin_new = timed(rebin_to_image, qx, qy, data,
+                                              x_bins, y_bins)
+        _, fill_old = timed(reference_fill, old, old_weights)
+        _, fill_new = timed(fill_image_holes, new, new_weights)
+        check = ("ok" if np.array_equal(old_weights, new_weights)
+                 and np.allclose(old, new, equal_nan=True) else "MISMATCH")
+        print("%10d %10.4f s %10.4f s %10.4f s %10.4f s  %s"
+              % (qx.size, rebin_old, rebin_new, fill_old, fill_new, check))
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [128, 512, 1024])
@@ -0,0 +1,95 @@
+"""
+Benchmark eager and lazy reading of multi-frame NXcanSAS files with
+sas.sascalc.dataloader.readers.cansas_reader_HDF5.
+
+Usage::
+
+    python bench_nxcansas.py [nframes ...]
+
+For each number of frames a synthetic file is written to a temporary
+directory and read with Reader() and Reader(lazy=True).  The time and peak
+python memory to open the file, and to read a single frame, are reported.
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import h5py
+import numpy as np
+
+from sas.sascalc.dataloader.readers.cansas_reader_HDF5 import Reader
+
+
+def make_file(path, nframes, nq=1000):
+    """
+    Write a single SASentry with one multi-frame SASdata group.
+    """
+    rng = np.random.RandomState(nframes)
+    with h5py.File(path, "w") as f:
+        entry = f.create_group("sasentry01")
+        entry.attrs["canSAS_class"] = "SASentry"
+        entry.create_dataset("title", data=[np.string_("bench")])
+        sasdata = entry.create_group("sasdata01")
+        sasdata.attrs["canSAS_class"] = "SASdata"
+        sasdata.attrs["signal"] = "I"
+        sasdata.attrs["I_axes"] = ["T", "Q"]
+        sasdata.attrs["Q_indices"] = [1]
+        node = sasdata.create_dataset("Q", data=np.linspace(0.001, 0.5, nq))
+        node.attrs["units"] = "1/A"
+        intensity = rng.rand(nframes, nq) + 1.0
+        node = sasdata.create_dataset("I", data=intensity)
+        node.attrs["units"] = "1/cm"
+        node.attrs["uncertainties"] = "Idev"
+        node = sasdata.create_dataset("Idev", data=0.1 * intensity)
+        node.attrs["units"] = "1/cm"
+
+
+def measure(fn):
+    """Return the result, elapsed time and peak traced memory of fn()"""
+    tracemalloc.start()
+    t0 = time.time()
+    result = fn()
+    elapsed = time.time() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(counts):
+    print("%8s %6s %10s %10s %10s %10s  %s"
+          % ("frames", "mode", "open [s]", "open [MB]", "frame [s]",
+             "frame [MB]", "check"))
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for nframes in counts:
+            path = os.path.join(tmpdir, "frames_%d.h5" % nframes)
+            make_file(path, nframes)
+            middle = nframes // 2
+
+            eager, t_open, m_open = measure(lambda: Reader().read(path))
+            frame, t_frame, m_frame = measure(lambda: eager[middle])
+            reference = frame.y
+            print("%8d %6s %10.4f %10.2f %10.6f %10.2f  %s"
+                  % (nframes, "eager", t_open, m_open / 1e6, t_frame,
+                     m_frame / 1e6, "-"))
+            del eager, frame
+
+            lazy, t_open, m_open = measure(
+                lambda: Reader(lazy=True).read(path)[0])
+            frame, t_frame, m_frame = measure(lambda: lazy[middle])
+            check = "ok" if np.array_equal(frame.y, reference) else "MISMATCH"
+            print("%8d %6s %10.4f %10.2f %10.6f %10.2f  %s"
+                  % (nframes, "lazy", t_open, m_open / 1e6, t_frame,
+                     m_frame / 1e6, check))
+            lazy.close()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [10, 100, 500])
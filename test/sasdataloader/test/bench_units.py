@@ -0,0 +1,94 @@
+"""
+Benchmark the cached unit conversions of sas.sascalc.data_util.nxsunit
+against building a converter for every conversion.
+
+Usage::
+
+    python bench_units.py [npoints ...]
+
+For each number of points a cansas XML file with Q in 1/nm is written to a
+temporary directory.  Its Q units are given as 1/A on every other point so
+that each value is converted on its own.  The file and the test .ABS file
+are read with the caches enabled and disabled, and the time per conversion
+of a single value and of an array is reported.
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sas.sascalc.data_util import nxsunit
+from sas.sascalc.dataloader.loader import Loader
+
+from bench_cansas_xml import make_file
+
+
+class NoCache(dict):
+    """Cache that never keeps anything, to time the uncached conversions"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+def best_time(fn, repeat=5, number=1):
+    """Return the best time of number calls to fn"""
+    best = None
+    for _ in range(repeat):
+        t0 = time.time()
+        for _ in range(number):
+            fn()
+        elapsed = (time.time() - t0) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def timings(name, fn, **kw):
+    """Print the time of fn with and without the caches"""
+    converters, factors = nxsunit._converters, nxsunit._factors
+    try:
+        nxsunit._converters, nxsunit._factors = NoCache(), NoCache()
+        uncached = best_time(fn, **kw)
+    finally:
+        nxsunit._converters, nxsunit._factors = converters, factors
+    cached = best_time(fn, **kw)
+    print("%-32s %12.3e %12.3e %8.2f"
+          % (name, uncached, cached, uncached / cached))
+
+
+def main(counts):
+    print("%-32s %12s %12s %8s" % ("", "uncached [s]", "cached [s]",
+                                   "speedup"))
+    values = np.linspace(0.01, 0.5, 10000)
+    timings("scalar 1/nm -> 1/A", lambda: nxsunit.convert(0.1, '1/nm', '1/A'),
+            number=10000)
+    timings("10000 values 1/nm -> 1/A",
+            lambda: nxsunit.convert(values, '1/nm', '1/A'), number=100)
+    here = os.path.dirname(os.path.abspath(__file__))
+    abs_file = os.path.join(here, "jan08002.ABS")
+    timings("read jan08002.ABS", lambda: Loader().load(abs_file))
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for npoints in counts:
+            path = os.path.join(tmpdir, "units_%d.xml" % npoints)
+            make_file(path, npoints, 1)
+            with open(path) as f:
+                text = f.read().split('<Q unit="1/nm">')
+            # Mixed units so that the values are converted one at a time
+            text = "".join(part + ('<Q unit="1/nm">' if i % 2 else
+                                   '<Q unit="1/A">')
+                           for i, part in enumerate(text[:-1])) + text[-1]
+            with open(path, "w") as f:
+                f.write(text)
+            timings("read %d point cansas XML" % npoints,
+                    lambda: Loader().load(path), repeat=3)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main([int(v) for v in sys.argv[1:]] or [1000, 5000])
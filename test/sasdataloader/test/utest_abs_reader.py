@@ -301,8 +301,8 @@ class cansas_reader(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(self.data.filename, filename)
         self._checkdata()
-        if os.path.isfile(filename):
-            os.remove(filename)
+        if os.path.isfile(find(filename)):
+            os.remove(find(filename))
 
     def test_units(self):
         """
@@ -3,6 +3,8 @@
 """
 
 import os.path
+import shutil
+import tempfile
 import warnings
 import math
 warnings.simplefilter("ignore")
@@ -10,6 +12,7 @@ warnings.simplefilter("ignore")
 import unittest
 from sas.sascalc.dataloader.loader import Loader
 from sas.sascalc.dataloader.data_info import Data2D
+from sas.sascalc.dataloader.readers.ascii_reader import Reader
 
 
 def find(filename):
@@ -130,6 +133,30 @@ class ABSReaderTests(unittest.TestCase):
             self.assertFalse(math.isnan(f_2d.qx_data[i]))
             self.assertFalse(math.isnan(f_2d.qy_data[i]))
 
+    def test_data_block(self):
+        """
+        Test the data block ends at a footer with a different number of
+        columns or a text value, and may mix delimiters and blank lines.
+        """
+        lines = ["Q I dI", "1 2 3 4", "0.1 0.2"]
+        lines += ["%d, %d, 0.1" % (i, 2*i) for i in range(1, 5)]
+        lines += ["", "5 10 0.1", "6;12;0.1", "   ", "7, 14, 0.1"]
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "block.txt")
+            with open(path, 'w') as f:
+                f.write("\n".join(lines + ["8 16", "9 18 0.1"]))
+            data = Reader().read(path)[0]
+            self.assertEqual(list(data.x), list(range(1, 8)))
+            self.assertEqual(list(data.y), list(range(2, 16, 2)))
+            self.assertEqual(list(data.dy), [0.1] * 7)
+            with open(path, 'w') as f:
+                f.write("\n".join(lines + ["8 16 text", "9 18 0.1"]))
+            data = Reader().read(path)[0]
+            self.assertEqual(list(data.x), list(range(1, 8)))
+        finally:
+            shutil.rmtree(tmpdir)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,11 +7,16 @@ import numpy as np
 
 import sas.sascalc.dataloader.data_info as data_info
 from sas.sascalc.dataloader.loader import Loader
-from sas.sascalc.dataloader.manipulations import (Boxavg, Boxsum,
+from sas.sascalc.dataloader.manipulations import (Binning, Boxavg, Boxsum,
                                                   CircularAverage, Ring,
+                                                  MultiBoxavg, MultiBoxsum,
                                                   SectorPhi, SectorQ, SlabX,
-                                                  SlabY, get_q,
-                                                  reader2D_converter)
+                                                  SlabY, AveragingPlan,
+                                                  get_averaging_plan, get_q,
+                                                  reader2D_converter,
+                                                  get_image_bins,
+                                                  rebin_to_image,
+                                                  fill_image_holes)
 
 
 def find(filename):
@@ -101,6 +106,177 @@ class Averaging(unittest.TestCase):
         for i in range(17):
             self.assertEqual(o.y[i], 1.0)
 
+    def test_bin_index_array(self):
+        """
+            Array bin indices should match the scalar calculation
+        """
+        values = np.linspace(0.001, 0.1, 257)
+        for base in (None, 10, math.e):
+            binning = Binning(0.001, 0.1, 30, base)
+            expected = [binning.get_bin_index(v) for v in values]
+            self.assertEqual(list(binning.get_bin_index(values)), expected)
+
+    def test_ring_poisson_error(self):
+        """
+            Pixels without an error should fall back on sqrt(|I|)
+        """
+        r = Ring(r_min=2 * self.qmin, r_max=5 * self.qmin, nbins=20)
+        self.data.data = -4.0 * np.ones_like(self.data.data)
+        self.data.err_data = 2.0 * np.ones_like(self.data.data)
+        expected = r(self.data)
+        self.data.err_data = np.zeros_like(self.data.data)
+        o = r(self.data)
+        np.testing.assert_array_equal(o.dy, expected.dy)
+        np.testing.assert_array_equal(o.y, expected.y)
+
+    def test_averaging_plan(self):
+        """
+            Applying a plan should match the averager on every frame
+        """
+        averagers = [
+            CircularAverage(r_min=self.qmin, r_max=20 * self.qmin,
+                            bin_width=self.qmin),
+            Ring(r_min=2 * self.qmin, r_max=5 * self.qmin, nbins=20),
+            SectorQ(r_min=self.qmin, r_max=20 * self.qmin,
+                    phi_min=0.2, phi_max=1.0, nbins=10),
+            SlabX(x_min=-0.01, x_max=0.01, y_min=-0.002, y_max=0.002,
+                  bin_width=0.001),
+            Boxsum(x_min=-0.01, x_max=0.01, y_min=-0.002, y_max=0.002),
+            Boxavg(x_min=-0.01, x_max=0.01, y_min=-0.002, y_max=0.002,
+                   fractional=True),
+            MultiBoxsum([(-0.01, 0.01, -0.002, 0.002), (0.0, 0.02, 0.0, 0.02)],
+                        fractional=True),
+        ]
+        rng = np.random.RandomState(0)
+        for averager in averagers:
+            plan = AveragingPlan(averager, self.data)
+            for frame in range(3):
+                self.data.data = rng.poisson(10.0, len(self.data.qx_data))
+                self.data.data = self.data.data.astype(float)
+                if frame:
+                    self.data.data[frame::17] = np.nan
+                expected = averager(self.data)
+                o = plan(self.data)
+                if isinstance(expected, tuple):
+                    np.testing.assert_allclose(o, expected)
+                else:
+                    np.testing.assert_allclose(o.x, expected.x)
+                    np.testing.assert_allclose(o.y, expected.y)
+                    np.testing.assert_allclose(o.dy, expected.dy)
+
+    def test_box_fractional(self):
+        """
+            Partial pixels count for their area inside the box
+        """
+        q = self.data.x_bins
+        step = q[1] - q[0]
+        box = dict(x_min=q[10] + 0.25 * step, x_max=q[20] - 0.25 * step,
+                   y_min=q[40] + 0.1 * step, y_max=q[45] + 0.6 * step)
+        s, ds, npoints = Boxsum(fractional=True, **box)(self.data)
+        self.assertAlmostEqual(s, 9.5 * 5.5)
+        self.assertAlmostEqual(npoints, 9.5 * 5.5)
+        # Errors add in quadrature with the squared pixel fractions
+        self.assertAlmostEqual(ds, math.sqrt((9 + 2 * 0.25**2)
+                                             * (5 + 0.4**2 + 0.1**2)))
+        s, ds = Boxavg(fractional=True, pixel_size=(step, step), **box)(
+            self.data)
+        self.assertAlmostEqual(s, 1.0)
+        # Without it, only the pixels centered in the box count
+        s, ds, npoints = Boxsum(**box)(self.data)
+        self.assertEqual((s, npoints), (9 * 5, 9 * 5))
+
+    def test_multibox(self):
+        """
+            Summing many boxes at once should match each box on its own
+        """
+        rng = np.random.RandomState(1)
+        self.data.data = rng.poisson(10.0, len(self.data.qx_data)).astype(float)
+        self.data.data[::13] = np.nan
+        boxes = [(x, x + 0.01, y, y + 0.004)
+                 for x in np.linspace(-0.04, 0.04, 7)
+                 for y in np.linspace(-0.04, 0.04, 5)]
+        boxes.append((1.0, 2.0, 1.0, 2.0))
+        for fractional in (False, True):
+            sums = MultiBoxsum(boxes, fractional=fractional)(self.data)
+            avgs = MultiBoxavg(boxes, fractional=fractional)(self.data)
+            for i, (x_min, x_max, y_min, y_max) in enumerate(boxes):
+                box = dict(x_min=x_min, x_max=x_max, y_min=y_min,
+                           y_max=y_max, fractional=fractional)
+                np.testing.assert_allclose([v[i] for v in sums],
+                                           Boxsum(**box)(self.data))
+                np.testing.assert_allclose([v[i] for v in avgs],
+                                           Boxavg(**box)(self.data))
+        self.assertEqual(sums[2][-1], 0)
+
+    def test_averaging_plan_cache(self):
+        """
+            Plans are reused for the same averager settings and geometry
+        """
+        r = Ring(r_min=2 * self.qmin, r_max=5 * self.qmin, nbins=20)
+        plan = get_averaging_plan(r, self.data)
+        self.data.data = 2.0 * self.data.data
+        self.assertIs(get_averaging_plan(r, self.data), plan)
+        r.nbins_phi = 10
+        self.assertIsNot(get_averaging_plan(r, self.data), plan)
+        self.data.qx_data = self.data.qx_data + 0.001
+        self.assertIsNot(get_averaging_plan(
+            Ring(r_min=2 * self.qmin, r_max=5 * self.qmin, nbins=20),
+            self.data), plan)
+
+class ImageTests(unittest.TestCase):
+    """
+    Rebinning of 1d qx, qy, I vectors into an image for plotting
+    """
+
+    def setUp(self):
+        rng = np.random.RandomState(3)
+        # irregular grid with a masked region, so some bins are empty
+        qx = rng.uniform(-0.1, 0.1, 900)
+        qy = rng.uniform(-0.1, 0.1, 900)
+        keep = np.hypot(qx - 0.03, qy) > 0.02
+        self.qx, self.qy = qx[keep], qy[keep]
+        self.data = rng.uniform(1, 10, self.qx.size)
+
+    def test_rebin_to_image(self):
+        """
+            Compare the rebinned image with np.histogram2d
+        """
+        x_bins, y_bins = get_image_bins(self.qx, self.qy)
+        image, weights = rebin_to_image(self.qx, self.qy, self.data,
+                                        x_bins, y_bins)
+        counts = np.histogram2d(self.qy, self.qx, bins=[y_bins, x_bins])[0]
+        sums = np.histogram2d(self.qy, self.qx, bins=[y_bins, x_bins],
+                              weights=self.data)[0]
+        self.assertTrue(np.array_equal(weights, counts))
+        self.assertEqual(weights.sum(), self.data.size)
+        filled = counts > 0
+        self.assertTrue(np.allclose(image[filled],
+                                    sums[filled] / counts[filled]))
+        self.assertTrue(np.isnan(image[~filled]).all())
+
+    def test_fill_image_holes(self):
+        """
+            Empty bins get the average of their finite neighbours
+        """
+        x_bins, y_bins = get_image_bins(self.qx, self.qy)
+        image, weights = rebin_to_image(self.qx, self.qy, self.data,
+                                        x_bins, y_bins)
+        original = image.copy()
+        fill_image_holes(image, weights)
+        n_y, n_x = image.shape
+        for i, j in zip(*np.nonzero(weights == 0)):
+            values = [original[i + d_i, j + d_j]
+                      for d_i in (-1, 0, 1) for d_j in (-1, 0, 1)
+                      if (d_i or d_j) and 0 <= i + d_i < n_y
+                      and 0 <= j + d_j < n_x
+                      and np.isfinite(original[i + d_i, j + d_j])]
+            if values:
+                self.assertAlmostEqual(image[i, j], np.mean(values), 12)
+            else:
+                self.assertTrue(np.isnan(image[i, j]))
+        self.assertTrue(np.array_equal(image[weights > 0],
+                                       original[weights > 0]))
+
 
 class DataInfoTests(unittest.TestCase):
 
@@ -165,6 +341,12 @@ class DataInfoTests(unittest.TestCase):
         self.assertAlmostEqual(s, 0.10579935462962962, 4)
         self.assertAlmostEqual(ds, 0.02542364197388483, 4)
 
+        # The raw sums: counts, squared error and number of points
+        s, ds2, npoints = r._sum(self.data)
+        self.assertAlmostEqual(s, 34.278990899999997, 4)
+        self.assertAlmostEqual(ds2, 8.237259999538685**2, 4)
+        self.assertAlmostEqual(npoints, 324.0000, 4)
+
     def test_slabX(self):
         """
             Test slab in X
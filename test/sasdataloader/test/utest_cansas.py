@@ -3,6 +3,8 @@
 """
 import os
 import sys
+import shutil
+import tempfile
 import unittest
 import logging
 import warnings
@@ -11,6 +13,8 @@ if sys.version_info[0] >= 3:
 else:
     from StringIO import StringIO
 
+import h5py
+import numpy as np
 from lxml import etree
 from lxml.etree import XMLSyntaxError
 from xml.dom import minidom
@@ -19,9 +23,11 @@ import sas.sascalc.dataloader.readers.cansas_reader as cansas
 from sas.sascalc.dataloader.file_reader_base_class import decode
 from sas.sascalc.dataloader.loader import Loader
 from sas.sascalc.dataloader.data_info import Data1D, Data2D
+from sas.sascalc.dataloader.readers import xml_reader
 from sas.sascalc.dataloader.readers.xml_reader import XMLreader
 from sas.sascalc.dataloader.readers.cansas_reader import Reader
 from sas.sascalc.dataloader.readers.cansas_constants import CansasConstants
+from sas.sascalc.dataloader.readers import cansas_reader_HDF5
 
 logger = logging.getLogger(__name__)
 
@@ -208,6 +214,42 @@ class cansas_reader_xml(unittest.TestCase):
         if os.path.isfile(self.write_1_0_filename):
             os.remove(self.write_1_0_filename)
 
+    def test_schema_cache(self):
+        schema = xml_reader.get_schema(self.schema_1_0)
+        self.assertTrue(schema is xml_reader.get_schema(self.schema_1_0))
+        reader1 = XMLreader(self.cansas1d, self.schema_1_0)
+        reader2 = XMLreader(self.isis_1_0, self.schema_1_0)
+        self.assertTrue(reader1.validate_xml())
+        self.assertTrue(reader2.validate_xml())
+        self.assertTrue(reader1._compiled_schema() is schema.xmlschema)
+        self.assertTrue(reader2._compiled_schema() is schema.xmlschema)
+
+    def test_idata_columns(self):
+        """
+        Points stored a column at a time match points stored one at a time,
+        which is needed when the units change from point to point
+        """
+        with open(self.cansas1d) as f:
+            text = f.read()
+        mixed = text.replace('<Q unit="1/A">0.02</Q>', '<Q unit="1/nm">0.2</Q>')
+        self.assertNotEqual(text, mixed)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "mixed_units.xml")
+            with open(path, 'w') as f:
+                f.write(mixed)
+            by_column = Reader().read(self.cansas1d)[0]
+            by_point = Reader().read(path)[0]
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertTrue(np.allclose(by_column.x, [0.02, 0.03]))
+        self.assertTrue(np.allclose(by_column.x, by_point.x))
+        for attr in ('y', 'dx', 'dy'):
+            self.assertTrue(np.array_equal(getattr(by_column, attr),
+                                           getattr(by_point, attr)))
+        self.assertEqual(by_column._xunit, by_point._xunit)
+        self.assertEqual(by_column._yunit, by_point._yunit)
+
     def test_processing_instructions(self):
         reader = XMLreader(self.isis_1_1, self.schema_1_1)
         valid = reader.validate_xml()
@@ -314,6 +356,52 @@ class cansas_reader_hdf5(unittest.TestCase):
             else:
                 self._check_2d_data(data)
 
+    def test_lazy_frames(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "frames.h5")
+            q = np.linspace(0.3, 0.001, 50)
+            intensity = np.random.RandomState(0).rand(7, 50) + 1.0
+            with h5py.File(path, "w") as f:
+                entry = f.create_group("sasentry01")
+                entry.attrs["canSAS_class"] = "SASentry"
+                entry.create_dataset("title", data=[np.string_("frames")])
+                sasdata = entry.create_group("sasdata01")
+                sasdata.attrs["canSAS_class"] = "SASdata"
+                sasdata.attrs["signal"] = "I"
+                sasdata.attrs["I_axes"] = ["T", "Q"]
+                sasdata.attrs["Q_indices"] = [1]
+                node = sasdata.create_dataset("Q", data=q)
+                node.attrs["units"] = "1/A"
+                node = sasdata.create_dataset("I", data=intensity)
+                node.attrs["units"] = "1/cm"
+                node.attrs["uncertainties"] = "Idev"
+                node = sasdata.create_dataset("Idev", data=0.1*intensity)
+                node.attrs["units"] = "1/cm"
+
+            eager = cansas_reader_HDF5.Reader().read(path)
+            self.assertEqual(len(eager), 7)
+            frames = cansas_reader_HDF5.Reader(lazy=True).read(path)
+            self.assertEqual(len(frames), 1)
+            frames = frames[0]
+            self.assertTrue(isinstance(frames, cansas_reader_HDF5.FrameSet))
+            self.assertEqual(len(frames), 7)
+            for index, frame in enumerate(frames):
+                self.assertTrue(isinstance(frame, Data1D))
+                self.assertTrue(np.array_equal(frame.x, eager[index].x))
+                self.assertTrue(np.array_equal(frame.y, eager[index].y))
+                self.assertTrue(np.array_equal(frame.dy, eager[index].dy))
+                self.assertTrue(np.array_equal(frame.y,
+                                               intensity[index][::-1]))
+                self.assertEqual(frame._yunit, eager[index]._yunit)
+                self.assertEqual(frame.title, "frames")
+            self.assertTrue(np.array_equal(frames[-1].y, eager[-1].y))
+            self.assertEqual(len(frames[2:5]), 3)
+            self.assertRaises(IndexError, lambda: frames[7])
+            frames.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
     def _check_multiple_data(self, data):
         self.assertEqual(data.title, "MH4_5deg_16T_SLOW")
         self.assertEqual(data.run[0], '33837')
@@ -0,0 +1,80 @@
+"""
+    Unit tests for the operations on Data1D and Data2D
+"""
+
+import unittest
+import numpy as np
+
+from sas.sascalc.dataloader.data_info import Data1D, Data2D
+
+
+class data_info_tests(unittest.TestCase):
+
+    def setUp(self):
+        x = np.linspace(0.01, 0.3, 20)
+        self.data1 = Data1D(x=x, y=2.0*np.ones(20), dx=0.1*x,
+                            dy=0.2*np.ones(20))
+        self.data2 = Data1D(x=x.copy(), y=3.0*np.ones(20), dx=0.3*x,
+                            dy=0.4*np.ones(20))
+        qx = np.linspace(-0.1, 0.1, 30)
+        qy = np.linspace(0.05, -0.05, 30)
+        self.image1 = Data2D(data=2.0*np.ones(30), err_data=0.2*np.ones(30),
+                             qx_data=qx, qy_data=qy, q_data=np.hypot(qx, qy),
+                             mask=np.ones(30, dtype=bool))
+        self.image2 = Data2D(data=3.0*np.ones(30), err_data=0.4*np.ones(30),
+                             qx_data=qx.copy(), qy_data=qy.copy(),
+                             q_data=np.hypot(qx, qy),
+                             mask=np.ones(30, dtype=bool))
+
+    def test_operations_1d(self):
+        result = self.data1 - self.data2
+        self.assertTrue(np.allclose(result.x, self.data1.x))
+        self.assertTrue(np.allclose(result.y, -1.0))
+        self.assertTrue(np.allclose(result.dy, np.sqrt(0.2**2 + 0.4**2)))
+        dx = np.sqrt((self.data1.dx**2 + self.data2.dx**2)/2)
+        self.assertTrue(np.allclose(result.dx, dx))
+
+        result = self.data1 / self.data2
+        dy = np.sqrt(0.2**2 + 0.4**2 * (2.0/3.0)**2)/3.0
+        self.assertTrue(np.allclose(result.y, 2.0/3.0))
+        self.assertTrue(np.allclose(result.dy, dy))
+
+        result = 3.0 * self.data1
+        self.assertTrue(np.allclose(result.y, 6.0))
+        self.assertTrue(np.allclose(result.dy, 0.6))
+        self.assertTrue(np.allclose(result.dx, self.data1.dx))
+
+        self.data2.x[5] *= 1.1
+        self.assertRaises(ValueError, lambda: self.data1 + self.data2)
+
+    def test_operations_2d(self):
+        result = self.image1 * self.image2
+        self.assertTrue(np.allclose(result.data, 6.0))
+        err = np.sqrt((3.0*0.2)**2 + (2.0*0.4)**2)
+        self.assertTrue(np.allclose(result.err_data, err))
+        self.assertTrue(np.allclose(result.qx_data, self.image1.qx_data))
+        self.assertTrue(np.all(result.mask))
+
+        result = 1.0 - self.image1
+        self.assertTrue(np.allclose(result.data, -1.0))
+        self.assertTrue(np.allclose(result.err_data, 0.2))
+
+        self.image2.qy_data[3] *= 1.1
+        self.assertRaises(ValueError, lambda: self.image1 + self.image2)
+
+    def test_union(self):
+        result = self.data1 | Data1D(x=np.array([0.005, 0.5]),
+                                     y=np.array([1.0, 4.0]),
+                                     dx=np.zeros(2), dy=np.ones(2))
+        self.assertEqual(len(result.x), 22)
+        self.assertTrue(np.all(np.diff(result.x) > 0))
+        self.assertEqual(result.y[0], 1.0)
+        self.assertEqual(result.y[-1], 4.0)
+
+        result = self.image1 | self.image2
+        self.assertEqual(len(result.data), 60)
+        self.assertTrue(np.allclose(result.data[30:], 3.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,6 +76,56 @@ class ExtensionRegistryTests(unittest.TestCase):
         err_msg = data.errors[0]
         self.assertTrue("does not fully meet the CanSAS v1.x specification" in err_msg)
 
+    def test_load_many(self):
+        """
+        Load files with a pool of workers and check each file is loaded as
+        with load(), with the errors reported per file
+        """
+        missing = find("not_a_file.xml")
+        paths = [self.valid_file, self.valid_file_wrong_known_ext,
+                 self.valid_file_wrong_unknown_ext, missing,
+                 find("ascii_test_1.txt")]
+        expected = dict((path, self.loader.load(path)[0])
+                        for path in paths if path != missing)
+        for workers, processes in [(1, False), (3, False), (2, True)]:
+            results = list(self.loader.load_many(paths, workers=workers,
+                                                 processes=processes))
+            self.assertEqual(sorted(r[0] for r in results), sorted(paths))
+            for path, output, error in results:
+                if path == missing:
+                    self.assertTrue(output is None)
+                    self.assertTrue(isinstance(error, Exception))
+                    continue
+                self.assertTrue(error is None)
+                self.assertEqual(len(output), 1)
+                self.assertTrue(np.all(output[0].x == expected[path].x))
+                self.assertTrue(np.all(output[0].y == expected[path].y))
+
+    def test_detection_stats(self):
+        """
+        Check files are sent to the reader for the format found from their
+        contents, without trying the readers for other formats
+        """
+        self.loader.load(self.valid_file_wrong_known_ext)
+        self.loader.load(self.valid_file_wrong_unknown_ext)
+        self.loader.load(find("ascii_test_1.txt"))
+        self.loader.load(find("sesans_examples" + os.sep + "sphere_isis.ses"))
+        self.assertRaises(Exception, self.loader.load, find("test_data.test"))
+        stats = self.loader.detection_stats
+        self.assertEqual(stats['files'], 5)
+        self.assertEqual(stats['cansas_xml'], 2)
+        self.assertEqual(stats['ascii'], 1)
+        self.assertEqual(stats['sesans'], 1)
+        self.assertEqual(stats['unknown'], 1)
+        # Only test_data.test, with no associated reader, fails in the ASCII
+        # reader, and the cansas XML and NXcanSAS readers are never tried
+        self.assertEqual(stats['reads'], 5)
+        self.assertEqual(stats['failed_reads'], 1)
+        # The ASCII reader, as associated and default reader, for the .txt
+        # cansas XML file and as default reader for the .xyz one, and the
+        # cansas XML and NXcanSAS readers for test_data.test
+        self.assertEqual(stats['skipped_reads'], 5)
+
     def tearDown(self):
         if os.path.isfile(self.valid_file_wrong_known_ext):
             os.remove(self.valid_file_wrong_known_ext)
@@ -0,0 +1,142 @@
+"""
+    Unit tests for headless batch fitting
+"""
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from sas.sascalc.fit.batch import (BatchSpec, load_model, parse_constraint,
+                                   parse_par, run_batch)
+
+
+def write_sphere(path, radius):
+    """Write simulated sphere data with 1% errors as 3 column text"""
+    model = load_model('sphere')()
+    model.setParam('background', 0.001)
+    model.setParam('radius', radius)
+    q = np.logspace(-2.5, -0.7, 60)
+    y = model.evalDistribution(q)
+    np.savetxt(path, np.column_stack((q, y, 0.01 * y)))
+
+
+def read_csv(path):
+    with open(path) as fid:
+        return list(csv.DictReader(fid))
+
+
+class ParseTests(unittest.TestCase):
+
+    def test_parse_par(self):
+        self.assertEqual(parse_par("radius=50"), ("radius", 50.0, None))
+        self.assertEqual(parse_par(" scale = 1:"), ("scale", 1.0,
+                                                    (None, None)))
+        self.assertEqual(parse_par("radius=50:10:200"),
+                         ("radius", 50.0, (10.0, 200.0)))
+        self.assertEqual(parse_par("radius=50::200"),
+                         ("radius", 50.0, (None, 200.0)))
+        self.assertEqual(parse_par("radius=50:10"),
+                         ("radius", 50.0, (10.0, None)))
+        for text in ("radius", "=50", "radius=50:1:2:3", "radius=big"):
+            self.assertRaises(ValueError, parse_par, text)
+
+    def test_parse_constraint(self):
+        self.assertEqual(parse_constraint("sld = 2*sld_solvent"),
+                         ("sld", "2*sld_solvent"))
+        for text in ("sld", "=2", "sld= "):
+            self.assertRaises(ValueError, parse_constraint, text)
+
+    def test_spec(self):
+        spec = BatchSpec('sphere', pars={'radius': 40.0},
+                         fitted={'scale': (None, None),
+                                 'radius': (1.0, 100.0)},
+                         constraints={'sld': '2*sld_solvent'})
+        self.assertEqual(spec.fit_names(), ['radius', 'scale', 'sld'])
+        self.assertEqual(spec.make_model().getParam('radius'), 40.0)
+        self.assertRaises(ValueError,
+                          BatchSpec('sphere', pars={'length': 1.0}).make_model)
+        self.assertRaises(ValueError, BatchSpec(
+            'sphere', constraints={'sld': 'unknown+1'}).make_model)
+
+
+class RunBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = []
+        for k, radius in enumerate((30.0, 50.0)):
+            path = os.path.join(self.tmpdir, "sphere%d.txt" % k)
+            write_sphere(path, radius)
+            self.files.append(path)
+        # A file which is still being written
+        self.broken = os.path.join(self.tmpdir, "sphere2.txt")
+        with open(self.broken, "w") as fid:
+            fid.write("not data\n")
+        self.files.append(self.broken)
+        self.spec = BatchSpec('sphere',
+                              pars={'radius': 40.0, 'background': 0.001},
+                              fitted={'radius': (1.0, 200.0),
+                                      'scale': (None, None)})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check_resume(self, output, read):
+        """Fit, then resume after fixing the broken file"""
+        self.assertEqual(run_batch(self.spec, self.files, output), 3)
+        rows = read(output)
+        self.assertEqual([row['success'] for row in rows], [1, 1, 0])
+        np.testing.assert_allclose([row['radius'] for row in rows[:2]],
+                                   [30.0, 50.0], rtol=1e-4)
+
+        # Only the failed file is fitted again, until it succeeds
+        self.assertEqual(run_batch(self.spec, self.files, output), 1)
+        write_sphere(self.broken, 70.0)
+        self.assertEqual(run_batch(self.spec, self.files, output), 1)
+        self.assertEqual(run_batch(self.spec, self.files, output), 0)
+        rows = read(output)
+        self.assertEqual([row['file'] for row in rows],
+                         self.files + [self.broken] * 2)
+        self.assertEqual([row['success'] for row in rows], [1, 1, 0, 0, 1])
+        self.assertAlmostEqual(rows[-1]['radius'], 70.0, 3)
+
+        # Without resume every file is fitted
+        self.assertEqual(run_batch(self.spec, self.files, output,
+                                   resume=False), 3)
+
+    def test_csv(self):
+        def read(path):
+            return [dict(file=row['file'], success=int(row['success']),
+                         radius=float(row['radius']))
+                    for row in read_csv(path)]
+        self.check_resume(os.path.join(self.tmpdir, "fits.csv"), read)
+
+    def test_hdf5(self):
+        import h5py
+        def read(path):
+            with h5py.File(path, 'r') as fid:
+                return [dict(file=group.attrs['file'],
+                             success=int(group.attrs['success']),
+                             radius=group['values'][0])
+                        for group in fid.values()]
+        self.check_resume(os.path.join(self.tmpdir, "fits.h5"), read)
+
+    def test_workers(self):
+        """
+            Fits in worker processes are written as they complete
+        """
+        output = os.path.join(self.tmpdir, "fits.csv")
+        self.assertEqual(run_batch(self.spec, self.files, output,
+                                   nworkers=2), 3)
+        rows = dict((row['file'], row) for row in read_csv(output))
+        self.assertEqual(sorted(rows), sorted(self.files))
+        self.assertEqual(rows[self.broken]['success'], '0')
+        self.assertTrue(rows[self.broken]['message'].startswith("load failed"))
+        self.assertAlmostEqual(float(rows[self.files[1]]['radius']), 50.0, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
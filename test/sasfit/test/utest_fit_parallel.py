@@ -0,0 +1,115 @@
+"""
+    Unit tests for fitting in a pool of worker processes
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+from sas.sascalc.dataloader.data_info import Data1D
+from sas.sascalc.fit.AbstractFitEngine import FitHandler, Model
+from sas.sascalc.fit.BumpsFitting import BumpsFit
+from sas.sascalc.fit.batch import load_model
+from sas.sascalc.fit.parallel import (default_workers, fit_parallel,
+                                      fork_context, WORKERS_ENV)
+
+
+def make_fitter(radius, seed):
+    """Fitter for the radius of a sphere on noisy simulated data"""
+    model = load_model('sphere')()
+    model.setParam('background', 0.001)
+    model.setParam('radius', radius)
+    q = np.logspace(-2.5, -0.7, 60)
+    y = model.evalDistribution(q)
+    y = y * (1 + 0.02 * np.random.RandomState(seed).randn(len(q)))
+    data = Data1D(x=q, y=y, dy=0.02 * y)
+    data.name = "sphere%d" % seed
+    model.setParam('radius', 0.9 * radius)
+    model.details['radius'] = [model.details['radius'][0], 1.0, 1000.0]
+    fitter = BumpsFit()
+    fitter.set_model(Model(model, data), 0, ['radius', 'scale'], data=data)
+    fitter.set_data(data=data, id=0)
+    fitter.select_problem_for_fit(id=0, value=1)
+    return fitter
+
+
+def make_fitters():
+    return [make_fitter(radius, seed)
+            for seed, radius in enumerate((20.0, 40.0, 60.0, 80.0))]
+
+
+class CountingHandler(FitHandler):
+    def __init__(self):
+        self.calls = []
+
+    def progress(self, current, expected):
+        self.calls.append((current, expected))
+
+
+@unittest.skipIf(fork_context() is None, "workers are only forked on Linux")
+class FitParallelTests(unittest.TestCase):
+
+    def test_matches_serial(self):
+        """
+            Fits in worker processes give the serial results
+        """
+        expected = [fitter.fit(reset_flag=True) for fitter in make_fitters()]
+        fitters = make_fitters()
+        handler = CountingHandler()
+        results = fit_parallel(fitters, 2, reset_flag=True, handler=handler)
+        self.assertEqual(len(results), len(fitters))
+        for fitter, result, serial in zip(fitters, results, expected):
+            self.assertEqual(len(result), 1)
+            res, ref = result[0], serial[0]
+            self.assertTrue(res.success)
+            self.assertEqual(res.param_list, ref.param_list)
+            np.testing.assert_allclose(res.pvec, ref.pvec, rtol=1e-10)
+            np.testing.assert_allclose(res.stderr, ref.stderr, rtol=1e-8)
+            self.assertAlmostEqual(res.fitness, ref.fitness)
+            # The model and data of this process are attached to the result
+            # and the model holds the fitted values.
+            problem = fitter.fit_arrange_dict[0]
+            self.assertIs(res.model, problem.get_model().model)
+            self.assertIs(res.data, problem.get_data())
+            self.assertEqual(res.inputs, [(res.model, res.data)])
+            self.assertEqual(res.model.getParam('radius'), res.pvec[0])
+        self.assertEqual(sorted(handler.calls),
+                         [(k, 4) for k in range(1, 5)])
+
+    def test_quit(self):
+        """
+            An exception from isquit stops the pool
+        """
+        def isquit():
+            raise KeyboardInterrupt("stop")
+        self.assertRaises(KeyboardInterrupt, fit_parallel, make_fitters(), 2,
+                          isquit=isquit)
+
+
+class DefaultWorkersTests(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = os.environ.pop(WORKERS_ENV, None)
+
+    def tearDown(self):
+        os.environ.pop(WORKERS_ENV, None)
+        if self.saved is not None:
+            os.environ[WORKERS_ENV] = self.saved
+
+    def test_setting(self):
+        self.assertEqual(default_workers(), 1)
+        self.assertEqual(default_workers(3), 3)
+        self.assertGreaterEqual(default_workers(0), 1)
+
+    def test_environment(self):
+        os.environ[WORKERS_ENV] = '2'
+        self.assertEqual(default_workers(3), 2)
+
+    def test_fork_platform(self):
+        self.assertEqual(fork_context() is not None,
+                         sys.platform.startswith('linux'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+    Unit tests for the plugin model index of sas.sascalc.fit.models
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from sas.sascalc.fit import models
+
+SHAPE = '''
+from numpy import inf
+name = "%(name)s"
+title = "Constant shape"
+description = "I(q) = %(value)g"
+category = "shape:sphere"
+parameters = [["radius", "Ang", 50, [0, inf], "volume", "Radius"]]
+def Iq(q, radius):
+    return 0*q + %(value)g
+Iq.vectorized = True
+def form_volume(radius):
+    return 1.0
+'''
+
+SUM = '''
+from sasmodels.core import load_model_info
+from sasmodels.sasview_model import make_model_from_info
+
+model_info = load_model_info('sphere+%(part)s')
+model_info.name = '%(name)s'
+Model = make_model_from_info(model_info)
+'''
+
+
+class PluginIndexTests(unittest.TestCase):
+    # sasmodels keeps the models it loads by name for the whole session,
+    # so each test uses new names
+    count = 0
+
+    def setUp(self):
+        PluginIndexTests.count += 1
+        self.shape_name = "myshape%d" % self.count
+        self.sum_name = "summodel%d" % self.count
+        self.home = tempfile.mkdtemp()
+        self.saved = dict((key, os.environ.get(key))
+                          for key in ('HOME', 'SAS_MODELPATH'))
+        self.saved_log = models.PLUGIN_LOG
+        os.environ['HOME'] = self.home
+        self.plugins_dir = models.find_plugins_dir()
+        os.environ['SAS_MODELPATH'] = self.plugins_dir
+        models.PLUGIN_LOG = os.path.join(self.plugins_dir, "plugins.log")
+        self.shape = os.path.join(self.plugins_dir, self.shape_name + ".py")
+        self.sum = os.path.join(self.plugins_dir, self.sum_name + ".py")
+        self.write_shape(1.0)
+        self.write(self.sum, SUM % dict(name=self.sum_name,
+                                        part=self.shape_name))
+        self.index = {}
+
+    def tearDown(self):
+        models.PLUGIN_LOG = self.saved_log
+        for key, value in self.saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.home)
+
+    def write(self, path, text):
+        # Step the time stamp so that every edit is seen as a change
+        stamp = os.stat(path).st_mtime + 10 if os.path.exists(path) else None
+        with open(path, 'w') as fid:
+            fid.write(text)
+        if stamp is not None:
+            os.utime(path, (stamp, stamp))
+
+    def write_shape(self, value):
+        self.write(self.shape, SHAPE % dict(name=self.shape_name,
+                                            value=value))
+
+    def find(self):
+        return models.find_plugin_models(self.index)
+
+    def names(self):
+        return [models.PLUGIN_NAME_BASE + self.shape_name,
+                models.PLUGIN_NAME_BASE + self.sum_name]
+
+    def value(self, plugins, name):
+        return plugins[models.PLUGIN_NAME_BASE + name]().evalDistribution(
+            np.array([0.1]))[0]
+
+    def test_unchanged(self):
+        plugins = self.find()
+        self.assertEqual(sorted(plugins), self.names())
+        # The sum depends on the plugin file of its part
+        self.assertEqual(sorted(self.index[self.sum]['files']),
+                         sorted([self.shape, self.sum]))
+        again = self.find()
+        for name, model in plugins.items():
+            self.assertIs(again[name], model)
+
+    def test_touch(self):
+        """
+            Touching a file without changing it keeps the cached models
+        """
+        plugins = self.find()
+        stamp = os.stat(self.shape).st_mtime + 10
+        os.utime(self.shape, (stamp, stamp))
+        again = self.find()
+        for name, model in plugins.items():
+            self.assertIs(again[name], model)
+        self.assertEqual(self.index[self.shape]['files'][self.shape][0],
+                         stamp)
+
+    def test_edit_part(self):
+        """
+            Editing a part reloads the sum model that uses it
+        """
+        plugins = self.find()
+        shape = self.value(plugins, self.shape_name)
+        total = self.value(plugins, self.sum_name)
+        self.write_shape(3.0)
+        again = self.find()
+        for name in plugins:
+            self.assertIsNot(again[name], plugins[name])
+        self.assertAlmostEqual(self.value(again, self.shape_name) - shape, 2)
+        self.assertAlmostEqual(self.value(again, self.sum_name) - total, 2)
+
+    def test_broken_part(self):
+        """
+            Failed plugins are retried when a plugin changes, and with a
+            new index
+        """
+        total = self.value(self.find(), self.sum_name)
+        self.write(self.shape, "this is not python\n")
+        self.assertEqual(self.find(), {})
+        self.assertIsNotNone(self.index[self.shape]['error'])
+        self.assertIsNotNone(self.index[self.sum]['error'])
+        # Nothing changed: both are skipped
+        self.assertEqual(self.find(), {})
+        # A new index tries them again
+        self.index = {}
+        self.assertEqual(self.find(), {})
+        # Fixing the part brings back the sum
+        self.write_shape(2.0)
+        plugins = self.find()
+        self.assertEqual(sorted(plugins), self.names())
+        self.assertAlmostEqual(self.value(plugins, self.sum_name) - total, 1)
+
+    def test_delete(self):
+        """
+            Deleted plugins leave the index, and sums using them fail
+        """
+        self.find()
+        os.remove(self.shape)
+        self.assertEqual(self.find(), {})
+        self.assertNotIn(self.shape, self.index)
+        self.assertIsNotNone(self.index[self.sum]['error'])
+        os.remove(self.sum)
+        self.assertEqual(self.find(), {})
+        self.assertEqual(self.index, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+    Unit tests for the resolution kernel cache of PySmear2D
+"""
+import unittest
+
+import numpy as np
+
+from sas.sascalc.dataloader.data_info import Data2D
+from sas.sascalc.fit.qsmearing import PySmear2D
+
+
+class ConstantModel(object):
+    """Model returning 1 at every q"""
+
+    def evalDistribution(self, q):
+        return np.ones_like(q[0])
+
+
+def make_data(npix=10):
+    """Square Data2D with a pinhole resolution"""
+    q = np.linspace(-0.1, 0.1, npix)
+    qx, qy = [v.ravel() for v in np.meshgrid(q, q)]
+    data = Data2D(data=np.ones_like(qx), err_data=np.ones_like(qx),
+                  qx_data=qx, qy_data=qy, q_data=np.hypot(qx, qy))
+    data.dqx_data = 0.002 * np.ones_like(qx)
+    data.dqy_data = 0.001 * np.ones_like(qx)
+    return data
+
+
+class PySmear2DCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_data()
+        self.index = np.hypot(self.data.qx_data, self.data.qy_data) > 0.02
+        self.smearer = PySmear2D(data=self.data, model=ConstantModel())
+        self.smearer.set_index(self.index)
+
+    def builds(self):
+        return self.smearer.get_timing()['builds']
+
+    def test_reuse(self):
+        """
+            Repeated evaluations with an equal index build one kernel
+        """
+        first = self.smearer.get_value()
+        for _ in range(3):
+            self.smearer.set_index(self.index.copy())
+            np.testing.assert_array_equal(self.smearer.get_value(), first)
+        self.smearer.set_index(self.smearer.index)
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 1)
+        self.assertEqual(self.smearer.get_timing()['evals'], 5)
+        self.assertEqual(len(first), self.index.sum())
+
+    def test_rebuild(self):
+        """
+            Each change the kernel depends on builds a new one
+        """
+        self.smearer.get_value()
+        self.smearer.set_index(~self.index)
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 2)
+        self.smearer.set_index(None)
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 3)
+        self.smearer.set_accuracy('High')
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 4)
+        # Setting the same accuracy again keeps the kernel
+        self.smearer.set_accuracy('High')
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 4)
+        self.smearer.coords = 'cartesian'
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 5)
+        self.smearer.set_data(make_data())
+        self.smearer.get_value()
+        self.assertEqual(self.builds(), 6)
+        self.smearer.reset_timing()
+        self.assertEqual(self.builds(), 0)
+
+    def test_unsmeared(self):
+        """
+            Without smearing no kernel is built
+        """
+        self.smearer.set_smearer(False)
+        self.assertEqual(len(self.smearer.get_value()), self.index.sum())
+        self.assertEqual(self.builds(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
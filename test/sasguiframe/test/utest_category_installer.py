@@ -0,0 +1,95 @@
+"""
+    Unit tests for the model category record of CategoryInstaller
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import sasmodels
+from sasmodels.core import list_models
+
+from sas.sasgui.guiframe.CategoryInstaller import (
+    CategoryInstaller, USER_FILE, MODEL_STAMP_FILE)
+
+
+class FakeModel(object):
+    """Model with only the attributes check_install uses"""
+    def __init__(self, name, category="shape:sphere"):
+        self.name = name
+        self.category = category
+
+
+class CategoryInstallerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.homedir = tempfile.mkdtemp()
+        self.models = [FakeModel(name) for name in list_models()]
+
+    def tearDown(self):
+        shutil.rmtree(self.homedir)
+
+    def stamp_file(self):
+        return os.path.join(self.homedir, MODEL_STAMP_FILE)
+
+    def test_model_stamp(self):
+        """
+            The stamp lists the standard models and the sasmodels version
+        """
+        stamp = CategoryInstaller.get_model_stamp()
+        self.assertEqual(stamp['sasmodels'], sasmodels.__version__)
+        self.assertEqual(stamp['models'], sorted(list_models()))
+        self.assertIn('sphere', stamp['models'])
+
+    def test_not_installed(self):
+        """
+            Nothing installed is not current
+        """
+        self.assertFalse(CategoryInstaller.is_current(self.homedir))
+
+    def test_install(self):
+        """
+            Installing every standard model makes the categories current
+        """
+        CategoryInstaller.check_install(self.homedir, self.models)
+        self.assertTrue(os.path.isfile(self.stamp_file()))
+        self.assertTrue(CategoryInstaller.is_current(self.homedir))
+        with open(os.path.join(self.homedir, USER_FILE)) as fid:
+            categories = json.load(fid)
+        self.assertIn(['sphere', True], categories['Sphere'])
+
+    def test_missing_model(self):
+        """
+            A standard model missing from the list is looked for next time
+        """
+        CategoryInstaller.check_install(self.homedir, self.models[1:])
+        self.assertTrue(os.path.isfile(os.path.join(self.homedir, USER_FILE)))
+        self.assertFalse(os.path.exists(self.stamp_file()))
+        self.assertFalse(CategoryInstaller.is_current(self.homedir))
+
+    def test_stale_stamp(self):
+        """
+            A stamp for other models, or a bad one, is not current
+        """
+        CategoryInstaller.check_install(self.homedir, self.models)
+        stamp = CategoryInstaller.get_model_stamp()
+        stamp['sasmodels'] = 'old'
+        with open(self.stamp_file(), 'w') as fid:
+            json.dump(stamp, fid)
+        self.assertFalse(CategoryInstaller.is_current(self.homedir))
+        with open(self.stamp_file(), 'w') as fid:
+            fid.write('not json')
+        self.assertFalse(CategoryInstaller.is_current(self.homedir))
+
+    def test_categories_removed(self):
+        """
+            The stamp is ignored without the categories it was written for
+        """
+        CategoryInstaller.check_install(self.homedir, self.models)
+        os.remove(os.path.join(self.homedir, USER_FILE))
+        self.assertFalse(CategoryInstaller.is_current(self.homedir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+    Unit tests for the stub of perspectives imported on first use
+"""
+import unittest
+
+from sas.sasgui.guiframe.plugin_base import PluginBase, PerspectiveStub
+
+
+class FakeReader(object):
+    def __init__(self):
+        self.paths = []
+
+    def read(self, path):
+        self.paths.append(path)
+
+
+class FakePlugin(PluginBase):
+    """Perspective whose panels are named after it"""
+    def __init__(self):
+        PluginBase.__init__(self, name="Fake")
+        self.calls = []
+        self.fit_panel = "fit panel"
+
+    def get_panels(self, parent):
+        self.parent = parent
+        self.perspective = ["fake panel"]
+        self.state_reader = FakeReader()
+        return ["fake panel"]
+
+    def get_tools(self):
+        return [("Fake tool", "help", None)]
+
+    def on_perspective(self, event=None):
+        self.calls.append('on_perspective')
+
+    def post_init(self):
+        self.calls.append('post_init')
+
+
+class FakeFrame(object):
+    """Frame adding the panels of perspectives loaded after build_gui"""
+    def __init__(self):
+        self.loaded = []
+
+    def load_perspective(self, plugin):
+        plugin.get_panels(self)
+        plugin.post_init()
+        self.loaded.append(plugin)
+
+
+class PerspectiveStubTests(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+        self.frame = FakeFrame()
+
+    def loader(self):
+        plugin = FakePlugin()
+        self.created.append(plugin)
+        return plugin
+
+    def test_not_loaded(self):
+        """
+            The stub lists the perspective without loading it
+        """
+        stub = PerspectiveStub("Fake", self.loader, extension='.fake')
+        self.assertEqual(stub.get_panels(self.frame), [])
+        self.assertIs(stub.parent, self.frame)
+        self.assertEqual(stub.get_perspective(), ["Fake"])
+        self.assertEqual(stub.get_tools(), [])
+        self.assertEqual(stub.get_context_menu(plotpanel=None), [])
+        self.assertEqual(stub.populate_menu(self.frame), [])
+        self.assertIsNone(stub.get_frame())
+        self.assertTrue(stub.use_data())
+        self.assertEqual(stub.get_extensions(), (stub, '.fake'))
+        stub.set_batch_selection(True)
+        stub.post_init()
+        self.assertEqual(self.created, [])
+        self.assertRaises(AttributeError, getattr, stub, 'fit_panel')
+
+    def test_activate(self):
+        """
+            Activating the perspective loads it once into the frame
+        """
+        stub = PerspectiveStub("Fake", self.loader)
+        stub.get_panels(self.frame)
+        stub.set_batch_selection(True)
+        stub.on_perspective(event=None)
+        stub.on_perspective(event=None)
+        plugin, = self.created
+        self.assertEqual(self.frame.loaded, [plugin])
+        self.assertIs(plugin.parent, self.frame)
+        self.assertTrue(plugin.batch_on)
+        self.assertEqual(plugin.calls,
+                         ['post_init', 'on_perspective', 'on_perspective'])
+        self.assertEqual(stub.get_perspective(), ["fake panel"])
+        self.assertEqual(stub.fit_panel, "fit panel")
+        stub.set_batch_selection(False)
+        self.assertFalse(plugin.batch_on)
+
+    def test_read(self):
+        """
+            Opening a saved analysis loads the perspective to read it
+        """
+        stub = PerspectiveStub("Fake", self.loader, extension='.fake')
+        stub.get_panels(self.frame)
+        reader, ext = stub.get_extensions()
+        self.assertEqual(ext, '.fake')
+        reader.read("analysis.fake")
+        plugin, = self.created
+        self.assertEqual(plugin.state_reader.paths, ["analysis.fake"])
+        self.assertEqual(stub.get_extensions(), (plugin.state_reader, ''))
+
+    def test_tools(self):
+        """
+            Tools are loaded when the Tools menu is built, before the
+            frame asks for the panels
+        """
+        stub = PerspectiveStub("Fake", self.loader, tools=True)
+        self.assertEqual(stub.get_perspective(), [])
+        self.assertEqual(stub.get_tools(), [("Fake tool", "help", None)])
+        plugin, = self.created
+        self.assertEqual(self.frame.loaded, [])
+        self.assertEqual(stub.get_panels(self.frame), ["fake panel"])
+        self.assertIs(plugin.parent, self.frame)
+        stub.post_init()
+        self.assertEqual(plugin.calls, ['post_init'])
+
+    def test_failed(self):
+        """
+            A perspective which cannot be created is tried only once
+        """
+        calls = []
+        stub = PerspectiveStub("Fake", lambda: calls.append(1),
+                               extension='.fake')
+        stub.get_panels(self.frame)
+        stub.on_perspective(event=None)
+        stub.on_perspective(event=None)
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.frame.loaded, [])
+        self.assertEqual(stub.get_perspective(), [])
+        self.assertEqual(stub.get_extensions(), (None, ''))
+        self.assertRaises(ValueError, stub.set_theory, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
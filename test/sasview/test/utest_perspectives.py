@@ -0,0 +1,79 @@
+"""
+    Unit tests for the perspectives of SasView imported on first use
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from sas.sasview import sasview
+from sas.sasview.sasview import SasView
+
+FAKE = '''
+from sas.sasgui.guiframe.plugin_base import PluginBase
+class Plugin(PluginBase):
+    def __init__(self):
+        PluginBase.__init__(self, name="Fake")
+'''
+
+
+class PerspectiveTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        with open(os.path.join(self.path, 'fake_perspective.py'), 'w') as fid:
+            fid.write(FAKE)
+        sys.path.insert(0, self.path)
+        sasview.PERSPECTIVES['Fake'] = 'fake_perspective'
+        sasview.PERSPECTIVES['Missing'] = 'missing_perspective'
+        sasview.PERSPECTIVE_EXTENSIONS['Fake'] = '.fake'
+        # The application without its GUI
+        self.app = SasView.__new__(SasView)
+        self.app.perspectives = {}
+
+    def tearDown(self):
+        for name in ('Fake', 'Missing'):
+            sasview.PERSPECTIVES.pop(name)
+        sasview.PERSPECTIVE_EXTENSIONS.pop('Fake')
+        sys.path.remove(self.path)
+        sys.modules.pop('fake_perspective', None)
+        shutil.rmtree(self.path)
+
+    def test_names(self):
+        """
+            Perspectives are named as in the Analysis menu
+        """
+        self.assertIn('Fitting', sasview.PERSPECTIVES)
+        for name in sasview.PERSPECTIVE_EXTENSIONS:
+            self.assertIn(name, sasview.PERSPECTIVES)
+        for name in sasview.TOOL_PERSPECTIVES:
+            self.assertIn(name, sasview.PERSPECTIVES)
+
+    def test_stub(self):
+        """
+            The module of a perspective is imported when its stub is used
+        """
+        stub = self.app.get_perspective_stub('Fake')
+        self.assertEqual(stub.sub_menu, 'Fake')
+        self.assertEqual(stub.get_extensions(), (stub, '.fake'))
+        self.assertNotIn('fake_perspective', sys.modules)
+        self.assertEqual(self.app.perspectives, {})
+        plugin = stub.load()
+        self.assertIn('fake_perspective', sys.modules)
+        self.assertIs(self.app.perspectives['Fake'], plugin)
+        self.assertIs(self.app.get_perspective('Fake'), plugin)
+
+    def test_missing(self):
+        """
+            A perspective which cannot be imported is None
+        """
+        stub = self.app.get_perspective_stub('Missing')
+        with self.assertLogs(sasview.__name__, 'ERROR'):
+            self.assertIsNone(stub.load())
+        self.assertIsNone(self.app.perspectives['Missing'])
+        self.assertEqual(stub.get_perspective(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
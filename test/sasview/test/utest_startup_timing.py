@@ -0,0 +1,169 @@
+"""
+    Unit tests for the SasView startup timing report
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    import builtins
+except ImportError:  # CRUFT: python 2.7 support
+    import __builtin__ as builtins
+
+from sas.sasview import startup_timing
+from sas.sasview.startup_timing import StartupTimer, _absolute_name
+
+OUTER = '''
+import time
+import timed_inner
+time.sleep(0.02)
+'''
+
+INNER = '''
+import time
+time.sleep(0.05)
+'''
+
+
+class AbsoluteNameTests(unittest.TestCase):
+
+    def test_absolute(self):
+        """
+            Absolute imports keep their name
+        """
+        self.assertEqual(_absolute_name('a.b', {'__package__': 'x'}, 0), 'a.b')
+        self.assertEqual(_absolute_name('a', None, 1), 'a')
+
+    def test_relative(self):
+        """
+            Relative imports are resolved against the importing module
+        """
+        module = {'__name__': 'a.b.c', '__package__': 'a.b'}
+        self.assertEqual(_absolute_name('d', module, 1), 'a.b.d')
+        self.assertEqual(_absolute_name('d', module, 2), 'a.d')
+        self.assertEqual(_absolute_name('', module, 1), 'a.b')
+
+    def test_relative_without_package(self):
+        """
+            Without __package__ the package comes from __name__
+        """
+        self.assertEqual(_absolute_name('d', {'__name__': 'a.b.c'}, 1),
+                         'a.b.d')
+        package = {'__name__': 'a.b', '__path__': []}
+        self.assertEqual(_absolute_name('d', package, 1), 'a.b.d')
+
+
+class StartupTimerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        for name, text in (('timed_outer', OUTER), ('timed_inner', INNER)):
+            with open(os.path.join(self.path, name + '.py'), 'w') as fid:
+                fid.write(text)
+        sys.path.insert(0, self.path)
+        self.timer = StartupTimer()
+
+    def tearDown(self):
+        self.timer.uninstall()
+        sys.path.remove(self.path)
+        for name in ('timed_outer', 'timed_inner'):
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.path)
+
+    def test_install(self):
+        """
+            Installing replaces the import function until uninstalled
+        """
+        original = builtins.__import__
+        self.timer.install()
+        self.timer.install()
+        self.assertIsNot(builtins.__import__, original)
+        self.timer.uninstall()
+        self.assertIs(builtins.__import__, original)
+
+    def test_imports(self):
+        """
+            The self time of a module excludes the modules it imports
+        """
+        self.timer.install()
+        import timed_outer
+        import os.path
+        self.timer.uninstall()
+        outer = self.timer.imports['timed_outer']
+        inner = self.timer.imports['timed_inner']
+        self.assertGreaterEqual(inner[0], 0.05)
+        self.assertAlmostEqual(inner[0], inner[1])
+        self.assertGreaterEqual(outer[0], 0.02)
+        self.assertLess(outer[0], inner[0])
+        self.assertGreaterEqual(outer[1], outer[0] + inner[1])
+        # Modules already imported are not timed
+        self.assertNotIn('os.path', self.timer.imports)
+
+    def test_report(self):
+        """
+            The report lists the steps and the slowest imports
+        """
+        self.timer.install()
+        with self.timer.phase("load"):
+            import timed_outer
+        self.timer.uninstall()
+        self.assertEqual([name for name, _ in self.timer.phases], ["load"])
+        self.assertGreaterEqual(self.timer.phases[0][1], 0.07)
+        lines = self.timer.report(limit=1).splitlines()
+        self.assertTrue(lines[0].startswith("startup took"))
+        self.assertEqual(lines[1].split()[0], "load")
+        self.assertTrue(lines[2].startswith("2 modules imported"))
+        self.assertEqual(lines[3].split()[0], "timed_inner")
+        self.assertEqual(len(lines), 4)
+
+
+class StartupTimingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = os.environ.pop(startup_timing.ENV_VAR, None)
+        self.original = builtins.__import__
+
+    def tearDown(self):
+        if startup_timing._TIMER is not None:
+            startup_timing._TIMER.uninstall()
+            startup_timing._TIMER = None
+        os.environ.pop(startup_timing.ENV_VAR, None)
+        if self.saved is not None:
+            os.environ[startup_timing.ENV_VAR] = self.saved
+
+    def test_off(self):
+        """
+            Without the environment variable nothing is timed
+        """
+        for value in (None, '', '0'):
+            if value is not None:
+                os.environ[startup_timing.ENV_VAR] = value
+            self.assertIsNone(startup_timing.start())
+            self.assertIs(builtins.__import__, self.original)
+            with startup_timing.phase("step"):
+                pass
+            startup_timing.finish()
+
+    def test_on(self):
+        """
+            With the environment variable the report is logged at the end
+        """
+        os.environ[startup_timing.ENV_VAR] = '1'
+        timer = startup_timing.start()
+        self.assertIsNotNone(timer)
+        self.assertIs(startup_timing.start(), timer)
+        self.assertIsNot(builtins.__import__, self.original)
+        with startup_timing.phase("step"):
+            pass
+        self.assertEqual([name for name, _ in timer.phases], ["step"])
+        with self.assertLogs(startup_timing.logger, 'INFO') as logs:
+            startup_timing.finish()
+        self.assertIn("step", logs.output[0])
+        self.assertIs(builtins.__import__, self.original)
+        self.assertIsNone(startup_timing._TIMER)
+
+
+if __name__ == "__main__":
+    unittest.main()